@@ -1,7 +1,7 @@
 """space2stats."""
 
-from .lib import StatsTable
+from .lib import StatsTable, refresh_fields_cache
 from .settings import Settings
 
-__all__ = ["StatsTable", "Settings"]
+__all__ = ["StatsTable", "Settings", "refresh_fields_cache"]
 __version__ = "1.0.0"
@@ -1,22 +1,46 @@
 from contextlib import asynccontextmanager
 from textwrap import dedent
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
+import anyio.to_thread
 import boto3
 import psycopg as pg
+import pyarrow as pa
 from asgi_s3_response_middleware import S3ResponseMiddleware
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse, RedirectResponse
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 from starlette_cramjam.middleware import CompressionMiddleware
 
 from .. import __version__
-from ..lib import StatsTable
+from ..lib import (
+    StatsTable,
+    polyfill_cache_from_settings,
+    polyfill_executor_from_settings,
+    prepared_statement_stats,
+)
+from ..model_types import GeometryFormat
 from .db import close_db_connection, connect_to_db
 from .errors import add_exception_handlers
+from .responses import (
+    ARROW_STREAM_MEDIA_TYPE,
+    COLUMNAR_RESPONSES,
+    NDJSON_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    STREAMING_MEDIA_TYPES,
+    columnar_response,
+    json_response,
+    negotiate_media_type,
+    streaming_response,
+)
 from .schemas import (
+    AdminAggregateRequest,
+    AdminSummaryRequest,
     AggregateRequest,
+    BatchAggregateRequest,
+    BatchSummaryRequest,
     HexIdAggregateRequest,
     HexIdSummaryRequest,
     HexIdTimeseriesRequest,
@@ -31,11 +55,20 @@ s3_client = boto3.client("s3")
 def build_app(settings: Optional[Settings] = None) -> FastAPI:
     settings = settings or Settings()
 
+    # Shared by all requests served by this process
+    polyfill_cache = polyfill_cache_from_settings(settings)
+    polyfill_executor = polyfill_executor_from_settings(settings)
+
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        # Queries run in the threadpool, which bounds the concurrent requests
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = settings.THREADPOOL_SIZE
         await connect_to_db(app, settings=settings)
         yield
         await close_db_connection(app)
+        if polyfill_executor is not None:
+            polyfill_executor.shutdown()
 
     app = FastAPI(
         default_response_class=ORJSONResponse,
@@ -73,24 +106,108 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         allow_headers=["*"],
     )
     app.add_middleware(CompressionMiddleware)
-    app.add_middleware(
-        S3ResponseMiddleware,
-        s3_bucket_name=settings.S3_BUCKET_NAME,
-        s3_client=s3_client,
-    )
+    if settings.S3_BUCKET_NAME:
+        app.add_middleware(
+            S3ResponseMiddleware,
+            s3_bucket_name=settings.S3_BUCKET_NAME,
+            s3_client=s3_client,
+        )
 
     add_exception_handlers(app)
 
+    def _stats_table(conn: pg.Connection) -> StatsTable:
+        return StatsTable(
+            conn=conn,
+            table_name=settings.PGTABLENAME,
+            timeseries_table_name=settings.TIMESERIES_TABLE_NAME,
+            admin_table_name=settings.ADMIN_TABLE_NAME,
+            fields_cache_ttl=settings.FIELDS_CACHE_TTL,
+            copy_ids_threshold=settings.COPY_IDS_THRESHOLD,
+            use_rollups=settings.USE_ROLLUPS,
+            polyfill_cache=polyfill_cache,
+            prepare_statements=settings.PREPARE_STATEMENTS,
+            polyfill_executor=polyfill_executor,
+            polyfill_workers=settings.POLYFILL_PROCESSES,
+            polyfill_parallel_min_area=settings.POLYFILL_PARALLEL_MIN_AREA,
+            polyfill_simplify=settings.POLYFILL_SIMPLIFY,
+        )
+
     def stats_table(request: Request):
         with request.app.state.pool.connection() as conn:
-            yield StatsTable(
-                conn=conn,
-                table_name=settings.PGTABLENAME,
-                timeseries_table_name=settings.TIMESERIES_TABLE_NAME,
+            yield _stats_table(conn)
+
+    async def call(table: StatsTable, method: str, **kwargs: Any) -> Any:
+        """Run `method` of a table in the threadpool."""
+        return await run_in_threadpool(getattr(table, method), **kwargs)
+
+    async def call_pooled(request: Request, method: str, **kwargs: Any) -> Any:
+        """Call `method` of a table on a pooled connection held only for the call."""
+
+        def run() -> Any:
+            with request.app.state.pool.connection() as conn:
+                return getattr(_stats_table(conn), method)(**kwargs)
+
+        return await run_in_threadpool(run)
+
+    def iter_batches(
+        request: Request, method: str, **kwargs: Any
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream `{method}_batches` on a pooled connection held until it ends."""
+        with request.app.state.pool.connection() as conn:
+            yield from getattr(_stats_table(conn), f"{method}_batches")(**kwargs)
+
+    async def tabular_response(
+        request: Request,
+        method: str,
+        json_kwargs: Optional[Dict[str, Any]] = None,
+        geometry_format: GeometryFormat = "string",
+        **kwargs: Any,
+    ) -> Any:
+        """Call a `StatsTable` method in the format negotiated with the client.
+
+        JSON rows come from `method`, columnar bodies from `{method}_arrow` and
+        streamed bodies from `{method}_batches`. Routes answering this way don't
+        use the `stats_table` dependency: each call takes its own pooled
+        connection, and a stream holds it until the response is sent, so a
+        request never holds two connections.
+        ``json_kwargs`` are only passed to `method`, e.g. the JSON layout, and
+        ``geometry_format`` only applies to JSON and NDJSON geometries.
+        """
+        media_type = negotiate_media_type(request)
+        if media_type is None:
+            return json_response(
+                await call_pooled(request, method, **kwargs, **(json_kwargs or {})),
+                geometry_format,
+            )
+
+        if settings.STREAMING_ENABLED and media_type in STREAMING_MEDIA_TYPES:
+            batches = iter_batches(
+                request,
+                method,
+                batch_size=settings.STREAMING_BATCH_SIZE,
+                **kwargs,
+            )
+            return await streaming_response(batches, media_type, geometry_format)
+
+        if media_type == NDJSON_MEDIA_TYPE:
+            raise HTTPException(
+                status_code=406,
+                detail="Streaming responses are not enabled on this deployment",
             )
 
-    @app.post("/summary", response_model=List[Dict[str, Any]])
-    def get_summary(body: SummaryRequest, table: StatsTable = Depends(stats_table)):
+        return columnar_response(
+            await call_pooled(request, f"{method}_arrow", **kwargs), media_type
+        )
+
+    @app.post(
+        "/summary",
+        response_model=List[Dict[str, Any]],
+        responses=COLUMNAR_RESPONSES,
+    )
+    async def get_summary(
+        body: SummaryRequest,
+        request: Request,
+    ):
         """Retrieve Statistics from a GeoJSON feature.
 
         Parameters
@@ -133,6 +250,14 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
 
         Specifies if the H3 geometries should be included in the response. It can be either "polygon" or "point". If None, geometries are not included
         </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
         </dl>
 
         Returns
@@ -144,20 +269,31 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         - `hex_id`: The H3 cell identifier
         - `geometry` (optional): The geometry of the H3 cell, if geometry is specified.
         - Other fields from the statistics table, based on the specified `fields`
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the same rows as an Arrow IPC stream or a Parquet file, with geometries encoded as WKB.
+        On deployments with streaming enabled, Arrow IPC and `Accept: application/x-ndjson` responses are streamed in batches of rows.
         """
         try:
-            return table.summaries(
-                body.aoi,
-                body.spatial_join_method,
-                body.fields,
-                body.geometry,
+            return await tabular_response(
+                request,
+                "summaries",
+                aoi=body.aoi,
+                spatial_join_method=body.spatial_join_method,
+                fields=body.fields,
+                geometry=body.geometry,
+                geometry_format=body.geometry_format,
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-    @app.post("/summary_by_hexids", response_model=List[Dict[str, Any]])
-    def get_summary_by_hexids(
-        body: HexIdSummaryRequest, table: StatsTable = Depends(stats_table)
+    @app.post(
+        "/summary_by_hexids",
+        response_model=List[Dict[str, Any]],
+        responses=COLUMNAR_RESPONSES,
+    )
+    async def get_summary_by_hexids(
+        body: HexIdSummaryRequest,
+        request: Request,
     ):
         """Retrieve statistics for specific hex IDs.
 
@@ -187,6 +323,14 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
 
         Specifies if the H3 geometries should be included in the response. It can be either "polygon" to get hexagon boundaries, "point" to get hexagon centers, or None to exclude geometries.
         </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
         </dl>
 
         Returns
@@ -197,18 +341,130 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         - `hex_id`: The H3 cell identifier
         - `geometry` (optional): The geometry of the H3 cell, if geometry is specified
         - Other fields from the statistics table, based on the specified `fields`
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the same rows as an Arrow IPC stream or a Parquet file, with geometries encoded as WKB.
+        On deployments with streaming enabled, Arrow IPC and `Accept: application/x-ndjson` responses are streamed in batches of rows.
         """
         try:
-            return table.summaries_by_hexids(
+            return await tabular_response(
+                request,
+                "summaries_by_hexids",
                 hex_ids=body.hex_ids,
                 fields=body.fields,
                 geometry=body.geometry,
+                geometry_format=body.geometry_format,
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
+    @app.post(
+        "/summary/batch",
+        response_model=Dict[str, List[Dict[str, Any]]],
+        responses={
+            200: {
+                "content": {ARROW_STREAM_MEDIA_TYPE: {}, PARQUET_MEDIA_TYPE: {}},
+                "description": "Rows keyed by feature id as JSON, or as an Arrow IPC "
+                "stream or a Parquet file with a `feature_id` column when requested "
+                "through the `Accept` header.",
+            }
+        },
+    )
+    async def get_summary_batch(
+        body: BatchSummaryRequest,
+        request: Request,
+        table: StatsTable = Depends(stats_table),
+    ):
+        """Retrieve Statistics for each feature of a GeoJSON FeatureCollection.
+
+        All features are polyfilled concurrently and their statistics are read
+        with a single query.
+
+        Parameters
+        ----------
+
+        <dl>
+        <dt>aois</dt>
+        <dd>
+
+        `GeoJSON FeatureCollection`
+
+        The Areas of Interest. Features are identified by their `id`, or by their position in the collection when they have none.
+        </dd>
+
+        <dt>spatial_join_method</dt>
+        <dd>
+
+        `["touches", "centroid", "within"]`
+
+        The method to use for performing the spatial join between the AOIs and H3 cells
+        </dd>
+
+        <dt>fields</dt>
+        <dd>
+
+        `List[str]`
+
+        A list of field names to retrieve from the statistics table.
+        </dd>
+
+        <dt>geometry</dt>
+        <dd>
+
+        `Optional["polygon", "point"]`
+
+        Specifies if the H3 geometries should be included in the response.
+        </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
+        </dl>
+
+        Returns
+        -------
+        `Dict[str, List[Dict]]`
+
+        The rows of each feature, as returned by `/summary`, keyed by feature id.
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the rows of all features in one table, whose `feature_id` column identifies their feature.
+        """
+        try:
+            media_type = negotiate_media_type(request)
+            if media_type in (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+                return columnar_response(
+                    await call(
+                        table,
+                        "summaries_batch_arrow",
+                        aois=body.aois,
+                        spatial_join_method=body.spatial_join_method,
+                        fields=body.fields,
+                        geometry=body.geometry,
+                    ),
+                    media_type,
+                )
+            return json_response(
+                await call(
+                    table,
+                    "summaries_batch",
+                    aois=body.aois,
+                    spatial_join_method=body.spatial_join_method,
+                    fields=body.fields,
+                    geometry=body.geometry,
+                ),
+                body.geometry_format,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
     @app.post("/aggregate", response_model=Dict[str, float])
-    def get_aggregate(body: AggregateRequest, table: StatsTable = Depends(stats_table)):
+    async def get_aggregate(
+        body: AggregateRequest,
+        table: StatsTable = Depends(stats_table),
+    ):
         """Aggregate Statistics from a GeoJSON feature.
 
          Parameters
@@ -226,13 +482,16 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         <dt>spatial_join_method</dt>
         <dd>
 
-        `["touches", "centroid", "within"]`
+        `["touches", "centroid", "within", "fractional"]`
 
         The method to use for performing the spatial join between the AOI and H3 cells
 
         - `touches`: Includes H3 cells that touch the AOI
         - `centroid`: Includes H3 cells where the centroid falls within the AOI
         - `within`: Includes H3 cells entirely within the AOI
+        - `fractional`: Includes H3 cells that touch the AOI, weighted by the fraction of their area inside it.
+          Sums and counts only add that fraction of each cell and averages are area-weighted, while `max` and `min` are taken over all the cells.
+          `stddev` and percentiles are not supported.
 
         </dd>
 
@@ -247,9 +506,19 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         <dt>aggregation_type</dt>
         <dd>
 
-        `["sum", "avg", "count", "max", "min"]`
+        `["sum", "avg", "count", "max", "min", "stddev", "weighted_avg", "p<percentile>"]` or a list of them
 
         The manner in which to aggregate the statistics.
+        Percentiles are written as `p` followed by the percentile, e.g. `p90`.
+        A list of types is computed in a single pass over the cells, with results keyed by `<field>_<type>`, e.g. `sum_pop_2020_p90`.
+        </dd>
+
+        <dt>weight_field</dt>
+        <dd>
+
+        `Optional[str]`
+
+        The field weighting the values of `weighted_avg`, e.g. a population count.
         </dd>
         </dl>
 
@@ -258,18 +527,24 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         `Dict[str, float]`
         """
         try:
-            return table.aggregate(
+            return await call(
+                table,
+                "aggregate",
                 aoi=body.aoi,
                 spatial_join_method=body.spatial_join_method,
                 fields=body.fields,
                 aggregation_type=body.aggregation_type,
+                weight_field=body.weight_field,
             )
         except pg.errors.UndefinedColumn as e:
             raise HTTPException(status_code=400, detail=e.diag.message_primary) from e
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
 
     @app.post("/aggregate_by_hexids", response_model=Dict[str, float])
-    def get_aggregate_by_hexids(
-        body: HexIdAggregateRequest, table: StatsTable = Depends(stats_table)
+    async def get_aggregate_by_hexids(
+        body: HexIdAggregateRequest,
+        table: StatsTable = Depends(stats_table),
     ):
         """Aggregate statistics for specific hex IDs.
 
@@ -295,9 +570,19 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         <dt>aggregation_type</dt>
         <dd>
 
-        `["sum", "avg", "count", "max", "min"]`
+        `["sum", "avg", "count", "max", "min", "stddev", "weighted_avg", "p<percentile>"]` or a list of them
 
         Type of aggregation to perform on the fields
+        Percentiles are written as `p` followed by the percentile, e.g. `p90`.
+        A list of types is computed in a single pass over the cells, with results keyed by `<field>_<type>`, e.g. `sum_pop_2020_p90`.
+        </dd>
+
+        <dt>weight_field</dt>
+        <dd>
+
+        `Optional[str]`
+
+        The field weighting the values of `weighted_avg`, e.g. a population count.
         </dd>
         </dl>
 
@@ -308,18 +593,275 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         Dictionary containing aggregated statistics for the specified hex IDs
         """
         try:
-            return table.aggregate_by_hexids(
+            return await call(
+                table,
+                "aggregate_by_hexids",
                 hex_ids=body.hex_ids,
                 fields=body.fields,
                 aggregation_type=body.aggregation_type,
+                weight_field=body.weight_field,
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
+    @app.post("/aggregate/batch", response_model=Dict[str, Dict[str, Any]])
+    async def get_aggregate_batch(
+        body: BatchAggregateRequest,
+        table: StatsTable = Depends(stats_table),
+    ):
+        """Aggregate Statistics for each feature of a GeoJSON FeatureCollection.
+
+        All features are polyfilled concurrently and aggregated with a single
+        grouped query.
+
+        Parameters
+        ----------
+
+        <dl>
+        <dt>aois</dt>
+        <dd>
+
+        `GeoJSON FeatureCollection`
+
+        The Areas of Interest. Features are identified by their `id`, or by their position in the collection when they have none.
+        </dd>
+
+        <dt>spatial_join_method</dt>
+        <dd>
+
+        `["touches", "centroid", "within", "fractional"]`
+
+        The method to use for performing the spatial join between the AOIs and H3 cells, `fractional` weighting the cells as in `/aggregate`
+        </dd>
+
+        <dt>fields</dt>
+        <dd>
+
+        `List[str]`
+
+        A list of field names to retrieve from the statistics table.
+        </dd>
+
+        <dt>aggregation_type</dt>
+        <dd>
+
+        `["sum", "avg", "count", "max", "min", "stddev", "weighted_avg", "p<percentile>"]` or a list of them
+
+        The manner in which to aggregate the statistics.
+        Percentiles are written as `p` followed by the percentile, e.g. `p90`.
+        A list of types is computed in a single pass over the cells, with results keyed by `<field>_<type>`, e.g. `sum_pop_2020_p90`.
+        </dd>
+
+        <dt>weight_field</dt>
+        <dd>
+
+        `Optional[str]`
+
+        The field weighting the values of `weighted_avg`, e.g. a population count.
+        </dd>
+        </dl>
+
+        Returns
+        -------
+        `Dict[str, Dict[str, float]]`
+
+        The aggregated statistics of each feature, keyed by feature id. Features covering no cell with statistics map to an empty object.
+        """
+        try:
+            return await call(
+                table,
+                "aggregate_batch",
+                aois=body.aois,
+                spatial_join_method=body.spatial_join_method,
+                fields=body.fields,
+                aggregation_type=body.aggregation_type,
+                weight_field=body.weight_field,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    @app.post(
+        "/summary_by_admin",
+        response_model=Dict[str, List[Dict[str, Any]]],
+        responses={
+            200: {
+                "content": {ARROW_STREAM_MEDIA_TYPE: {}, PARQUET_MEDIA_TYPE: {}},
+                "description": "Rows keyed by admin id as JSON, or as an Arrow IPC "
+                "stream or a Parquet file with an `admin_id` column when requested "
+                "through the `Accept` header.",
+            }
+        },
+    )
+    async def get_summary_by_admin(
+        body: AdminSummaryRequest,
+        request: Request,
+        table: StatsTable = Depends(stats_table),
+    ):
+        """Retrieve Statistics for administrative units by id.
+
+        The cells of each unit are precomputed at ingest (see `space2stats-ingest-admin`),
+        so no boundary is uploaded or polyfilled: the statistics are read with a
+        single join.
+
+        Parameters
+        ----------
+
+        <dl>
+        <dt>admin_ids</dt>
+        <dd>
+
+        `List[str]`
+
+        The ids of the administrative units, as loaded by the ingest, e.g. geoBoundaries `shapeID`s.
+        </dd>
+
+        <dt>spatial_join_method</dt>
+        <dd>
+
+        `["touches", "centroid", "within"]`
+
+        The method to use for performing the spatial join between the units and H3 cells
+        </dd>
+
+        <dt>fields</dt>
+        <dd>
+
+        `List[str]`
+
+        A list of field names to retrieve from the statistics table.
+        </dd>
+
+        <dt>geometry</dt>
+        <dd>
+
+        `Optional["polygon", "point"]`
+
+        Specifies if the H3 geometries should be included in the response.
+        </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
+        </dl>
+
+        Returns
+        -------
+        `Dict[str, List[Dict]]`
+
+        The rows of each unit, as returned by `/summary`, keyed by admin id. Unknown units map to an empty list.
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the rows of all units in one table, whose `admin_id` column identifies their unit.
+        """
+        try:
+            media_type = negotiate_media_type(request)
+            if media_type in (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+                return columnar_response(
+                    await call(
+                        table,
+                        "summaries_by_admin_arrow",
+                        admin_ids=body.admin_ids,
+                        spatial_join_method=body.spatial_join_method,
+                        fields=body.fields,
+                        geometry=body.geometry,
+                    ),
+                    media_type,
+                )
+            return json_response(
+                await call(
+                    table,
+                    "summaries_by_admin",
+                    admin_ids=body.admin_ids,
+                    spatial_join_method=body.spatial_join_method,
+                    fields=body.fields,
+                    geometry=body.geometry,
+                ),
+                body.geometry_format,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    @app.post("/aggregate_by_admin", response_model=Dict[str, Dict[str, Any]])
+    async def get_aggregate_by_admin(
+        body: AdminAggregateRequest,
+        table: StatsTable = Depends(stats_table),
+    ):
+        """Aggregate Statistics for administrative units by id.
+
+        The cells of each unit are precomputed at ingest (see `space2stats-ingest-admin`),
+        and all units are aggregated with a single grouped query.
+
+        Parameters
+        ----------
+
+        <dl>
+        <dt>admin_ids</dt>
+        <dd>
+
+        `List[str]`
+
+        The ids of the administrative units, as loaded by the ingest, e.g. geoBoundaries `shapeID`s.
+        </dd>
+
+        <dt>spatial_join_method</dt>
+        <dd>
+
+        `["touches", "centroid", "within", "fractional"]`
+
+        The method to use for performing the spatial join between the units and H3 cells, `fractional` weighting the cells with the fraction of their area inside the unit, as in `/aggregate`
+        </dd>
+
+        <dt>fields</dt>
+        <dd>
+
+        `List[str]`
+
+        A list of field names to retrieve from the statistics table.
+        </dd>
+
+        <dt>aggregation_type</dt>
+        <dd>
+
+        `["sum", "avg", "count", "max", "min", "stddev", "weighted_avg", "p<percentile>"]` or a list of them
+
+        The manner in which to aggregate the statistics, see `/aggregate/batch`.
+        </dd>
+
+        <dt>weight_field</dt>
+        <dd>
+
+        `Optional[str]`
+
+        The field weighting the values of `weighted_avg`, e.g. a population count.
+        </dd>
+        </dl>
+
+        Returns
+        -------
+        `Dict[str, Dict[str, float]]`
+
+        The aggregated statistics of each unit, keyed by admin id. Unknown units and units covering no cell with statistics map to an empty object.
+        """
+        try:
+            return await call(
+                table,
+                "aggregate_by_admin",
+                admin_ids=body.admin_ids,
+                spatial_join_method=body.spatial_join_method,
+                fields=body.fields,
+                aggregation_type=body.aggregation_type,
+                weight_field=body.weight_field,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
     @app.get("/fields", response_model=List[str])
-    def fields(table: StatsTable = Depends(stats_table)):
+    async def fields(table: StatsTable = Depends(stats_table)):
         """Fields available in the statistics table"""
-        return table.fields()
+        return await call(table, "fields")
 
     @app.get("/metadata")
     def metadata_redirect():
@@ -335,10 +877,17 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
 
     @app.get("/health")
     def health():
-        return {"status": "ok"}
+        health = {"status": "ok"}
+        if polyfill_cache is not None:
+            health["polyfill_cache"] = polyfill_cache.stats()
+        if settings.PREPARE_STATEMENTS:
+            health["prepared_statements"] = prepared_statement_stats()
+        return health
 
     @app.get("/timeseries/fields", response_model=List[str])
-    def get_timeseries_fields(table: StatsTable = Depends(stats_table)):
+    async def get_timeseries_fields(
+        table: StatsTable = Depends(stats_table),
+    ):
         """Get available fields from the timeseries table.
 
         Returns
@@ -348,13 +897,18 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
         List of field names available in the timeseries table
         """
         try:
-            return table.timeseries_fields()
+            return await call(table, "timeseries_fields")
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    @app.post("/timeseries", response_model=List[Dict[str, Any]])
-    def get_timeseries(
-        body: TimeseriesRequest, table: StatsTable = Depends(stats_table)
+    @app.post(
+        "/timeseries",
+        response_model=List[Dict[str, Any]],
+        responses=COLUMNAR_RESPONSES,
+    )
+    async def get_timeseries(
+        body: TimeseriesRequest,
+        request: Request,
     ):
         """Get timeseries data for an area of interest.
 
@@ -412,29 +966,94 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
 
         Specifies if the H3 geometries should be included in the response. It can be either "polygon" or "point". If None, geometries are not included.
         </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
+
+        <dt>layout</dt>
+        <dd>
+
+        `["long", "cells", "wide", "array"]`
+
+        Shape of the JSON response:
+
+        - `long` (default): One row per hex ID and date
+        - `cells`: One record per hex ID, with its geometry once and its dated rows under `timeseries`
+        - `wide`: One record per hex ID, with a `{field}_{date}` key per field and date
+        - `array`: One record per hex ID, with the list of its dates under `date` and the values of each field, in the same order
+
+        `wide` and `array` are aggregated by the database, which sends one row per hex ID instead of one per date.
+        </dd>
+
+        <dt>temporal_resolution</dt>
+        <dd>
+
+        `Optional["month", "quarter", "year", "climatology"]`
+
+        If specified, the dates of each hex ID are grouped by period and their values reduced by `aggregation_type`:
+
+        - `month`, `quarter`, `year`: One row per calendar period, dated by its first day
+        - `climatology`: One row per month of the year over all years, numbered 1 to 12 under `month` instead of `date`
+        </dd>
+
+        <dt>aggregation_type</dt>
+        <dd>
+
+        `Union[str, List[str]]`
+
+        Aggregation reducing the values of each period: "sum", "avg" (default), "count", "max", "min", "stddev" or a percentile such as "p90". With a list of types, each field is returned once per type, suffixed with the type (e.g. `field1_max`). Ignored unless `temporal_resolution` or `spatial_aggregate` is set.
+        </dd>
+
+        <dt>spatial_aggregate</dt>
+        <dd>
+
+        `bool`
+
+        If true, all the hex IDs are reduced together into one row per period (or per date without `temporal_resolution`), without `hex_id`. Requires the `long` layout and no geometry.
+        </dd>
         </dl>
 
         Returns
         -------
         `List[Dict[str, Any]]`
 
-        List of dictionaries containing timeseries data for each hex ID and date
+        List of dictionaries containing timeseries data for each hex ID and date, or for each hex ID with the other layouts
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the same rows as an Arrow IPC stream or a Parquet file, with geometries encoded as WKB.
+        On deployments with streaming enabled, Arrow IPC and `Accept: application/x-ndjson` responses are streamed in batches of rows.
         """
         try:
-            return table.timeseries_data(
+            return await tabular_response(
+                request,
+                "timeseries_data",
                 aoi=body.aoi,
                 spatial_join_method=body.spatial_join_method,
                 start_date=body.start_date,
                 end_date=body.end_date,
                 fields=body.fields,
                 geometry=body.geometry,
+                geometry_format=body.geometry_format,
+                temporal_resolution=body.temporal_resolution,
+                aggregation_type=body.aggregation_type,
+                spatial_aggregate=body.spatial_aggregate,
+                json_kwargs={"layout": body.layout},
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
 
-    @app.post("/timeseries_by_hexids", response_model=List[Dict[str, Any]])
-    def get_timeseries_by_hexids(
-        body: HexIdTimeseriesRequest, table: StatsTable = Depends(stats_table)
+    @app.post(
+        "/timeseries_by_hexids",
+        response_model=List[Dict[str, Any]],
+        responses=COLUMNAR_RESPONSES,
+    )
+    async def get_timeseries_by_hexids(
+        body: HexIdTimeseriesRequest,
+        request: Request,
     ):
         """Get timeseries data for specific hex IDs.
 
@@ -480,21 +1099,81 @@ def build_app(settings: Optional[Settings] = None) -> FastAPI:
 
         Specifies if the H3 geometries should be included in the response. It can be either "polygon" or "point". If None, geometries are not included.
         </dd>
+
+        <dt>geometry_format</dt>
+        <dd>
+
+        `Literal["string", "object"]`
+
+        How geometries are embedded in JSON responses: "string" (default) holds the GeoJSON text of each geometry in a string, "object" nests it as a GeoJSON object.
+        </dd>
+
+        <dt>layout</dt>
+        <dd>
+
+        `["long", "cells", "wide", "array"]`
+
+        Shape of the JSON response:
+
+        - `long` (default): One row per hex ID and date
+        - `cells`: One record per hex ID, with its geometry once and its dated rows under `timeseries`
+        - `wide`: One record per hex ID, with a `{field}_{date}` key per field and date
+        - `array`: One record per hex ID, with the list of its dates under `date` and the values of each field, in the same order
+
+        `wide` and `array` are aggregated by the database, which sends one row per hex ID instead of one per date.
+        </dd>
+
+        <dt>temporal_resolution</dt>
+        <dd>
+
+        `Optional["month", "quarter", "year", "climatology"]`
+
+        If specified, the dates of each hex ID are grouped by period and their values reduced by `aggregation_type`:
+
+        - `month`, `quarter`, `year`: One row per calendar period, dated by its first day
+        - `climatology`: One row per month of the year over all years, numbered 1 to 12 under `month` instead of `date`
+        </dd>
+
+        <dt>aggregation_type</dt>
+        <dd>
+
+        `Union[str, List[str]]`
+
+        Aggregation reducing the values of each period: "sum", "avg" (default), "count", "max", "min", "stddev" or a percentile such as "p90". With a list of types, each field is returned once per type, suffixed with the type (e.g. `field1_max`). Ignored unless `temporal_resolution` or `spatial_aggregate` is set.
+        </dd>
+
+        <dt>spatial_aggregate</dt>
+        <dd>
+
+        `bool`
+
+        If true, all the hex IDs are reduced together into one row per period (or per date without `temporal_resolution`), without `hex_id`. Requires the `long` layout and no geometry.
+        </dd>
         </dl>
 
         Returns
         -------
         `List[Dict[str, Any]]`
 
-        List of dictionaries containing timeseries data for each hex ID and date
+        List of dictionaries containing timeseries data for each hex ID and date, or for each hex ID with the other layouts
+
+        Send `Accept: application/vnd.apache.arrow.stream` or `Accept: application/x-parquet` to receive the same rows as an Arrow IPC stream or a Parquet file, with geometries encoded as WKB.
+        On deployments with streaming enabled, Arrow IPC and `Accept: application/x-ndjson` responses are streamed in batches of rows.
         """
         try:
-            return table.timeseries_data_by_hexids(
+            return await tabular_response(
+                request,
+                "timeseries_data_by_hexids",
                 hex_ids=body.hex_ids,
                 start_date=body.start_date,
                 end_date=body.end_date,
                 fields=body.fields,
                 geometry=body.geometry,
+                geometry_format=body.geometry_format,
+                temporal_resolution=body.temporal_resolution,
+                aggregation_type=body.aggregation_type,
+                spatial_aggregate=body.spatial_aggregate,
+                json_kwargs={"layout": body.layout},
             )
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
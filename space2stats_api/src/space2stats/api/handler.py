@@ -13,7 +13,8 @@ from .app import build_app
 from .db import connect_to_db
 from .settings import Settings
 
-settings = Settings(DB_MAX_CONN_SIZE=1)  # disable connection pooling
+# disable connection pooling, and streaming as Mangum buffers the response body
+settings = Settings(DB_MAX_CONN_SIZE=1, STREAMING_ENABLED=False)
 app = build_app(settings)
 
 # AWS Lambda response payload limit (6MB)
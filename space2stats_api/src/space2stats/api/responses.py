@@ -0,0 +1,171 @@
+"""Columnar (Arrow IPC / Parquet) and streaming (NDJSON / Arrow batches) responses."""
+
+import io
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from ..h3_utils import wkb_to_geojson
+from ..model_types import GeometryFormat
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/x-parquet"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Media types that can be sent one record batch at a time
+STREAMING_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, NDJSON_MEDIA_TYPE)
+
+# OpenAPI description of the alternative content types of the tabular endpoints
+COLUMNAR_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {
+    200: {
+        "content": {
+            ARROW_STREAM_MEDIA_TYPE: {},
+            PARQUET_MEDIA_TYPE: {},
+            NDJSON_MEDIA_TYPE: {},
+        },
+        "description": "Rows as JSON, or as an Arrow IPC stream, a Parquet file or "
+        "newline-delimited JSON when requested through the `Accept` header.",
+    },
+    406: {"description": "Streaming responses are not enabled on this deployment."},
+}
+
+
+def negotiate_media_type(request: Request) -> Optional[str]:
+    """Return the columnar media type requested in the Accept header, if any."""
+    accept = request.headers.get("accept", "")
+    for media_type in (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, NDJSON_MEDIA_TYPE):
+        if media_type in accept:
+            return media_type
+    return None
+
+
+def columnar_response(table: pa.Table, media_type: str) -> Response:
+    """Serialize an Arrow table as an Arrow IPC stream or a Parquet file."""
+    sink = pa.BufferOutputStream()
+    if media_type == PARQUET_MEDIA_TYPE:
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return Response(content=sink.getvalue().to_pybytes(), media_type=media_type)
+
+
+def json_response(content: Any, geometry_format: GeometryFormat = "string") -> Any:
+    """Return JSON rows as is, or with their GeoJSON geometries as objects.
+
+    Geometries are generated as GeoJSON text. With the "object" format, each one
+    is wrapped in an `orjson.Fragment` and written into the body unchanged,
+    rather than being encoded again as an escaped string.
+    """
+    if geometry_format == "string":
+        return content
+    _wrap_geometries(content)
+    return ORJSONResponse(content)
+
+
+def _wrap_geometries(content: Any) -> None:
+    """Wrap the "geometry" strings of (nested) JSON rows in `orjson.Fragment`."""
+    values: Iterable[Any]
+    if isinstance(content, dict):
+        geometry = content.get("geometry")
+        if isinstance(geometry, str):
+            content["geometry"] = orjson.Fragment(geometry)
+        values = content.values()
+    elif isinstance(content, list):
+        values = content
+    else:
+        return
+    for value in values:
+        if isinstance(value, (dict, list)):
+            _wrap_geometries(value)
+
+
+async def streaming_response(
+    batches: Iterator[pa.RecordBatch],
+    media_type: str,
+    geometry_format: GeometryFormat = "string",
+) -> StreamingResponse:
+    """Stream record batches as an Arrow IPC stream or newline-delimited JSON.
+
+    The first batch is read before the response starts, so that errors raised
+    while validating the request or running the query are still reported with
+    a proper status code. Batches are read in the threadpool.
+    """
+    batches = iter(batches)
+    first = await run_in_threadpool(next, batches)
+    batches = chain([first], batches)
+
+    encoder: Union[_NdjsonEncoder, _ArrowStreamEncoder]
+    if media_type == NDJSON_MEDIA_TYPE:
+        encoder = _NdjsonEncoder(geometry_format)
+    else:
+        encoder = _ArrowStreamEncoder(first.schema)
+
+    return StreamingResponse(_encode(batches, encoder), media_type=media_type)
+
+
+def _encode(
+    batches: Iterator[pa.RecordBatch],
+    encoder: Union["_NdjsonEncoder", "_ArrowStreamEncoder"],
+) -> Iterator[bytes]:
+    """Encode record batches, read in the threadpool by `StreamingResponse`."""
+    for batch in batches:
+        yield encoder.write(batch)
+    tail = encoder.close()
+    if tail:
+        yield tail
+
+
+class _NdjsonEncoder:
+    """Encode each record batch as newline-delimited JSON rows.
+
+    WKB geometries are converted to GeoJSON, as in the JSON responses.
+    """
+
+    def __init__(self, geometry_format: GeometryFormat = "string"):
+        self.geometry_format = geometry_format
+
+    def write(self, batch: pa.RecordBatch) -> bytes:
+        rows = batch.to_pylist()
+        if "geometry" in batch.schema.names:
+            geometries: List[Any] = wkb_to_geojson(batch["geometry"])
+            if self.geometry_format == "object":
+                geometries = [orjson.Fragment(g) for g in geometries]
+            for row, geometry in zip(rows, geometries):
+                row["geometry"] = geometry
+        return b"".join(
+            orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows
+        )
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _ArrowStreamEncoder:
+    """Encode record batches as an Arrow IPC stream, one chunk per batch."""
+
+    def __init__(self, schema: pa.Schema):
+        self._buffer = io.BytesIO()
+        self._writer = pa.ipc.new_stream(self._buffer, schema)
+
+    def write(self, batch: pa.RecordBatch) -> bytes:
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        chunk = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return chunk
@@ -3,7 +3,14 @@ from typing import List, Literal, Optional
 from geojson_pydantic import Feature
 from pydantic import BaseModel
 
-from ..model_types import AoiModel
+from ..model_types import (
+    AggregationModel,
+    AoiCollectionModel,
+    AoiModel,
+    GeometryFormat,
+    TemporalResolution,
+    TimeseriesLayout,
+)
 
 
 class SummaryRequest(BaseModel):
@@ -11,25 +18,61 @@ class SummaryRequest(BaseModel):
     spatial_join_method: Literal["touches", "centroid", "within"]
     fields: List[str]
     geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
+
+
+class BatchSummaryRequest(BaseModel):
+    aois: AoiCollectionModel
+    spatial_join_method: Literal["touches", "centroid", "within"]
+    fields: List[str]
+    geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
 
 
 class HexIdSummaryRequest(BaseModel):
     hex_ids: List[str]
     fields: List[str]
     geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
 
 
 class AggregateRequest(BaseModel):
     aoi: Feature
-    spatial_join_method: Literal["touches", "centroid", "within"]
+    spatial_join_method: Literal["touches", "centroid", "within", "fractional"]
+    fields: List[str]
+    aggregation_type: AggregationModel
+    weight_field: Optional[str] = None
+
+
+class BatchAggregateRequest(BaseModel):
+    aois: AoiCollectionModel
+    spatial_join_method: Literal["touches", "centroid", "within", "fractional"]
     fields: List[str]
-    aggregation_type: Literal["sum", "avg", "count", "max", "min"]
+    aggregation_type: AggregationModel
+    weight_field: Optional[str] = None
 
 
 class HexIdAggregateRequest(BaseModel):
     hex_ids: List[str]
     fields: List[str]
-    aggregation_type: Literal["sum", "avg", "count", "max", "min"]
+    aggregation_type: AggregationModel
+    weight_field: Optional[str] = None
+
+
+class AdminSummaryRequest(BaseModel):
+    admin_ids: List[str]
+    spatial_join_method: Literal["touches", "centroid", "within"]
+    fields: List[str]
+    geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
+
+
+class AdminAggregateRequest(BaseModel):
+    admin_ids: List[str]
+    spatial_join_method: Literal["touches", "centroid", "within", "fractional"]
+    fields: List[str]
+    aggregation_type: AggregationModel
+    weight_field: Optional[str] = None
 
 
 class TimeseriesRequest(BaseModel):
@@ -39,6 +82,11 @@ class TimeseriesRequest(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
+    layout: TimeseriesLayout = "long"
+    temporal_resolution: Optional[TemporalResolution] = None
+    aggregation_type: AggregationModel = "avg"
+    spatial_aggregate: bool = False
 
 
 class HexIdTimeseriesRequest(BaseModel):
@@ -47,3 +95,8 @@ class HexIdTimeseriesRequest(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     geometry: Optional[Literal["polygon", "point"]] = None
+    geometry_format: GeometryFormat = "string"
+    layout: TimeseriesLayout = "long"
+    temporal_resolution: Optional[TemporalResolution] = None
+    aggregation_type: AggregationModel = "avg"
+    spatial_aggregate: bool = False
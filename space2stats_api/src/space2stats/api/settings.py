@@ -1,6 +1,19 @@
+from typing import Optional
+
 from ..settings import Settings as DbSettings
 
 
 class Settings(DbSettings):
-    # Bucket for large responses
-    S3_BUCKET_NAME: str
+    # Bucket for large responses (unset to disable offloading, e.g. when running in a container)
+    S3_BUCKET_NAME: Optional[str] = None
+
+    # Allow streaming NDJSON / Arrow record batch responses. Only enable where the
+    # response body is not buffered (i.e. not behind the Lambda handler)
+    STREAMING_ENABLED: bool = False
+
+    # Number of rows fetched from the server-side cursor per streamed batch
+    STREAMING_BATCH_SIZE: int = 10_000
+
+    # Number of worker threads running the queries of concurrent requests (at
+    # most this many requests are served at once). Size it with DB_MAX_CONN_SIZE
+    THREADPOOL_SIZE: int = 40
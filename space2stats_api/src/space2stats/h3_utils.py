@@ -1,10 +1,45 @@
-from typing import Any, Dict, List, Literal
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Literal, Optional, Protocol, Tuple
 
+import numpy as np
+import orjson
+import pyarrow as pa
+import shapely
 from arro3.core import Array
-from h3ronpy import ContainmentMode
-from h3ronpy.vector import cells_to_wkb_points, cells_to_wkb_polygons, geometry_to_cells
-from shapely import from_wkb, to_geojson
-from shapely.geometry import shape
+from h3ronpy import ContainmentMode, grid_disk
+from h3ronpy.vector import (
+    cells_to_coordinates,
+    cells_to_wkb_points,
+    cells_to_wkb_polygons,
+    geometry_to_cells,
+)
+from shapely import (
+    area,
+    boundary,
+    box,
+    contains_xy,
+    covers,
+    from_wkb,
+    get_parts,
+    intersection,
+    intersects,
+    make_valid,
+    normalize,
+    prepare,
+    to_wkb,
+)
+from shapely.geometry import MultiPolygon, shape
+from shapely.geometry.base import BaseGeometry
+
+logger = logging.getLogger(__name__)
 
 CONTAINMENT_MODE_MAP = {
     "centroid": ContainmentMode.ContainsCentroid,
@@ -12,40 +47,645 @@ CONTAINMENT_MODE_MAP = {
     "within": ContainmentMode.ContainsBoundary,
 }
 
+# Average edge length, in km, of the H3 cells of resolution 0. Each finer
+# resolution divides it by sqrt(7).
+_H3_RES0_EDGE_KM = 1107.712591
+_KM_PER_DEGREE = 111.32
+
+
+class PolyfillCacheBackend(Protocol):
+    """Shared store of polyfill results, as packed little-endian uint64 cells."""
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+
+class DiskCacheBackend:
+    """Polyfill results stored as files of a local directory.
+
+    Shared by the workers of a host, or by the warm invocations of a Lambda
+    container when the directory is under /tmp.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.path, key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.path)
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        os.replace(tmp_path, os.path.join(self.path, key))
+
+
+class RedisCacheBackend:
+    """Polyfill results stored in Redis, or any server speaking its protocol.
+
+    ``client`` only needs ``get(key)`` and ``set(key, value, ex=ttl)``.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: Optional[int] = 24 * 60 * 60,
+        prefix: str = "space2stats:polyfill:",
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "redis must be installed to use a Redis polyfill cache: "
+                "`python -m pip install redis`"
+            ) from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+
+def cache_backend_from_url(url: Optional[str]) -> Optional[PolyfillCacheBackend]:
+    """Shared polyfill cache backend for a ``file://`` or ``redis://`` URL."""
+    if not url:
+        return None
+    if url.startswith("file://"):
+        return DiskCacheBackend(url[len("file://") :])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend.from_url(url)
+    raise ValueError(f"Unsupported polyfill cache URL: {url}")
+
+
+class PolyfillCache:
+    """LRU cache of the cells covering a geometry, bounded by their size in bytes.
+
+    Entries are keyed by a hash of the normalized WKB geometry, the resolution
+    and the spatial join method. Misses of the in-process cache fall through to
+    an optional shared ``backend``, whose failures are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024**2,
+        backend: Optional[PolyfillCacheBackend] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Array]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(geom: Any, resolution: int, spatial_join_method: str) -> str:
+        """Canonical key of a polyfill, independent of ring orientation and start."""
+        wkb = to_wkb(normalize(geom), output_dimension=2, byte_order=1)
+        digest = hashlib.sha256(wkb).hexdigest()
+        return f"{digest}-{resolution}-{spatial_join_method}"
+
+    def get(self, key: str) -> Optional[Array]:
+        with self._lock:
+            cells = self._entries.get(key)
+            if cells is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cells
+
+        value = None
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                logger.warning("Polyfill cache backend get failed: %s", e)
+
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        cells = Array.from_numpy(np.frombuffer(value, dtype="<u8").astype(np.uint64))
+        self._store(key, cells)
+        with self._lock:
+            self.hits += 1
+        return cells
+
+    def set(self, key: str, cells: Array) -> None:
+        self._store(key, cells)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, cells.to_numpy().astype("<u8").tobytes())
+            except Exception as e:
+                logger.warning("Polyfill cache backend set failed: %s", e)
+
+    def _store(self, key: str, cells: Array) -> None:
+        if cells.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._entries[key] = cells
+            self._nbytes += cells.nbytes
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """Drop the in-process entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and size of the in-process cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def polyfill_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool polyfilling the parts of large AOIs.
+
+    Workers are spawned rather than forked, so that the threads of the parent
+    (e.g. those of a connection pool) are never copied into them.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _polyfill_wkb(wkb: bytes, resolution: int, spatial_join_method: str) -> np.ndarray:
+    """Cells of a WKB geometry, as uint64. Runs in the workers of the process pool."""
+    cells = geometry_to_cells(
+        from_wkb(wkb),
+        resolution,
+        containment_mode=CONTAINMENT_MODE_MAP[spatial_join_method],
+    )
+    return cells.to_numpy()
+
+
+def _split_geometry(
+    geom: BaseGeometry, resolution: int, tile_area: float
+) -> List[BaseGeometry]:
+    """Split a geometry into its parts, and the parts larger than ``tile_area``
+    (in square degrees) into tiles.
+
+    Each tile is grown by a margin wider than a cell on all sides, so that every
+    cell whose centroid falls in a tile is entirely covered by the grown tile.
+    The cells of the pieces are then the cells of the whole geometry, with
+    duplicates, whatever the containment mode.
+    """
+    parts = list(getattr(geom, "geoms", [geom]))
+    margin = 3 * _H3_RES0_EDGE_KM / math.sqrt(7) ** resolution / _KM_PER_DEGREE
+    size = math.sqrt(tile_area)
+
+    pieces = []
+    for part in parts:
+        if part.is_empty:
+            continue
+        if part.area <= tile_area:
+            pieces.append(part)
+            continue
+        minx, miny, maxx, maxy = part.bounds
+        nx = math.ceil((maxx - minx) / size)
+        ny = math.ceil((maxy - miny) / size)
+        tiles = []
+        for i in range(nx):
+            for j in range(ny):
+                y0 = miny + j * size
+                y1 = min(y0 + size, maxy)
+                # Degrees of longitude shrink with the cosine of the latitude
+                cos_lat = max(math.cos(math.radians(max(abs(y0), abs(y1)))), 0.01)
+                x0 = minx + i * size
+                x1 = min(x0 + size, maxx)
+                tiles.append(
+                    box(
+                        x0 - margin / cos_lat,
+                        y0 - margin,
+                        x1 + margin / cos_lat,
+                        y1 + margin,
+                    )
+                )
+        pieces.extend(tile for tile in intersection(part, tiles) if not tile.is_empty)
+    return pieces
+
+
+def simplify_tolerance(resolution: int) -> float:
+    """Tolerance, in degrees, of the simplification of AOIs polyfilled at ``resolution``.
+
+    A tenth of the average edge length of the cells: small enough for the cells
+    near the boundary to stay few, large enough to drop the vertices of detailed
+    outlines.
+    """
+    return 0.1 * _H3_RES0_EDGE_KM / math.sqrt(7) ** resolution / _KM_PER_DEGREE
+
+
+def _clean_geometry(geom: BaseGeometry) -> BaseGeometry:
+    """Valid polygonal part of a geometry, clipped to the lon/lat bounds."""
+    geom = make_valid(geom)
+    minx, miny, maxx, maxy = geom.bounds if not geom.is_empty else (0, 0, 0, 0)
+    if minx < -180 or miny < -90 or maxx > 180 or maxy > 90:
+        geom = intersection(geom, box(-180, -90, 180, 90))
+    # make_valid turns collapsed rings into lines and points, which have no cells
+    polygons = [part for part in get_parts(geom) if part.geom_type == "Polygon"]
+    return MultiPolygon(polygons) if len(polygons) != 1 else polygons[0]
+
+
+def _boundary_cells(
+    geom: BaseGeometry,
+    simplified: BaseGeometry,
+    cells: np.ndarray,
+    resolution: int,
+    spatial_join_method: str,
+) -> np.ndarray:
+    """Cells of ``geom``, from the ``cells`` of its simplification.
+
+    Only the cells near the boundary can differ: the simplified boundary stays
+    within a tenth of an edge of the original one, so these cells are the
+    neighbours of the cells it crosses. Those are tested against the original
+    geometry, and the others are kept.
+    """
+    line_cells = geometry_to_cells(
+        boundary(simplified),
+        resolution,
+        containment_mode=ContainmentMode.IntersectsBoundary,
+    )
+    candidates = np.unique(grid_disk(line_cells, 1, flatten=True).to_numpy())
+
+    prepare(geom)
+    if spatial_join_method == "centroid":
+        centroids = cells_to_coordinates(candidates)
+        keep = contains_xy(
+            geom, centroids["lng"].to_numpy(), centroids["lat"].to_numpy()
+        )
+    else:
+        polygons = from_wkb(cells_to_wkb_polygons(candidates))
+        predicate = intersects if spatial_join_method == "touches" else covers
+        keep = predicate(geom, polygons)
+
+    return np.union1d(np.setdiff1d(cells, candidates), candidates[keep])
+
+
+def _generate_cells(
+    geom: BaseGeometry,
+    resolution: int,
+    spatial_join_method: str,
+    executor: Optional[Executor],
+    parallel_min_area: float,
+    parallel_workers: Optional[int],
+) -> Array:
+    """Cells of a geometry, split across ``executor`` when it is large."""
+    if executor is None or geom.area <= parallel_min_area:
+        return geometry_to_cells(
+            geom,
+            resolution,
+            containment_mode=CONTAINMENT_MODE_MAP[spatial_join_method],
+        )
+
+    # Tracing the seams of the tiles has a cost of its own, so the AOI is
+    # only split into a couple of pieces per worker
+    workers = parallel_workers or os.cpu_count() or 1
+    tile_area = max(parallel_min_area, geom.area / (2 * workers))
+    pieces = _split_geometry(geom, resolution, tile_area)
+    arrays = list(
+        executor.map(
+            _polyfill_wkb,
+            [to_wkb(piece) for piece in pieces],
+            [resolution] * len(pieces),
+            [spatial_join_method] * len(pieces),
+        )
+    )
+    return Array.from_numpy(
+        np.unique(np.concatenate(arrays or [np.empty(0, dtype=np.uint64)]))
+    )
+
 
 def generate_h3_ids(
     aoi_geojson: Dict[str, Any],
     resolution: int,
     spatial_join_method: Literal["touches", "within", "centroid"] = "centroid",
+    cache: Optional[PolyfillCache] = None,
+    executor: Optional[Executor] = None,
+    parallel_min_area: float = 10.0,
+    parallel_workers: Optional[int] = None,
+    simplify: bool = False,
 ) -> Array:
     """
     Generate H3 IDs using h3ronpy's geometry_to_cells with the correct containment mode.
     Returns the H3 IDs in uint64 format for geometry creation.
+    Results are read from and stored in ``cache``, when given.
+
+    When an ``executor`` is given, AOIs larger than ``parallel_min_area`` square
+    degrees are split into their polygons, and those into a few tiles for each
+    of its ``parallel_workers`` (the CPU count if None, like `polyfill_executor`),
+    which are polyfilled by the executor and merged. Smaller AOIs are polyfilled
+    in the calling thread.
+
+    With ``simplify``, the AOI is made valid, clipped to the lon/lat bounds and
+    polyfilled from its simplification within `simplify_tolerance`. The cells
+    near its boundary are then checked against the unsimplified outline, so
+    detailed boundaries are polyfilled faster, into the same cells.
     """
     geom = shape(aoi_geojson)
-    containment_mode = CONTAINMENT_MODE_MAP.get(spatial_join_method)
 
-    if containment_mode is None:
+    if spatial_join_method not in CONTAINMENT_MODE_MAP:
         raise ValueError(f"Invalid spatial join method: {spatial_join_method}")
 
-    # Generate H3 IDs as uint64
-    h3_ids_uint64 = geometry_to_cells(
-        geom, resolution, containment_mode=containment_mode
-    )
+    if cache is not None:
+        key = cache.key(geom, resolution, spatial_join_method)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if simplify:
+        geom = _clean_geometry(geom)
+        simplified = shapely.simplify(
+            geom, simplify_tolerance(resolution), preserve_topology=True
+        )
+        cells = _generate_cells(
+            simplified,
+            resolution,
+            spatial_join_method,
+            executor,
+            parallel_min_area,
+            parallel_workers,
+        )
+        h3_ids_uint64 = Array.from_numpy(
+            _boundary_cells(
+                geom, simplified, cells.to_numpy(), resolution, spatial_join_method
+            )
+        )
+    else:
+        # Generate H3 IDs as uint64
+        h3_ids_uint64 = _generate_cells(
+            geom,
+            resolution,
+            spatial_join_method,
+            executor,
+            parallel_min_area,
+            parallel_workers,
+        )
+
+    if cache is not None:
+        cache.set(key, h3_ids_uint64)
 
     return h3_ids_uint64
 
 
-def generate_h3_geometries(
+def generate_h3_ids_batch(
+    aoi_geojsons: List[Dict[str, Any]],
+    resolution: int,
+    spatial_join_method: Literal["touches", "within", "centroid"] = "centroid",
+    cache: Optional[PolyfillCache] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    parallel_min_area: float = 10.0,
+    parallel_workers: Optional[int] = None,
+    simplify: bool = False,
+) -> List[Array]:
+    """
+    Generate the H3 IDs of several geometries, polyfilled concurrently.
+    Returns one array of uint64 H3 IDs per geometry, in the input order.
+    Large geometries are split across ``executor`` and detailed ones simplified
+    first, see `generate_h3_ids`.
+    """
+    if spatial_join_method not in CONTAINMENT_MODE_MAP:
+        raise ValueError(f"Invalid spatial join method: {spatial_join_method}")
+
+    if len(aoi_geojsons) <= 1:
+        return [
+            generate_h3_ids(
+                aoi,
+                resolution,
+                spatial_join_method,
+                cache,
+                executor=executor,
+                parallel_min_area=parallel_min_area,
+                parallel_workers=parallel_workers,
+                simplify=simplify,
+            )
+            for aoi in aoi_geojsons
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(
+            pool.map(
+                lambda aoi: generate_h3_ids(
+                    aoi,
+                    resolution,
+                    spatial_join_method,
+                    cache,
+                    executor=executor,
+                    parallel_min_area=parallel_min_area,
+                    parallel_workers=parallel_workers,
+                    simplify=simplify,
+                ),
+                aoi_geojsons,
+            )
+        )
+
+
+def generate_h3_weights(
+    aoi_geojson: Dict[str, Any],
+    resolution: int,
+    cache: Optional[PolyfillCache] = None,
+    executor: Optional[Executor] = None,
+    parallel_min_area: float = 10.0,
+    parallel_workers: Optional[int] = None,
+    simplify: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate the H3 IDs touching a geometry, weighted by the fraction of their area inside it.
+    Returns the uint64 H3 IDs and their weights, for the "fractional" spatial join.
+
+    The cells within the geometry are polyfilled with ``ContainsBoundary`` and
+    weigh 1, so only the remaining cells touching its boundary are intersected
+    with it, in a single vectorized call. Cells merely sharing an edge with the
+    geometry are dropped. See `generate_h3_ids` for the other parameters.
+    """
+    within, touches = (
+        generate_h3_ids(
+            aoi_geojson,
+            resolution,
+            spatial_join_method,
+            cache,
+            executor=executor,
+            parallel_min_area=parallel_min_area,
+            parallel_workers=parallel_workers,
+            simplify=simplify,
+        ).to_numpy()
+        for spatial_join_method in ("within", "touches")
+    )
+    edge_cells = np.setdiff1d(touches, within)
+
+    geom = _clean_geometry(shape(aoi_geojson))
+    prepare(geom)
+    fractions = np.minimum(
+        _area_fractions(geom, from_wkb(cells_to_wkb_polygons(edge_cells))), 1.0
+    )
+    overlapping = fractions > 0
+
+    cells = np.concatenate([within, edge_cells[overlapping]])
+    weights = np.concatenate([np.ones(len(within)), fractions[overlapping]])
+    return cells, weights
+
+
+def generate_h3_weights_batch(
+    aoi_geojsons: List[Dict[str, Any]],
+    resolution: int,
+    cache: Optional[PolyfillCache] = None,
+    max_workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    parallel_min_area: float = 10.0,
+    parallel_workers: Optional[int] = None,
+    simplify: bool = False,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Generate the weighted H3 IDs of several geometries, computed concurrently.
+    Returns the H3 IDs and weights of each geometry, in the input order, see
+    `generate_h3_weights`.
+    """
+
+    def weights(aoi: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        return generate_h3_weights(
+            aoi,
+            resolution,
+            cache,
+            executor=executor,
+            parallel_min_area=parallel_min_area,
+            parallel_workers=parallel_workers,
+            simplify=simplify,
+        )
+
+    if len(aoi_geojsons) <= 1:
+        return [weights(aoi) for aoi in aoi_geojsons]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(weights, aoi_geojsons))
+
+
+def _area_fractions(geom: BaseGeometry, polygons: np.ndarray) -> np.ndarray:
+    """Fraction of the planar area of each polygon inside ``geom``."""
+    return area(intersection(polygons, geom)) / area(polygons)
+
+
+def cell_overlap(
+    geom: BaseGeometry, cells: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fraction of the area of each cell inside ``geom``, and if its centroid is.
+
+    Areas are planar, in lon/lat degrees, which is accurate at the scale of a
+    cell. Only the cells ``geom`` does not cover are intersected with it, and
+    their fraction stays below 1, so that a fraction of 1 means "within".
+    """
+    cells = np.asarray(cells, dtype=np.uint64)
+    prepare(geom)
+    polygons = from_wkb(cells_to_wkb_polygons(cells))
+
+    fractions = np.ones(len(cells))
+    partial = ~covers(geom, polygons)
+    if partial.any():
+        overlap = _area_fractions(geom, polygons[partial])
+        fractions[partial] = np.minimum(overlap, np.nextafter(1.0, 0.0))
+
+    centroids = cells_to_coordinates(cells)
+    centroid = contains_xy(
+        geom, centroids["lng"].to_numpy(), centroids["lat"].to_numpy()
+    )
+    return fractions, centroid
+
+
+def generate_h3_wkb(
     h3_ids_uint64: List[int], geometry_type: Literal["polygon", "point"] = "polygon"
-) -> List[Dict]:
+) -> Array:
+    """
+    Generate the WKB geometries of H3 cells as an Arrow binary array.
+    """
     if geometry_type == "polygon":
-        wkb_geometries = cells_to_wkb_polygons(h3_ids_uint64)
+        return cells_to_wkb_polygons(h3_ids_uint64)
     elif geometry_type == "point":
-        wkb_geometries = cells_to_wkb_points(h3_ids_uint64)
+        return cells_to_wkb_points(h3_ids_uint64)
     else:
         raise ValueError(
             f"Invalid geometry type. Use 'polygon' or 'point', not {geometry_type}"
         )
 
-    return to_geojson(from_wkb(wkb_geometries))
+
+def wkb_to_geojson(wkb: Any) -> List[str]:
+    """
+    GeoJSON text of the WKB points or polygons of H3 cells, as an Arrow binary array.
+
+    The coordinates are read straight from the WKB buffer and written by a
+    single orjson call, then cut into one string per cell, without building
+    any shapely geometry.
+    """
+    if not isinstance(wkb, pa.Array):
+        wkb = pa.array(wkb)
+    if len(wkb) == 0:
+        return []
+    if not pa.types.is_large_binary(wkb.type):
+        wkb = wkb.cast(pa.large_binary())
+
+    _, offsets_buffer, data_buffer = wkb.buffers()
+    offsets = np.frombuffer(
+        offsets_buffer, dtype=np.int64, count=len(wkb) + 1, offset=wkb.offset * 8
+    )
+    data = np.frombuffer(data_buffer, dtype=np.uint8)
+
+    # Cells are little endian points (type 1) or single ring polygons (type 3),
+    # whose coordinates follow a 5 or 13 bytes header
+    is_polygon = data[offsets[0] + 1] == 3
+    starts = offsets[:-1] + (13 if is_polygon else 5)
+    lengths = offsets[1:] - starts
+    shift = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    coords = data[shift + np.arange(lengths.sum())].view("<f8").reshape(-1, 2)
+
+    # "[[x,y],[x,y],...]": each pair ends at a "]", the last one closes the list
+    text = orjson.dumps(coords, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    ends = np.flatnonzero(np.frombuffer(text.encode(), dtype=np.uint8) == 93)[:-1]
+    pair_starts = np.r_[1, ends[:-1] + 2]
+    bounds = np.r_[0, np.cumsum(lengths // 16)]
+    first = pair_starts[bounds[:-1]].tolist()
+    last = (ends[bounds[1:] - 1] + 1).tolist()
+
+    if is_polygon:
+        return [
+            '{"type":"Polygon","coordinates":[[' + text[i:j] + "]]}"
+            for i, j in zip(first, last)
+        ]
+    return [
+        '{"type":"Point","coordinates":' + text[i:j] + "}" for i, j in zip(first, last)
+    ]
+
+
+def generate_h3_geometries(
+    h3_ids_uint64: List[int], geometry_type: Literal["polygon", "point"] = "polygon"
+) -> List[str]:
+    """
+    Generate the GeoJSON geometries of H3 cells, as strings.
+    """
+    return wkb_to_geojson(generate_h3_wkb(h3_ids_uint64, geometry_type))
@@ -1,24 +1,528 @@
 import re
+import struct
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional
-
+from itertools import groupby
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    FrozenSet,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import psycopg as pg
+import pyarrow as pa
 from arro3.core import Array
-from geojson_pydantic import Feature
-from h3ronpy import cells_to_string
-from psycopg import Connection
-
-from .h3_utils import generate_h3_geometries, generate_h3_ids
-from .model_types import AoiModel
+from geojson_pydantic import Feature, FeatureCollection
+from h3ronpy import cells_parse, cells_resolution, cells_to_string, compact, uncompact
+from psycopg import Column, Connection
+
+from .h3_utils import (
+    PolyfillCache,
+    cache_backend_from_url,
+    generate_h3_geometries,
+    generate_h3_ids,
+    generate_h3_ids_batch,
+    generate_h3_weights,
+    generate_h3_weights_batch,
+    generate_h3_wkb,
+    polyfill_executor,
+)
+from .model_types import (
+    AggregationModel,
+    AoiCollectionModel,
+    AoiModel,
+    TemporalResolution,
+    TimeseriesLayout,
+)
 from .settings import Settings
 
 
+@dataclass
+class _CachedFields:
+    fields: List[str]
+    lookup: FrozenSet[str]
+    types: Dict[str, str]
+    hex_id_int8: bool
+    version: Optional[str]
+    expires_at: float
+
+
+# Process-wide cache of table columns, keyed by (database, table name)
+_FIELDS_CACHE: Dict[Tuple[str, str], _CachedFields] = {}
+_FIELDS_CACHE_LOCK = threading.Lock()
+
+
+# Columns of a table, with their types, in the order they were defined
+_FIELDS_QUERY = """
+    SELECT column_name, data_type
+    FROM information_schema.columns
+    WHERE table_name = %s
+    ORDER BY ordinal_position
+"""
+
+# Fingerprint of the columns of a table (NULL if it does not exist), cheap enough to
+# check on every request so that changes made by other processes are seen at once
+_FIELDS_VERSION_QUERY = """
+    SELECT md5(string_agg(attname || ' ' || atttypid::regtype, ',' ORDER BY attnum))
+    FROM pg_attribute
+    WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+"""
+
+
+def _get_cached_fields(key: Tuple[str, str]) -> Optional[_CachedFields]:
+    """Return the unexpired cached columns of a table, if any."""
+    with _FIELDS_CACHE_LOCK:
+        cached = _FIELDS_CACHE.get(key)
+    if cached is not None and cached.expires_at > time.monotonic():
+        return cached
+    return None
+
+
+def _cache_fields(
+    key: Tuple[str, str],
+    rows: List[Tuple[str, str]],
+    exclude: List[str],
+    ttl: float,
+    cache_missing: bool = False,
+    version: Optional[str] = None,
+) -> _CachedFields:
+    """Cache the columns of a table read with ``_FIELDS_QUERY``.
+
+    ``version`` is the fingerprint read with ``_FIELDS_VERSION_QUERY``, used to
+    tell when the cached columns no longer match the table.
+    """
+    columns = [row[0] for row in rows if row[0] not in exclude]
+    cached = _CachedFields(
+        fields=columns,
+        lookup=frozenset(columns),
+        types=dict(rows),
+        hex_id_int8=("hex_id", "bigint") in rows,
+        version=version,
+        expires_at=time.monotonic() + ttl,
+    )
+    if columns or cache_missing:
+        with _FIELDS_CACHE_LOCK:
+            _FIELDS_CACHE[key] = cached
+    return cached
+
+
+def refresh_fields_cache(table_name: Optional[str] = None) -> None:
+    """Invalidate cached table columns of this process.
+
+    Other processes, such as API workers, need not be told about schema changes:
+    each `StatsTable` compares the cached columns with the table before using them.
+
+    Parameters
+    ----------
+    table_name : Optional[str]
+        Only drop entries for this table. If None, the whole cache is cleared.
+    """
+    with _FIELDS_CACHE_LOCK:
+        if table_name is None:
+            _FIELDS_CACHE.clear()
+            return
+        for key in [k for k in _FIELDS_CACHE if k[1] == table_name]:
+            del _FIELDS_CACHE[key]
+
+
+_STATS_TABLE_EXCLUDE = ["hex_id", "ogc_fid"]
+_TIMESERIES_TABLE_EXCLUDE = ["hex_id", "date"]
+_ADMIN_TABLE_EXCLUDE = ["admin_id", "hex_id"]
+
+# Table of the cells of each administrative unit, built by the ingest
+ADMIN_TABLE_NAME = "space2stats_admin"
+
+# Condition on the rows of the admin table selecting the cells of each spatial
+# join method, from the fraction of each cell inside its unit
+_ADMIN_JOIN_FILTERS = {
+    "touches": "",
+    "centroid": "AND admin.centroid",
+    "within": "AND admin.fraction = 1",
+}
+
+# Timeseries layouts aggregated per cell by the database
+_ARRAY_LAYOUTS = ("wide", "array")
+
+# Column and SQL expression of the period of each temporal resolution
+_TEMPORAL_PERIODS = {
+    "month": ("date", "date_trunc('month', date)::date"),
+    "quarter": ("date", "date_trunc('quarter', date)::date"),
+    "year": ("date", "date_trunc('year', date)::date"),
+    "climatology": ("month", "extract(month FROM date)::int"),
+}
+
+_H3_IDS_TEMP_TABLE = "_space2stats_h3_ids"
+
+# Resolution of the cells of the statistics table
+H3_RESOLUTION = 6
+
+# Coarser resolutions with precomputed per-parent aggregates, see `rollup_table_name`
+ROLLUP_LEVELS = (3, 4, 5)
+
+# Partial aggregates kept for each field of the rollup tables, computed from the
+# statistics table rows by the aggregate of the same name, mapped to the function
+# merging the partials of child cells
+ROLLUP_PARTIALS = {"sum": "sum", "min": "min", "max": "max", "count": "sum"}
+
+# Partial aggregates needed to compute each aggregation type from the rollups
+_AGGREGATION_PARTIALS = {
+    "sum": ["sum"],
+    "avg": ["sum", "count"],
+    "count": ["count"],
+    "max": ["max"],
+    "min": ["min"],
+}
+
+# Aggregation types mapped to their SQL aggregate function, besides percentiles
+# ("p" followed by the percentile) and the weighted average
+_AGGREGATION_FUNCTIONS = {
+    "sum": "sum",
+    "avg": "avg",
+    "count": "count",
+    "max": "max",
+    "min": "min",
+    "stddev": "stddev_samp",
+}
+_PERCENTILE_PATTERN = re.compile(r"^p(100|\d{1,2}(?:\.\d+)?)$")
+WEIGHTED_AVG = "weighted_avg"
+
+# Spatial join weighting the cells touching an AOI by the fraction of their area
+# inside it, and the aggregation types it can weight
+FRACTIONAL: Final = "fractional"
+_FRACTIONAL_AGGREGATIONS = {"sum", "avg", "count", "max", "min", WEIGHTED_AVG}
+
+
+def _aggregation_types(aggregation_type: AggregationModel) -> List[str]:
+    """Validated list of the aggregations requested as one type or a list of types."""
+    aggregations = (
+        [aggregation_type]
+        if isinstance(aggregation_type, str)
+        else list(aggregation_type)
+    )
+    if not aggregations:
+        raise ValueError("aggregation_type cannot be empty")
+
+    invalid = [
+        a
+        for a in aggregations
+        if a not in _AGGREGATION_FUNCTIONS
+        and a != WEIGHTED_AVG
+        and not _PERCENTILE_PATTERN.match(a)
+    ]
+    if invalid:
+        raise ValueError(f"Invalid aggregation types: {invalid}")
+    if len(set(aggregations)) != len(aggregations):
+        raise ValueError(f"Duplicate aggregation types: {aggregations}")
+
+    return aggregations
+
+
+def aggregate_column_name(
+    field: str, aggregation: str, aggregation_type: AggregationModel
+) -> str:
+    """Name of the aggregate of ``field`` in the results of `StatsTable.aggregate`.
+
+    A single aggregation type keeps the field names, while the results of a list
+    of types are suffixed with their type, e.g. ``sum_pop_2020_p90``.
+    """
+    if isinstance(aggregation_type, str):
+        return field
+    return f"{field}_{aggregation}"
+
+
+def _aggregation_sql(
+    aggregation: str,
+    column: pg.sql.Composable,
+    weight: Optional[pg.sql.Composable] = None,
+    cell_weight: Optional[pg.sql.Composable] = None,
+) -> pg.sql.Composable:
+    """SQL expression aggregating ``column`` with a validated aggregation type.
+
+    With a ``cell_weight``, the fraction of each cell inside the AOI, sums and
+    counts add up that fraction of each cell and averages are weighted by it.
+    Minimums and maximums are taken over every cell.
+    """
+    if cell_weight is not None and aggregation in ("sum", "count", "avg", WEIGHTED_AVG):
+        if aggregation == "sum":
+            return pg.sql.SQL("sum({0} * {1})").format(column, cell_weight)
+        if aggregation == "count":
+            return pg.sql.SQL("sum({1}) FILTER (WHERE {0} IS NOT NULL)").format(
+                column, cell_weight
+            )
+        if aggregation == WEIGHTED_AVG:
+            cell_weight = pg.sql.SQL("{0} * {1}").format(weight, cell_weight)
+        return pg.sql.SQL(
+            "sum({0}::float8 * {1}) / nullif(sum({1}) FILTER (WHERE {0} IS NOT NULL), 0)"
+        ).format(column, cell_weight)
+
+    if aggregation == WEIGHTED_AVG:
+        return pg.sql.SQL(
+            "sum({0}::float8 * {1}) / nullif(sum({1}) FILTER (WHERE {0} IS NOT NULL), 0)"
+        ).format(column, weight)
+
+    percentile = _PERCENTILE_PATTERN.match(aggregation)
+    if percentile:
+        return pg.sql.SQL("percentile_cont({0}) WITHIN GROUP (ORDER BY {1})").format(
+            pg.sql.Literal(float(percentile.group(1)) / 100), column
+        )
+
+    return pg.sql.SQL("{0}({1})").format(
+        pg.sql.SQL(_AGGREGATION_FUNCTIONS[aggregation]), column
+    )
+
+
+def rollup_table_name(table_name: str, level: int) -> str:
+    """Name of the table holding the aggregates of ``table_name`` per level parent."""
+    return f"{table_name}_rollup_{level}"
+
+
+def rollup_column_name(field: str, partial: str) -> str:
+    """Name of the rollup table column holding a partial aggregate of ``field``."""
+    return f"{field}__{partial}"
+
+
+# Binary COPY framing, see https://www.postgresql.org/docs/current/sql-copy.html
+_COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_BINARY_TRAILER = struct.pack("!h", -1)
+_COPY_INT8_ROW = np.dtype([("ncols", ">i2"), ("size", ">i4"), ("value", ">i8")])
+
+
+_CREATE_H3_IDS_SQL = pg.sql.SQL(
+    "CREATE TEMP TABLE {0} (h3_id int8) ON COMMIT DROP"
+).format(pg.sql.Identifier(_H3_IDS_TEMP_TABLE))
+_COPY_H3_IDS_SQL = pg.sql.SQL("COPY {0} (h3_id) FROM STDIN (FORMAT BINARY)").format(
+    pg.sql.Identifier(_H3_IDS_TEMP_TABLE)
+)
+_ANALYZE_H3_IDS_SQL = pg.sql.SQL("ANALYZE {0}").format(
+    pg.sql.Identifier(_H3_IDS_TEMP_TABLE)
+)
+_DROP_H3_IDS_SQL = pg.sql.SQL("DROP TABLE {0}").format(
+    pg.sql.Identifier(_H3_IDS_TEMP_TABLE)
+)
+
+
+def _copy_h3_ids(cur: pg.Cursor, ids: np.ndarray, chunksize: int = 65_536) -> None:
+    """Stream int8 H3 ids into a fresh temporary table with a binary COPY."""
+    cur.execute(_CREATE_H3_IDS_SQL)
+    with cur.copy(_COPY_H3_IDS_SQL) as copy:
+        copy.write(_COPY_BINARY_HEADER)
+        for start in range(0, len(ids), chunksize):
+            chunk = ids[start : start + chunksize]
+            rows = np.empty(len(chunk), dtype=_COPY_INT8_ROW)
+            rows["ncols"] = 1
+            rows["size"] = 8
+            rows["value"] = chunk
+            copy.write(rows.tobytes())
+        copy.write(_COPY_BINARY_TRAILER)
+    cur.execute(_ANALYZE_H3_IDS_SQL)
+
+
+# Arrow types of the Postgres types found in the statistics tables, others are inferred
+_ARROW_TYPES = {
+    "bool": pa.bool_(),
+    "int2": pa.int16(),
+    "int4": pa.int32(),
+    "int8": pa.int64(),
+    "float4": pa.float32(),
+    "float8": pa.float64(),
+    "text": pa.string(),
+    "varchar": pa.string(),
+    "date": pa.date32(),
+}
+
+# GeoArrow extension metadata for WKB geometry columns
+_WKB_FIELD_METADATA = {
+    "ARROW:extension:name": "geoarrow.wkb",
+    "ARROW:extension:metadata": "{}",
+}
+
+
+# Name of the server-side cursor used to stream query results
+_STREAM_CURSOR_NAME = "_space2stats_stream"
+
+
+def _rows_to_record_batch(
+    rows: List[tuple], description: List[Column]
+) -> pa.RecordBatch:
+    """Build an Arrow record batch column by column from cursor rows."""
+    columns = list(zip(*rows)) if rows else [()] * len(description)
+    arrays = []
+    for values, desc in zip(columns, description):
+        pg_type = pg.postgres.types.get(desc.type_code)
+        arrow_type = _ARROW_TYPES.get(pg_type.name) if pg_type else None
+        arrays.append(pa.array(values, type=arrow_type))
+    return pa.record_batch(arrays, names=[desc.name for desc in description])
+
+
+def _rows_to_arrow(rows: List[tuple], description: List[Column]) -> pa.Table:
+    """Build an Arrow table column by column from cursor rows."""
+    return pa.Table.from_batches([_rows_to_record_batch(rows, description)])
+
+
+def _add_wkb_geometry(
+    data: Union[pa.Table, pa.RecordBatch],
+    geometry: Literal["polygon", "point"],
+    index: int,
+) -> Union[pa.Table, pa.RecordBatch]:
+    """Insert the WKB geometry of each ``hex_id`` as a ``geoarrow.wkb`` column."""
+    hex_id = data["hex_id"]
+    if isinstance(hex_id, pa.ChunkedArray):
+        hex_id = hex_id.combine_chunks()
+    wkb = pa.array(generate_h3_wkb(cells_parse(hex_id), geometry))
+    field = pa.field("geometry", wkb.type, metadata=_WKB_FIELD_METADATA)
+    return data.add_column(index, field, wkb)
+
+
+# Hot queries are registered per connection under (kind, table, fields,
+# aggregation type, variant), the variant covering anything else changing the
+# SQL, such as the hex_id storage type or the date filters.
+StatementKey = Tuple[
+    str, str, Tuple[str, ...], Union[None, str, Tuple[str, ...]], Tuple[Any, ...]
+]
+
+
+@dataclass
+class _PreparedStatement:
+    """A query rendered once for a connection and prepared on first execution."""
+
+    sql: str
+    hits: int = 0
+
+
+# Registry of each connection, dropped along with the connection
+_PREPARED_STATEMENTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_PREPARED_STATEMENTS_LOCK = threading.Lock()
+
+
+def _statement_registry(
+    conn: Any,
+) -> "OrderedDict[StatementKey, _PreparedStatement]":
+    """Prepared statements registered for a (sync or async) connection."""
+    with _PREPARED_STATEMENTS_LOCK:
+        registry = _PREPARED_STATEMENTS.get(conn)
+        if registry is None:
+            registry = _PREPARED_STATEMENTS[conn] = OrderedDict()
+        return registry
+
+
+def _execute_args(
+    query: Union[pg.sql.Composed, _PreparedStatement],
+) -> Tuple[Union[str, pg.sql.Composed], Optional[bool]]:
+    """Query and ``prepare`` argument of ``Cursor.execute`` for a statement."""
+    if isinstance(query, _PreparedStatement):
+        return query.sql, True
+    return query, None
+
+
+def _statement_aggregation(
+    aggregation_type: AggregationModel,
+) -> Union[str, Tuple[str, ...]]:
+    """Aggregation type(s) as part of a statement key."""
+    if isinstance(aggregation_type, str):
+        return aggregation_type
+    return tuple(aggregation_type)
+
+
+def prepared_statement_stats() -> Dict[str, int]:
+    """Number of prepared statements and of their reuses, over all connections."""
+    with _PREPARED_STATEMENTS_LOCK:
+        registries = list(_PREPARED_STATEMENTS.values())
+    statements = [stmt for registry in registries for stmt in registry.values()]
+    return {
+        "statements": len(statements),
+        "hits": sum(stmt.hits for stmt in statements),
+    }
+
+
+def polyfill_cache_from_settings(settings: Settings) -> Optional[PolyfillCache]:
+    """Polyfill cache configured by ``POLYFILL_CACHE_*``, or None if disabled."""
+    backend = cache_backend_from_url(settings.POLYFILL_CACHE_URL)
+    if not settings.POLYFILL_CACHE_MAX_BYTES and backend is None:
+        return None
+    return PolyfillCache(max_bytes=settings.POLYFILL_CACHE_MAX_BYTES, backend=backend)
+
+
+def polyfill_executor_from_settings(settings: Settings) -> Optional[Executor]:
+    """Process pool configured by ``POLYFILL_PROCESSES``, or None if disabled."""
+    if not settings.POLYFILL_PROCESSES:
+        return None
+    return polyfill_executor(settings.POLYFILL_PROCESSES)
+
+
+def _aoi_geometry(aoi: AoiModel) -> Dict[str, Any]:
+    """GeoJSON geometry of an area of interest, which a Feature may lack."""
+    if aoi.geometry is None:
+        raise ValueError("The AOI feature has no geometry")
+    return aoi.geometry.model_dump(exclude_none=True)
+
+
+def _format_timeseries_arrays(
+    rows: List[tuple],
+    colnames: List[str],
+    geometry: Optional[Literal["polygon", "point"]],
+    layout: TimeseriesLayout,
+) -> List[Dict[str, Any]]:
+    """Format timeseries rows aggregated per cell in the "wide" or "array" layout."""
+    geometries: Sequence[Optional[str]] = [None] * len(rows)
+    if geometry and rows:
+        geometries = generate_h3_geometries([int(row[0], 16) for row in rows], geometry)
+
+    fields = colnames[2:]
+    results = []
+    for row, cell_geometry in zip(rows, geometries):
+        result: Dict[str, Any] = {"hex_id": row[0]}
+        if geometry:
+            result["geometry"] = cell_geometry
+        if layout == "array":
+            result.update(zip(colnames[1:], row[1:]))
+        else:
+            dates = row[1]
+            for field, values in zip(fields, row[2:]):
+                result.update(
+                    (f"{field}_{date}", value) for date, value in zip(dates, values)
+                )
+        results.append(result)
+
+    return results
+
+
 @dataclass
 class StatsTable:
     conn: Connection
     table_name: str
     timeseries_table_name: str
+    admin_table_name: str = ADMIN_TABLE_NAME
+    fields_cache_ttl: float = 300
+    copy_ids_threshold: Optional[int] = 1_000
+    use_rollups: bool = True
+    polyfill_cache: Optional[PolyfillCache] = None
+    prepare_statements: bool = True
+    polyfill_executor: Optional[Executor] = None
+    polyfill_workers: Optional[int] = None
+    polyfill_parallel_min_area: float = 10.0
+    polyfill_simplify: bool = False
+
+    def __post_init__(self) -> None:
+        # Columns of the tables checked by this instance, see `_cached_fields`
+        self._checked_fields: Dict[str, _CachedFields] = {}
+        # Whether `polyfill_executor` was created by `connect` rather than shared
+        self._owns_executor = False
 
     @classmethod
     def connect(cls, settings: Optional[Settings] = None, **kwargs) -> "StatsTable":
@@ -32,11 +536,24 @@ class StatsTable:
         """
         settings = settings or Settings(**kwargs, _extra="forbid")
         conn = pg.connect(settings.DB_CONNECTION_STRING)
-        return cls(
+        table = cls(
             conn=conn,
             table_name=settings.PGTABLENAME,
             timeseries_table_name=settings.TIMESERIES_TABLE_NAME,
+            admin_table_name=settings.ADMIN_TABLE_NAME,
+            fields_cache_ttl=settings.FIELDS_CACHE_TTL,
+            copy_ids_threshold=settings.COPY_IDS_THRESHOLD,
+            use_rollups=settings.USE_ROLLUPS,
+            polyfill_cache=polyfill_cache_from_settings(settings),
+            prepare_statements=settings.PREPARE_STATEMENTS,
+            polyfill_executor=polyfill_executor_from_settings(settings),
+            polyfill_workers=settings.POLYFILL_PROCESSES,
+            polyfill_parallel_min_area=settings.POLYFILL_PARALLEL_MIN_AREA,
+            polyfill_simplify=settings.POLYFILL_SIMPLIFY,
         )
+        # Only an executor created here is shut down with the table
+        table._owns_executor = True
+        return table
 
     def __enter__(self) -> "StatsTable":
         return self
@@ -44,25 +561,121 @@ class StatsTable:
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         if self.conn:
             self.conn.close()
+        if self._owns_executor and self.polyfill_executor is not None:
+            self.polyfill_executor.shutdown()
 
     def fields(self) -> List[str]:
         """Get available fields from the statistics table."""
-        sql_query = """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = %s
+        return list(self._cached_fields(self.table_name, _STATS_TABLE_EXCLUDE).fields)
+
+    def refresh_fields(self) -> None:
+        """Drop the cached columns of the statistics, timeseries and admin tables."""
+        self._checked_fields.clear()
+        refresh_fields_cache(self.table_name)
+        refresh_fields_cache(self.timeseries_table_name)
+        refresh_fields_cache(self.admin_table_name)
+
+    def prepared_statements(self) -> Dict[StatementKey, int]:
+        """Prepared statements of this connection and how often each was reused.
+
+        Returns
+        -------
+        Dict[StatementKey, int]
+            Number of hits of each statement, keyed by (query kind, table,
+            fields, aggregation type, variant)
+        """
+        registry = _statement_registry(self.conn)
+        with _PREPARED_STATEMENTS_LOCK:
+            return {key: stmt.hits for key, stmt in registry.items()}
+
+    def _statement(
+        self, key: StatementKey, build: Callable[[], pg.sql.Composed]
+    ) -> Union[pg.sql.Composed, _PreparedStatement]:
+        """Internal method returning the statement registered for ``key``.
+
+        Statements are rendered once per connection and executed with
+        ``prepare=True``, so that repeated queries skip parsing and planning on
+        the server. The registry is bounded by the connection's
+        ``prepared_max``, like psycopg's own cache of prepared statements.
         """
+        if not self.prepare_statements:
+            return build()
+
+        registry = _statement_registry(self.conn)
+        with _PREPARED_STATEMENTS_LOCK:
+            statement = registry.get(key)
+            if statement is not None:
+                statement.hits += 1
+                registry.move_to_end(key)
+                return statement
+
+        statement = _PreparedStatement(build().as_string(self.conn))
+        with _PREPARED_STATEMENTS_LOCK:
+            registry[key] = statement
+            while len(registry) > (self.conn.prepared_max or len(registry)):
+                registry.popitem(last=False)
+        return statement
+
+    def _cached_fields(
+        self, table_name: str, exclude: List[str], cache_missing: bool = False
+    ) -> _CachedFields:
+        """Internal method returning the (cached) columns of a table.
+
+        The first use of a table by this instance checks the fingerprint of its
+        columns, and columns are only read again from ``information_schema`` when
+        it changed or at most ``fields_cache_ttl`` seconds later. Missing tables
+        are not cached unless ``cache_missing`` is set.
+        """
+        checked = self._checked_fields.get(table_name)
+        if checked is not None and checked.expires_at > time.monotonic():
+            return checked
 
+        key = (self.conn.info.dsn, table_name)
         with self.conn.cursor() as cur:
-            cur.execute(
-                sql_query,
-                [self.table_name],
-            )
-            columns = [
-                row[0] for row in cur.fetchall() if row[0] not in ["hex_id", "ogc_fid"]
-            ]
-
-        return columns
+            cur.execute(_FIELDS_VERSION_QUERY, [table_name])
+            row = cur.fetchone()
+            version = row[0] if row else None
+            cached = _get_cached_fields(key)
+            if cached is None or cached.version != version:
+                cur.execute(_FIELDS_QUERY, [table_name])
+                cached = _cache_fields(
+                    key,
+                    cur.fetchall(),
+                    exclude,
+                    self.fields_cache_ttl,
+                    cache_missing,
+                    version,
+                )
+
+        self._checked_fields[table_name] = cached
+        return cached
+
+    def _hex_id_int8(self, timeseries: bool = False) -> bool:
+        """Internal method checking if hex_id is stored as an int8 H3 index."""
+        if timeseries:
+            return self._cached_fields(
+                self.timeseries_table_name, _TIMESERIES_TABLE_EXCLUDE
+            ).hex_id_int8
+        return self._cached_fields(self.table_name, _STATS_TABLE_EXCLUDE).hex_id_int8
+
+    @staticmethod
+    def _hex_id_select(
+        hex_id_int8: bool, alias: Optional[str] = None
+    ) -> pg.sql.Composable:
+        """Internal method selecting hex_id as a hex string for any storage type."""
+        column = pg.sql.Identifier(*filter(None, [alias, "hex_id"]))
+        if hex_id_int8:
+            return pg.sql.SQL("to_hex({0}) AS hex_id").format(column)
+        return column
+
+    @staticmethod
+    def _h3_id_params(
+        h3_ids: Union[Sequence[int], np.ndarray, Array], hex_id_int8: bool
+    ) -> List:
+        """Internal method converting uint64 H3 ids to values comparable to hex_id."""
+        if hex_id_int8:
+            return np.asarray(h3_ids, dtype=np.uint64).astype(np.int64).tolist()
+        return cells_to_string(h3_ids).to_pylist()
 
     def summaries(
         self,
@@ -110,7 +723,7 @@ class StatsTable:
         if not rows:
             return []
 
-        return self._format_summaries(rows, colnames, fields, h3_ids, geometry)
+        return self._format_summaries(rows, colnames, fields, geometry)
 
     def summaries_by_hexids(
         self,
@@ -144,33 +757,176 @@ class StatsTable:
         if not rows:
             return []
 
-        return self._format_summaries(rows, colnames, fields, h3_ids, geometry)
+        return self._format_summaries(rows, colnames, fields, geometry)
 
-    def aggregate(
+    def summaries_arrow(
         self,
         aoi: AoiModel,
         spatial_join_method: Literal["touches", "centroid", "within"],
         fields: List[str],
-        aggregation_type: Literal["sum", "avg", "count", "max", "min"],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> pa.Table:
+        """Retrieve Statistics from a GeoJSON feature as an Arrow table.
+
+        Same as `summaries`, but the rows are assembled column by column into a
+        ``pyarrow.Table`` instead of one dictionary per H3 cell. Geometries are
+        returned as a WKB column tagged as ``geoarrow.wkb``.
+        """
+        if not isinstance(aoi, Feature):
+            aoi = AoiModel.model_validate(aoi)
+
+        self._validate_fields(fields)
+
+        h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
+
+        return self._summaries_arrow(fields, h3_ids, geometry)
+
+    def summaries_by_hexids_arrow(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> pa.Table:
+        """Retrieve statistics for specific hex IDs as an Arrow table.
+
+        See `summaries_arrow`.
+        """
+        self._validate_fields(fields)
+
+        return self._summaries_arrow(fields, [int(h, 16) for h in hex_ids], geometry)
+
+    def _summaries_arrow(
+        self,
+        fields: List[str],
+        h3_ids: Union[Sequence[int], np.ndarray, Array],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to fetch summaries into an Arrow table."""
+        rows, description = self._query_summaries(fields=fields, h3_ids=h3_ids)
+        return self._summaries_table(rows, description, geometry)
+
+    @staticmethod
+    def _summaries_table(
+        rows: List[tuple],
+        description: List[Column],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to build the Arrow table of summary rows."""
+        table = _rows_to_arrow(rows, description)
+
+        if geometry:
+            table = _add_wkb_geometry(table, geometry, 1)
+
+        return table
+
+    def summaries_batches(
+        self,
+        aoi: AoiModel,
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        batch_size: int = 10_000,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream statistics from a GeoJSON feature as Arrow record batches.
+
+        Same as `summaries_arrow`, but rows are read through a server-side cursor
+        ``batch_size`` rows at a time, so memory use does not grow with the AOI.
+        At least one (possibly empty) batch is yielded, which carries the schema.
+        The iterator holds a transaction open on the connection until exhausted.
+        """
+        if not isinstance(aoi, Feature):
+            aoi = AoiModel.model_validate(aoi)
+
+        self._validate_fields(fields)
+
+        h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
+
+        yield from self._summaries_batches(fields, h3_ids, geometry, batch_size)
+
+    def summaries_by_hexids_batches(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        batch_size: int = 10_000,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream statistics for specific hex IDs as Arrow record batches.
+
+        See `summaries_batches`.
+        """
+        self._validate_fields(fields)
+
+        yield from self._summaries_batches(
+            fields, [int(h, 16) for h in hex_ids], geometry, batch_size
+        )
+
+    def _summaries_batches(
+        self,
+        fields: List[str],
+        h3_ids: Union[Sequence[int], np.ndarray, Array],
+        geometry: Optional[Literal["polygon", "point"]],
+        batch_size: int,
+    ) -> Iterator[pa.RecordBatch]:
+        """Internal method to stream summaries as Arrow record batches."""
+        query, params = self._summaries_query(fields, h3_ids)
+        for batch in self._fetch_batches(query, params, batch_size):
+            yield _add_wkb_geometry(batch, geometry, 1) if geometry else batch
+
+    def aggregate(
+        self,
+        aoi: AoiModel,
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
     ) -> Dict[str, float]:
-        """Aggregate Statistics from a GeoJSON feature."""
+        """Aggregate Statistics from a GeoJSON feature.
+
+        With a list of aggregation types, the results are keyed by field and type
+        (see `aggregate_column_name`).
+
+        The "fractional" spatial join weights every cell touching the AOI by the
+        fraction of its area inside it (see `generate_h3_weights`): sums and
+        counts only add that fraction of the boundary cells, and averages are
+        area-weighted. It supports the "sum", "avg", "count", "max", "min" and
+        "weighted_avg" aggregation types.
+        """
         if not isinstance(aoi, Feature):
             aoi = AoiModel.model_validate(aoi)
 
         self._validate_fields(fields)
+        self._validate_aggregation(aggregation_type, weight_field, spatial_join_method)
+
+        if spatial_join_method == FRACTIONAL:
+            cells, weights = self._get_h3_weights_for_aoi(aoi)
+            if not len(cells):
+                return {}
+
+            rows, description = self._query(
+                *self._aggregate_fractional_query(
+                    cells, weights, fields, aggregation_type, weight_field
+                )
+            )
+            return dict(zip([desc.name for desc in description], rows[0]))
 
         h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
 
         if not h3_ids:
             return {}
 
-        return self._aggregate_by_h3_ids(h3_ids, fields, aggregation_type)
+        if self.use_rollups:
+            aggregated = self._aggregate_with_rollups(h3_ids, fields, aggregation_type)
+            if aggregated is not None:
+                return aggregated
+
+        return self._aggregate_by_h3_ids(h3_ids, fields, aggregation_type, weight_field)
 
     def aggregate_by_hexids(
         self,
         hex_ids: List[str],
         fields: List[str],
-        aggregation_type: Literal["sum", "avg", "count", "max", "min"],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
     ) -> Dict[str, float]:
         """Aggregate statistics for specific hex IDs.
 
@@ -180,8 +936,13 @@ class StatsTable:
             List of H3 hexagon IDs to aggregate
         fields : List[str]
             List of fields to aggregate
-        aggregation_type : Literal["sum", "avg", "count", "max", "min"]
-            Type of aggregation to perform
+        aggregation_type : AggregationModel
+            Type of aggregation to perform: "sum", "avg", "count", "max", "min",
+            "stddev", "weighted_avg" or a percentile such as "p90", or a list of
+            them, all computed in a single pass over the cells
+        weight_field : Optional[str]
+            Field weighting the values of the "weighted_avg" aggregation, e.g.
+            a population count
 
         Returns
         -------
@@ -189,111 +950,991 @@ class StatsTable:
             Dictionary containing aggregated statistics
         """
         self._validate_fields(fields)
+        self._validate_aggregation(aggregation_type, weight_field)
 
         # Convert hex_ids to integers
         h3_ids = [int(h, 16) for h in hex_ids]
 
-        return self._aggregate_by_h3_ids(h3_ids, fields, aggregation_type)
+        return self._aggregate_by_h3_ids(h3_ids, fields, aggregation_type, weight_field)
+
+    def summaries_batch(
+        self,
+        aois: Union[FeatureCollection, List[AoiModel]],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> Dict[str, List[Dict]]:
+        """Retrieve Statistics for each feature of a collection in a single query.
+
+        Parameters
+        ----------
+        aois : FeatureCollection or List[Feature]
+            The Areas of Interest. Features are identified by their ``id``, or by
+            their position in the collection when they have none.
+        spatial_join_method : ["touches", "centroid", "within"]
+            The method to use for performing the spatial join between the AOIs and H3 cells
+        fields : List[str]
+            A list of field names to retrieve from the statistics table
+        geometry : Optional["polygon", "point"]
+            Specifies if the H3 geometries should be included in the response
+
+        Returns
+        -------
+        Dict[str, List[Dict]]
+            The summaries of each feature, as returned by `summaries`, keyed by feature id
+        """
+        feature_ids, h3_ids = self._get_h3_ids_for_aois(aois, spatial_join_method)
+        self._validate_fields(fields)
+
+        table = self._summaries_batch_arrow(feature_ids, h3_ids, fields, None)
+
+        return self._summaries_batch_results(table, feature_ids, geometry)
+
+    def summaries_batch_arrow(
+        self,
+        aois: Union[FeatureCollection, List[AoiModel]],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> pa.Table:
+        """Retrieve Statistics for each feature of a collection as an Arrow table.
+
+        Same as `summaries_batch`, with the rows of all features in one table
+        whose first column, ``feature_id``, identifies their feature.
+        """
+        feature_ids, h3_ids = self._get_h3_ids_for_aois(aois, spatial_join_method)
+        self._validate_fields(fields)
+
+        return self._summaries_batch_arrow(feature_ids, h3_ids, fields, geometry)
+
+    def aggregate_batch(
+        self,
+        aois: Union[FeatureCollection, List[AoiModel]],
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Aggregate Statistics for each feature of a collection in a single query.
+
+        Parameters
+        ----------
+        aois : FeatureCollection or List[Feature]
+            The Areas of Interest. Features are identified by their ``id``, or by
+            their position in the collection when they have none.
+        spatial_join_method : ["touches", "centroid", "within", "fractional"]
+            The method to use for performing the spatial join between the AOIs and
+            H3 cells, "fractional" weighting the cells as in `aggregate`
+        fields : List[str]
+            List of fields to aggregate
+        aggregation_type : AggregationModel
+            Type of aggregation to perform: "sum", "avg", "count", "max", "min",
+            "stddev", "weighted_avg" or a percentile such as "p90", or a list of
+            them, all computed in a single pass over the cells
+        weight_field : Optional[str]
+            Field weighting the values of the "weighted_avg" aggregation, e.g.
+            a population count
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            The aggregated statistics of each feature, keyed by feature id.
+            Features covering no cell of the statistics table map to an empty dict.
+        """
+        h3_ids: Sequence[Union[Array, np.ndarray]]
+        weights = None
+        if spatial_join_method == FRACTIONAL:
+            feature_ids, h3_ids, weights = self._get_h3_weights_for_aois(aois)
+        else:
+            feature_ids, h3_ids = self._get_h3_ids_for_aois(aois, spatial_join_method)
+        self._validate_fields(fields)
+        self._validate_aggregation(aggregation_type, weight_field, spatial_join_method)
+
+        rows, description = self._query(
+            *self._aggregate_batch_query(
+                h3_ids, fields, aggregation_type, weight_field, weights
+            )
+        )
+
+        return self._aggregate_batch_results(rows, description, feature_ids)
+
+    def _aggregate_batch_query(
+        self,
+        h3_ids: Sequence[Union[Array, np.ndarray]],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+        weights: Optional[List[np.ndarray]] = None,
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the aggregation query of several AOIs.
+
+        With ``weights``, the cells of each AOI are weighted as in
+        `_aggregate_fractional_query`.
+        """
+        hex_id_int8 = self._hex_id_int8()
+        fractional = weights is not None
+
+        def build() -> pg.sql.Composed:
+            hex_id_type = pg.sql.SQL("int8" if hex_id_int8 else "text")
+            if fractional:
+                ids = pg.sql.SQL(
+                    "unnest(%s::int4[], %s::{0}[], %s::float8[])"
+                    " AS ids (feature, h3_id, weight)"
+                ).format(hex_id_type)
+                cell_weight = pg.sql.Identifier("ids", "weight")
+            else:
+                ids = pg.sql.SQL(
+                    "unnest(%s::int4[], %s::{0}[]) AS ids (feature, h3_id)"
+                ).format(hex_id_type)
+                cell_weight = None
+            return pg.sql.SQL(
+                """
+                    SELECT ids.feature, {0}
+                    FROM {2}
+                    JOIN {1} AS stats ON stats.hex_id = ids.h3_id
+                    GROUP BY ids.feature
+                """
+            ).format(
+                self._aggregate_select(
+                    fields,
+                    aggregation_type,
+                    weight_field,
+                    table_alias="stats",
+                    cell_weight=cell_weight,
+                ),
+                pg.sql.Identifier(self.table_name),
+                ids,
+            )
+
+        key = (
+            "aggregate_batch",
+            self.table_name,
+            tuple(fields),
+            _statement_aggregation(aggregation_type),
+        )
+        variant = (hex_id_int8, weight_field, fractional)
+        sql_query = self._statement((*key, variant), build)
+
+        params = self._batch_params(h3_ids, hex_id_int8)
+        if fractional:
+            params.append(
+                np.concatenate(weights or [np.empty(0)]).astype(np.float64).tolist()
+            )
+        return sql_query, params
+
+    @staticmethod
+    def _aggregate_batch_results(
+        rows: List[tuple], description: List[Column], feature_ids: List[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """Internal method keying the aggregates of several AOIs by feature id."""
+        colnames = [desc.name for desc in description]
+
+        results: Dict[str, Dict[str, float]] = {
+            feature_id: {} for feature_id in feature_ids
+        }
+        for row in rows:
+            results[feature_ids[row[0]]] = dict(zip(colnames[1:], row[1:]))
+
+        return results
+
+    def _summaries_batch_arrow(
+        self,
+        feature_ids: List[str],
+        h3_ids: List[Array],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to fetch the summaries of several AOIs in one query."""
+        rows, description = self._query(*self._summaries_batch_query(h3_ids, fields))
+        return self._summaries_batch_table(rows, description, feature_ids, geometry)
+
+    def _summaries_batch_query(
+        self, h3_ids: List[Array], fields: List[str]
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the summary query of several AOIs."""
+        hex_id_int8 = self._hex_id_int8()
+
+        def build() -> pg.sql.Composed:
+            cols = [
+                pg.sql.Identifier("ids", "feature"),
+                self._hex_id_select(hex_id_int8, "stats"),
+            ] + [pg.sql.Identifier("stats", c) for c in fields]
+            return pg.sql.SQL(
+                """
+                    SELECT {0}
+                    FROM unnest(%s::int4[], %s::{2}[])
+                        WITH ORDINALITY AS ids (feature, h3_id, ord)
+                    JOIN {1} AS stats ON stats.hex_id = ids.h3_id
+                    ORDER BY ids.ord
+                """
+            ).format(
+                pg.sql.SQL(", ").join(cols),
+                pg.sql.Identifier(self.table_name),
+                pg.sql.SQL("int8" if hex_id_int8 else "text"),
+            )
+
+        key = ("summaries_batch", self.table_name, tuple(fields), None)
+        sql_query = self._statement((*key, (hex_id_int8,)), build)
+
+        return sql_query, self._batch_params(h3_ids, hex_id_int8)
+
+    @staticmethod
+    def _summaries_batch_table(
+        rows: List[tuple],
+        description: List[Column],
+        feature_ids: List[str],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to build the Arrow table of the summaries of several AOIs."""
+        table = _rows_to_arrow(rows, description)
+        table = table.set_column(
+            0,
+            "feature_id",
+            pa.array(feature_ids, pa.string()).take(table["feature"]),
+        )
+
+        if geometry:
+            table = _add_wkb_geometry(table, geometry, 2)
+
+        return table
+
+    @staticmethod
+    def _summaries_batch_results(
+        table: pa.Table,
+        feature_ids: List[str],
+        geometry: Optional[Literal["polygon", "point"]],
+        id_column: str = "feature_id",
+    ) -> Dict[str, List[Dict]]:
+        """Internal method keying summary rows by feature id, with GeoJSON geometries.
+
+        The id of each row is read from its ``id_column``, the first column.
+        """
+        if geometry:
+            cells = cells_parse(table["hex_id"].combine_chunks())
+            table = table.add_column(
+                2, "geometry", pa.array(generate_h3_geometries(cells, geometry))
+            )
+
+        results: Dict[str, List[Dict]] = {feature_id: [] for feature_id in feature_ids}
+        for row in table.to_pylist():
+            results[row.pop(id_column)].append(row)
+
+        return results
+
+    def summaries_by_admin(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> Dict[str, List[Dict]]:
+        """Retrieve Statistics for administrative units from their precomputed cells.
+
+        The cells of each unit are read from the admin membership table built by
+        the ingest, so no boundary is uploaded or polyfilled.
+
+        Parameters
+        ----------
+        admin_ids : List[str]
+            Ids of the administrative units, as stored by the ingest (e.g. the
+            geoBoundaries ``shapeID``)
+        spatial_join_method : ["touches", "centroid", "within"]
+            The method to use for performing the spatial join between the units and H3 cells
+        fields : List[str]
+            A list of field names to retrieve from the statistics table
+        geometry : Optional["polygon", "point"]
+            Specifies if the H3 geometries should be included in the response
+
+        Returns
+        -------
+        Dict[str, List[Dict]]
+            The summaries of each unit, as returned by `summaries`, keyed by
+            admin id. Unknown units map to an empty list.
+        """
+        self._validate_fields(fields)
+        self._validate_admin_table()
+
+        rows, description = self._query(
+            *self._summaries_by_admin_query(admin_ids, spatial_join_method, fields)
+        )
+        table = self._summaries_by_admin_table(rows, description, None)
+
+        return self._summaries_batch_results(table, admin_ids, geometry, "admin_id")
+
+    def summaries_by_admin_arrow(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+    ) -> pa.Table:
+        """Retrieve Statistics for administrative units as an Arrow table.
+
+        Same as `summaries_by_admin`, with the rows of all units in one table
+        whose first column, ``admin_id``, identifies their unit.
+        """
+        self._validate_fields(fields)
+        self._validate_admin_table()
+
+        rows, description = self._query(
+            *self._summaries_by_admin_query(admin_ids, spatial_join_method, fields)
+        )
+        return self._summaries_by_admin_table(rows, description, geometry)
+
+    def aggregate_by_admin(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Aggregate Statistics for administrative units from their precomputed cells.
+
+        See `summaries_by_admin` and `aggregate_batch`. The units are aggregated
+        with a single grouped query. The "fractional" spatial join weights the
+        cells with the overlap fractions stored by the ingest.
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            The aggregated statistics of each unit, keyed by admin id. Unknown
+            units and units covering no cell map to an empty dict.
+        """
+        self._validate_fields(fields)
+        self._validate_aggregation(aggregation_type, weight_field, spatial_join_method)
+        self._validate_admin_table()
+
+        rows, description = self._query(
+            *self._aggregate_by_admin_query(
+                admin_ids, spatial_join_method, fields, aggregation_type, weight_field
+            )
+        )
+
+        return self._aggregate_by_admin_results(rows, description, admin_ids)
+
+    def _validate_admin_table(self) -> None:
+        """Validate that the admin membership table exists and matches hex_id."""
+        admin = self._cached_fields(self.admin_table_name, _ADMIN_TABLE_EXCLUDE)
+        if not admin.types:
+            raise ValueError(
+                f"Admin membership table {self.admin_table_name} does not exist"
+            )
+        if admin.hex_id_int8 != self._hex_id_int8():
+            raise ValueError(
+                f"hex_id of {self.admin_table_name} and {self.table_name} are "
+                "stored as different types, the admin table should be rebuilt"
+            )
+
+    @staticmethod
+    def _admin_join_filter(spatial_join_method: str) -> pg.sql.SQL:
+        """Internal method selecting the admin table rows of a spatial join method."""
+        if spatial_join_method not in _ADMIN_JOIN_FILTERS:
+            raise ValueError(f"Invalid spatial join method: {spatial_join_method}")
+        return pg.sql.SQL(_ADMIN_JOIN_FILTERS[spatial_join_method])
+
+    def _summaries_by_admin_query(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the summary query of administrative units."""
+        join_filter = self._admin_join_filter(spatial_join_method)
+        hex_id_int8 = self._hex_id_int8()
+
+        def build() -> pg.sql.Composed:
+            cols = [
+                pg.sql.Identifier("admin", "admin_id"),
+                self._hex_id_select(hex_id_int8, "stats"),
+            ] + [pg.sql.Identifier("stats", c) for c in fields]
+            return pg.sql.SQL(
+                """
+                    SELECT {0}
+                    FROM {1} AS admin
+                    JOIN {2} AS stats ON stats.hex_id = admin.hex_id
+                    WHERE admin.admin_id = ANY (%s) {3}
+                    ORDER BY admin.admin_id, admin.hex_id
+                """
+            ).format(
+                pg.sql.SQL(", ").join(cols),
+                pg.sql.Identifier(self.admin_table_name),
+                pg.sql.Identifier(self.table_name),
+                join_filter,
+            )
+
+        key = ("summaries_by_admin", self.table_name, tuple(fields), None)
+        variant = (hex_id_int8, spatial_join_method)
+        sql_query = self._statement((*key, variant), build)
+
+        return sql_query, [list(admin_ids)]
+
+    @staticmethod
+    def _summaries_by_admin_table(
+        rows: List[tuple],
+        description: List[Column],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to build the Arrow table of the summaries of admin units."""
+        table = _rows_to_arrow(rows, description)
+        if geometry:
+            table = _add_wkb_geometry(table, geometry, 2)
+        return table
+
+    def _aggregate_by_admin_query(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the aggregation query of administrative units."""
+        fractional = spatial_join_method == FRACTIONAL
+        join_filter = self._admin_join_filter(
+            "touches" if fractional else spatial_join_method
+        )
+
+        def build() -> pg.sql.Composed:
+            return pg.sql.SQL(
+                """
+                    SELECT admin.admin_id, {0}
+                    FROM {1} AS admin
+                    JOIN {2} AS stats ON stats.hex_id = admin.hex_id
+                    WHERE admin.admin_id = ANY (%s) {3}
+                    GROUP BY admin.admin_id
+                """
+            ).format(
+                self._aggregate_select(
+                    fields,
+                    aggregation_type,
+                    weight_field,
+                    table_alias="stats",
+                    cell_weight=(
+                        pg.sql.Identifier("admin", "fraction") if fractional else None
+                    ),
+                ),
+                pg.sql.Identifier(self.admin_table_name),
+                pg.sql.Identifier(self.table_name),
+                join_filter,
+            )
+
+        key = (
+            "aggregate_by_admin",
+            self.table_name,
+            tuple(fields),
+            _statement_aggregation(aggregation_type),
+        )
+        variant = (weight_field, spatial_join_method)
+        sql_query = self._statement((*key, variant), build)
+
+        return sql_query, [list(admin_ids)]
+
+    @staticmethod
+    def _aggregate_by_admin_results(
+        rows: List[tuple], description: List[Column], admin_ids: List[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """Internal method keying the aggregates of admin units by admin id."""
+        colnames = [desc.name for desc in description]
+
+        results: Dict[str, Dict[str, float]] = {admin_id: {} for admin_id in admin_ids}
+        for row in rows:
+            results[row[0]] = dict(zip(colnames[1:], row[1:]))
+
+        return results
+
+    def _batch_params(
+        self, h3_ids: Sequence[Union[Array, np.ndarray]], hex_id_int8: bool
+    ) -> List[Any]:
+        """Internal method flattening the H3 ids of each AOI into query parameters."""
+        features = np.repeat(
+            np.arange(len(h3_ids), dtype=np.int32), [len(ids) for ids in h3_ids]
+        )
+        cells = np.concatenate(
+            [np.asarray(ids, dtype=np.uint64) for ids in h3_ids]
+            or [np.empty(0, dtype=np.uint64)]
+        )
+        return [features.tolist(), self._h3_id_params(cells, hex_id_int8)]
 
     def _validate_fields(self, fields: List[str]) -> None:
         """Validate that requested fields exist in the database."""
-        invalid_fields = [field for field in fields if field not in self.fields()]
+        available = self._cached_fields(self.table_name, _STATS_TABLE_EXCLUDE).lookup
+        invalid_fields = [field for field in fields if field not in available]
         if invalid_fields:
             raise ValueError(f"Invalid fields: {invalid_fields}")
 
-    def _get_summaries(self, fields: List[str], h3_ids: List[int]):
-        """Internal method to fetch summaries from database."""
-        colnames = ["hex_id"] + fields
-        cols = [pg.sql.Identifier(c) for c in colnames]
-        sql_query = pg.sql.SQL(
-            """
-                SELECT {0}
-                FROM {1}
-                WHERE hex_id = ANY (%s)
-                ORDER BY array_position(%s, hex_id)
-            """
-        ).format(pg.sql.SQL(", ").join(cols), pg.sql.Identifier(self.table_name))
+    def _get_summaries(
+        self, fields: List[str], h3_ids: Union[Sequence[int], np.ndarray, Array]
+    ):
+        """Internal method to fetch summaries from database."""
+        rows, description = self._query_summaries(fields, h3_ids)
+        return rows, [desc.name for desc in description]
+
+    def _query_summaries(
+        self, fields: List[str], h3_ids: Union[Sequence[int], np.ndarray, Array]
+    ) -> Tuple[List[tuple], List[Column]]:
+        """Internal method to fetch summary rows and their description from database."""
+        return self._query(*self._summaries_query(fields, h3_ids))
+
+    def _query(
+        self,
+        query: Union[pg.sql.Composed, _PreparedStatement],
+        params: List[Any],
+    ) -> Tuple[List[tuple], List[Column]]:
+        """Internal method to fetch all rows of a query and their description."""
+        sql, prepare = _execute_args(query)
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params, prepare=prepare)
+            rows = cur.fetchall()
+            description = cur.description or []
+
+        return rows, description
+
+    def _summaries_query(
+        self, fields: List[str], h3_ids: Union[Sequence[int], np.ndarray, Array]
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the summary query and its parameters.
+
+        Rows are returned in the order of ``h3_ids`` by joining against the ids
+        unnested ``WITH ORDINALITY``, which stays linear in the number of cells.
+        """
+        hex_id_int8 = self._hex_id_int8()
+
+        def build() -> pg.sql.Composed:
+            cols = [self._hex_id_select(hex_id_int8, "stats")] + [
+                pg.sql.Identifier("stats", c) for c in fields
+            ]
+            return pg.sql.SQL(
+                """
+                    SELECT {0}
+                    FROM (
+                        SELECT h3_id, min(ord) AS ord
+                        FROM unnest(%s::{2}[]) WITH ORDINALITY AS input (h3_id, ord)
+                        GROUP BY h3_id
+                    ) AS ids
+                    JOIN {1} AS stats ON stats.hex_id = ids.h3_id
+                    ORDER BY ids.ord
+                """
+            ).format(
+                pg.sql.SQL(", ").join(cols),
+                pg.sql.Identifier(self.table_name),
+                pg.sql.SQL("int8" if hex_id_int8 else "text"),
+            )
+
+        key = ("summaries", self.table_name, tuple(fields), None)
+        sql_query = self._statement((*key, (hex_id_int8,)), build)
+
+        return sql_query, [self._h3_id_params(h3_ids, hex_id_int8)]
+
+    def _fetch_batches(
+        self,
+        query: Union[pg.sql.Composed, _PreparedStatement],
+        params: List[Any],
+        batch_size: int,
+    ) -> Iterator[pa.RecordBatch]:
+        """Internal method to stream query results through a server-side cursor.
+
+        A first batch is always yielded, empty if the query returned no rows.
+        Server-side cursors can't use prepared statements, only their SQL.
+        """
+        sql, _ = _execute_args(query)
+        with self.conn.transaction():
+            with self.conn.cursor(name=_STREAM_CURSOR_NAME) as cur:
+                cur.itersize = batch_size
+                cur.execute(sql, params)
+                description = cur.description or []
+
+                rows = cur.fetchmany(batch_size)
+                yield _rows_to_record_batch(rows, description)
+                while len(rows) == batch_size:
+                    rows = cur.fetchmany(batch_size)
+                    if rows:
+                        yield _rows_to_record_batch(rows, description)
+
+    def _format_summaries(
+        self,
+        rows: List[tuple],
+        colnames: List[str],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> List[Dict]:
+        """Internal method to format summary results.
+
+        Geometries are generated for the cells of the returned rows, as the ids
+        without statistics (or repeated) have no row.
+        """
+        summaries: List[Dict] = []
+        geometries = (
+            generate_h3_geometries([int(row[0], 16) for row in rows], geometry)
+            if geometry
+            else None
+        )
+
+        for idx, row in enumerate(rows):
+            summary = {"hex_id": row[0]}
+            if geometry and geometries is not None:
+                summary["geometry"] = geometries[idx]
+
+            summary.update(
+                {
+                    col: row[idx]
+                    for idx, col in enumerate(colnames[1:], start=1)
+                    if col in fields
+                }
+            )
+            summaries.append(summary)
+
+        return summaries
+
+    def _aggregate_by_h3_ids(
+        self,
+        h3_ids: List[int],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """Internal method to perform aggregation on H3 IDs."""
+        if self._copy_ids(h3_ids):
+            return self._aggregate_by_copied_h3_ids(
+                h3_ids, fields, aggregation_type, weight_field
+            )
+
+        rows, description = self._query(
+            *self._aggregate_query(h3_ids, fields, aggregation_type, weight_field)
+        )
+
+        # Create a dictionary to hold the aggregation results
+        aggregated_results: Dict[str, float] = {}
+        for idx, desc in enumerate(description):
+            aggregated_results[desc.name] = rows[0][idx]
+
+        return aggregated_results
+
+    def _copy_ids(self, h3_ids: List[int]) -> bool:
+        """Internal method checking if H3 ids should be sent through a COPY."""
+        return (
+            self.copy_ids_threshold is not None
+            and len(h3_ids) >= self.copy_ids_threshold
+        )
+
+    def _validate_aggregation(
+        self,
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str],
+        spatial_join_method: Optional[str] = None,
+    ) -> None:
+        """Validate the aggregation types and the weight field they may need."""
+        aggregations = _aggregation_types(aggregation_type)
+        if weight_field is not None:
+            self._validate_fields([weight_field])
+        elif WEIGHTED_AVG in aggregations:
+            raise ValueError(f"{WEIGHTED_AVG} requires a weight_field")
+
+        if spatial_join_method == FRACTIONAL:
+            unweighted = [a for a in aggregations if a not in _FRACTIONAL_AGGREGATIONS]
+            if unweighted:
+                raise ValueError(
+                    f"Aggregation types {unweighted} are not supported by the "
+                    f"{FRACTIONAL} spatial join method"
+                )
+
+    @staticmethod
+    def _aggregate_select(
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+        table_alias: Optional[str] = None,
+        cell_weight: Optional[pg.sql.Composable] = None,
+    ) -> pg.sql.Composable:
+        """Internal method building the aggregations of the statistics table fields.
+
+        Every aggregation type of every field is computed by the same SELECT, so
+        in a single pass over the cells. ``cell_weight`` is the column weighting
+        the cells of a "fractional" spatial join.
+        """
+
+        def column(name: str) -> pg.sql.Identifier:
+            return pg.sql.Identifier(*filter(None, [table_alias, name]))
+
+        weight = column(weight_field) if weight_field else None
+        return pg.sql.SQL(", ").join(
+            pg.sql.SQL("{0} AS {1}").format(
+                _aggregation_sql(aggregation, column(field), weight, cell_weight),
+                pg.sql.Identifier(
+                    aggregate_column_name(field, aggregation, aggregation_type)
+                ),
+            )
+            for field in fields
+            for aggregation in _aggregation_types(aggregation_type)
+        )
+
+    def _aggregate_query(
+        self,
+        h3_ids: List[int],
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the aggregation query over H3 ids bound as an array."""
+        # Convert H3 scalar objects to integers
+        h3_ids = [
+            scalar.as_py() if hasattr(scalar, "as_py") else scalar for scalar in h3_ids
+        ]
+
+        hex_id_int8 = self._hex_id_int8()
+
+        def build() -> pg.sql.Composed:
+            return pg.sql.SQL(
+                """
+                    SELECT {0}
+                    FROM {1}
+                    WHERE hex_id = ANY (%s)
+                """
+            ).format(
+                self._aggregate_select(fields, aggregation_type, weight_field),
+                pg.sql.Identifier(self.table_name),
+            )
+
+        key = (
+            "aggregate",
+            self.table_name,
+            tuple(fields),
+            _statement_aggregation(aggregation_type),
+        )
+        sql_query = self._statement((*key, (hex_id_int8, weight_field)), build)
 
-        # Convert h3_ids to strings
-        h3_id_strings = cells_to_string(h3_ids).to_pylist()
+        return sql_query, [self._h3_id_params(h3_ids, hex_id_int8)]
 
-        with self.conn.cursor() as cur:
-            cur.execute(
-                sql_query,
-                [h3_id_strings, h3_id_strings],
+    def _aggregate_fractional_query(
+        self,
+        h3_ids: np.ndarray,
+        weights: np.ndarray,
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to build the aggregation query over weighted H3 ids."""
+        hex_id_int8 = self._hex_id_int8()
+
+        def build() -> pg.sql.Composed:
+            return pg.sql.SQL(
+                """
+                    SELECT {0}
+                    FROM unnest(%s::{2}[], %s::float8[]) AS ids (h3_id, weight)
+                    JOIN {1} AS stats ON stats.hex_id = ids.h3_id
+                """
+            ).format(
+                self._aggregate_select(
+                    fields,
+                    aggregation_type,
+                    weight_field,
+                    table_alias="stats",
+                    cell_weight=pg.sql.Identifier("ids", "weight"),
+                ),
+                pg.sql.Identifier(self.table_name),
+                pg.sql.SQL("int8" if hex_id_int8 else "text"),
             )
-            rows = cur.fetchall()
-            colnames = [desc[0] for desc in cur.description]
 
-        return rows, colnames
+        key = (
+            "aggregate_fractional",
+            self.table_name,
+            tuple(fields),
+            _statement_aggregation(aggregation_type),
+        )
+        sql_query = self._statement((*key, (hex_id_int8, weight_field)), build)
+
+        return sql_query, [
+            self._h3_id_params(h3_ids, hex_id_int8),
+            np.asarray(weights, dtype=np.float64).tolist(),
+        ]
 
-    def _format_summaries(
+    def _aggregate_with_rollups(
         self,
-        rows: List[tuple],
-        colnames: List[str],
+        h3_ids: Array,
         fields: List[str],
-        h3_ids: List[int],
-        geometry: Optional[Literal["polygon", "point"]],
-    ) -> List[Dict]:
-        """Internal method to format summary results."""
-        summaries: List[Dict] = []
-        geometries = generate_h3_geometries(h3_ids, geometry) if geometry else None
+        aggregation_type: AggregationModel,
+    ) -> Optional[Dict[str, float]]:
+        """Internal method aggregating whole parent cells from the rollup tables.
+
+        The AOI cells are compacted and every parent cell is read from the
+        partial aggregates of the finest rollup level at or below its resolution,
+        so only the cells that do not compact are read from the statistics table.
+        Returns None when no rollup table holds the requested fields with the
+        hex_id type of the statistics table, or the cells do not compact at all.
+        """
+        query = self._rollup_aggregate_query(h3_ids, fields, aggregation_type)
+        if query is None:
+            return None
 
-        for idx, row in enumerate(rows):
-            summary = {"hex_id": row[0]}
-            if geometry and geometries is not None:
-                summary["geometry"] = geometries[idx]
+        rows, description = self._query(*query)
 
-            summary.update(
-                {
-                    col: row[idx]
-                    for idx, col in enumerate(colnames[1:], start=1)
-                    if col in fields
-                }
+        return dict(zip([desc.name for desc in description], rows[0]))
+
+    def _rollup_aggregate_query(
+        self,
+        h3_ids: Array,
+        fields: List[str],
+        aggregation_type: AggregationModel,
+    ) -> Optional[Tuple[pg.sql.Composed, List[Any]]]:
+        """Internal method to build the aggregation query over the rollup tables.
+
+        See `_aggregate_with_rollups`.
+        """
+        aggregations = _aggregation_types(aggregation_type)
+        if not all(a in _AGGREGATION_PARTIALS for a in aggregations):
+            return None
+
+        partials = list(
+            dict.fromkeys(p for a in aggregations for p in _AGGREGATION_PARTIALS[a])
+        )
+        columns = [rollup_column_name(f, p) for f in fields for p in partials]
+
+        # Rollups not yet rebuilt after a hex_id migration are skipped
+        hex_id_int8 = self._hex_id_int8()
+        rollups = {}
+        for level in ROLLUP_LEVELS:
+            rollup = self._cached_fields(
+                rollup_table_name(self.table_name, level),
+                ["hex_id"],
+                cache_missing=True,
             )
-            summaries.append(summary)
+            if rollup.lookup.issuperset(columns) and rollup.hex_id_int8 == hex_id_int8:
+                rollups[level] = rollup
+        if not rollups:
+            return None
+
+        cells = np.asarray(compact(h3_ids))
+        resolutions = np.asarray(cells_resolution(cells))
+        if (resolutions == H3_RESOLUTION).all():
+            return None
+
+        # Uncompact parents coarser than a rollup level to the nearest finer one
+        cells_by_level: Dict[int, List[np.ndarray]] = {}
+        for resolution in np.unique(resolutions).tolist():
+            level = min(
+                (level for level in rollups if level >= resolution),
+                default=H3_RESOLUTION,
+            )
+            group = cells[resolutions == resolution]
+            if level != resolution:
+                group = np.asarray(uncompact(group, level))
+            cells_by_level.setdefault(level, []).append(group)
+
+        parts = []
+        params = []
+        for level, groups in sorted(cells_by_level.items()):
+            if level == H3_RESOLUTION:
+                table_name = self.table_name
+                select = [
+                    pg.sql.SQL("{0}({1}) AS {2}").format(
+                        pg.sql.SQL(p),
+                        pg.sql.Identifier(f),
+                        pg.sql.Identifier(rollup_column_name(f, p)),
+                    )
+                    for f in fields
+                    for p in partials
+                ]
+            else:
+                table_name = rollup_table_name(self.table_name, level)
+                select = [
+                    pg.sql.SQL("{0}({1}) AS {1}").format(
+                        pg.sql.SQL(ROLLUP_PARTIALS[p]),
+                        pg.sql.Identifier(rollup_column_name(f, p)),
+                    )
+                    for f in fields
+                    for p in partials
+                ]
+            parts.append(
+                pg.sql.SQL("SELECT {0} FROM {1} WHERE hex_id = ANY (%s)").format(
+                    pg.sql.SQL(", ").join(select), pg.sql.Identifier(table_name)
+                )
+            )
+            params.append(self._h3_id_params(np.concatenate(groups), hex_id_int8))
+
+        # Merge the partials, casting back to the type of the aggregate over cells
+        types = next(iter(rollups.values())).types
+        merged = []
+        for field in fields:
+            for aggregation_name in aggregations:
+                partial = _AGGREGATION_PARTIALS[aggregation_name][0]
+                column = rollup_column_name(field, partial)
+                aggregation = pg.sql.SQL("{0}({1})::{2}").format(
+                    pg.sql.SQL(ROLLUP_PARTIALS[partial]),
+                    pg.sql.Identifier(column),
+                    pg.sql.SQL(types[column]),
+                )
+                if aggregation_name == "avg":
+                    aggregation = pg.sql.SQL("{0} / nullif(sum({1}), 0)").format(
+                        aggregation,
+                        pg.sql.Identifier(rollup_column_name(field, "count")),
+                    )
+                name = aggregate_column_name(field, aggregation_name, aggregation_type)
+                merged.append(
+                    pg.sql.SQL("{0} AS {1}").format(
+                        aggregation, pg.sql.Identifier(name)
+                    )
+                )
+
+        sql_query = pg.sql.SQL("SELECT {0} FROM ({1}) AS parts").format(
+            pg.sql.SQL(", ").join(merged),
+            pg.sql.SQL(" UNION ALL ").join(parts),
+        )
 
-        return summaries
+        return sql_query, params
 
-    def _aggregate_by_h3_ids(
+    def _aggregate_by_copied_h3_ids(
         self,
         h3_ids: List[int],
         fields: List[str],
-        aggregation_type: Literal["sum", "avg", "count", "max", "min"],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
     ) -> Dict[str, float]:
-        """Internal method to perform aggregation on H3 IDs."""
-        # Convert H3 scalar objects to integers
-        h3_ids = [
-            scalar.as_py() if hasattr(scalar, "as_py") else scalar for scalar in h3_ids
-        ]
+        """Internal method to aggregate over H3 IDs streamed into a temporary table.
+
+        The ids are sent as packed int8 values through ``COPY ... FORMAT BINARY``
+        and joined against the statistics table, so no per-id strings are built
+        in Python and no large array parameter is sent with the query.
+        """
+        ids = np.unique(np.asarray(h3_ids, dtype=np.uint64)).astype(np.int64)
+        sql_query = self._aggregate_copied_query(fields, aggregation_type, weight_field)
+
+        with self.conn.transaction(), self.conn.cursor() as cur:
+            _copy_h3_ids(cur, ids)
+            cur.execute(sql_query)
+            row = cur.fetchone() or ()
+            colnames = [desc.name for desc in cur.description or []]
+            cur.execute(_DROP_H3_IDS_SQL)
+
+        return dict(zip(colnames, row))
+
+    def _aggregate_copied_query(
+        self,
+        fields: List[str],
+        aggregation_type: AggregationModel,
+        weight_field: Optional[str] = None,
+    ) -> pg.sql.Composed:
+        """Internal method to build the aggregation query over the copied H3 ids."""
+        if self._hex_id_int8():
+            join_id = pg.sql.SQL("ids.h3_id")
+        else:
+            join_id = pg.sql.SQL("to_hex(ids.h3_id)")
 
-        # Prepare SQL aggregation query
-        aggregations = [f"{aggregation_type}({field}) AS {field}" for field in fields]
         sql_query = pg.sql.SQL(
             """
                 SELECT {0}
-                FROM {1}
-                WHERE hex_id = ANY (%s)
+                FROM {1} AS stats
+                JOIN {2} AS ids ON stats.hex_id = {3}
             """
         ).format(
-            pg.sql.SQL(", ").join(pg.sql.SQL(a) for a in aggregations),
+            self._aggregate_select(
+                fields, aggregation_type, weight_field, table_alias="stats"
+            ),
             pg.sql.Identifier(self.table_name),
+            pg.sql.Identifier(_H3_IDS_TEMP_TABLE),
+            join_id,
         )
 
-        with self.conn.cursor() as cur:
-            cur.execute(
-                sql_query,
-                [cells_to_string(h3_ids).to_pylist()],
-            )
-            row = cur.fetchone()
-            colnames = [desc[0] for desc in cur.description]
-
-        # Create a dictionary to hold the aggregation results
-        aggregated_results: Dict[str, float] = {}
-        for idx, col in enumerate(colnames):
-            aggregated_results[col] = row[idx]
-
-        return aggregated_results
+        return sql_query
 
     def timeseries_fields(self) -> List[str]:
         """Get available fields from the timeseries table.
@@ -303,19 +1944,11 @@ class StatsTable:
         List[str]
             List of field names available in the timeseries table
         """
-        sql_query = """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = %s
-        """
-
-        with self.conn.cursor() as cur:
-            cur.execute(sql_query, [self.timeseries_table_name])
-            columns = [
-                row[0] for row in cur.fetchall() if row[0] not in ["hex_id", "date"]
-            ]
-
-        return columns
+        return list(
+            self._cached_fields(
+                self.timeseries_table_name, _TIMESERIES_TABLE_EXCLUDE
+            ).fields
+        )
 
     def timeseries_data(
         self,
@@ -325,6 +1958,10 @@ class StatsTable:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         geometry: Optional[Literal["polygon", "point"]] = None,
+        layout: TimeseriesLayout = "long",
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
     ) -> List[Dict[str, Any]]:
         """Retrieve timeseries data for an area of interest.
 
@@ -342,16 +1979,36 @@ class StatsTable:
             End date for filtering data (format: 'YYYY-MM-DD')
         geometry : Optional[Literal["polygon", "point"]]
             If specified, includes H3 cell geometries in the response
+        layout : Literal["long", "cells", "wide", "array"]
+            "long" returns a row per hex ID and date. The others return a record
+            per hex ID, with its geometry once and either its rows under
+            "timeseries" ("cells"), a "{field}_{date}" key per field and date
+            ("wide"), or the list of its dates and of each field's values
+            ("array"). "wide" and "array" are aggregated by the database
+        temporal_resolution : Optional[Literal["month", "quarter", "year", "climatology"]]
+            If specified, the dates of each hex ID are grouped by month, quarter
+            or year, dated by their first day, or by month of the year
+            ("climatology"), numbered under "month" instead of "date"
+        aggregation_type : Union[str, List[str]]
+            Aggregation(s) reducing the values of each period, as in `aggregate`
+            but "weighted_avg" (default: "avg"). With a list of types, the
+            fields are suffixed with their type, e.g. "field1_max"
+        spatial_aggregate : bool
+            If True, all the hex IDs are reduced together into one row per period,
+            or per date without `temporal_resolution`. Only supported by the
+            "long" layout, without geometry
 
         Returns
         -------
         List[Dict[str, Any]]
-            List of dictionaries containing timeseries data for each hex ID and date
+            List of dictionaries containing timeseries data for each hex ID and date,
+            or for each hex ID with the "cells" layout
         """
         if not fields:
             raise ValueError("Fields parameter cannot be empty")
 
         self._validate_fields_ts(fields)
+        self._validate_spatial_aggregate(spatial_aggregate, geometry, layout)
 
         h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
 
@@ -364,6 +2021,10 @@ class StatsTable:
             start_date=start_date,
             end_date=end_date,
             geometry=geometry,
+            layout=layout,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
         )
 
     def timeseries_data_by_hexids(
@@ -373,6 +2034,10 @@ class StatsTable:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         geometry: Optional[Literal["polygon", "point"]] = None,
+        layout: TimeseriesLayout = "long",
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
     ) -> List[Dict[str, Any]]:
         """Retrieve timeseries data from the timeseries data table for specific hex IDs.
 
@@ -388,45 +2053,338 @@ class StatsTable:
             End date for filtering data (format: 'YYYY-MM-DD')
         geometry : Optional[Literal["polygon", "point"]]
             If specified, includes H3 cell geometries in the response
+        layout : Literal["long", "cells", "wide", "array"]
+            "long" returns a row per hex ID and date. The others return a record
+            per hex ID, with its geometry once and either its rows under
+            "timeseries" ("cells"), a "{field}_{date}" key per field and date
+            ("wide"), or the list of its dates and of each field's values
+            ("array"). "wide" and "array" are aggregated by the database
+        temporal_resolution : Optional[Literal["month", "quarter", "year", "climatology"]]
+            If specified, the dates of each hex ID are grouped by month, quarter
+            or year, dated by their first day, or by month of the year
+            ("climatology"), numbered under "month" instead of "date"
+        aggregation_type : Union[str, List[str]]
+            Aggregation(s) reducing the values of each period, as in `aggregate`
+            but "weighted_avg" (default: "avg"). With a list of types, the
+            fields are suffixed with their type, e.g. "field1_max"
+        spatial_aggregate : bool
+            If True, all the hex IDs are reduced together into one row per period,
+            or per date without `temporal_resolution`. Only supported by the
+            "long" layout, without geometry
 
         Returns
         -------
         List[Dict[str, Any]]
-            List of dictionaries containing timeseries data for each hex ID and date
+            List of dictionaries containing timeseries data for each hex ID and date,
+            or for each hex ID with the "cells" layout
         """
         # Validate that fields is not empty
         if not fields:
             raise ValueError("Fields parameter cannot be empty")
 
+        self._validate_spatial_aggregate(spatial_aggregate, geometry, layout)
+
+        rows, description = self._query_timeseries(
+            hex_ids,
+            fields,
+            start_date,
+            end_date,
+            arrays=layout in _ARRAY_LAYOUTS,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
+        )
+
+        return self._format_timeseries(rows, description, geometry, layout)
+
+    @staticmethod
+    def _format_timeseries(
+        rows: List[tuple],
+        description: List[Column],
+        geometry: Optional[Literal["polygon", "point"]],
+        layout: TimeseriesLayout = "long",
+    ) -> List[Dict[str, Any]]:
+        """Internal method to format timeseries results.
+
+        Rows are ordered by hex_id, so the dates of each cell are contiguous and
+        its geometry is generated once for all of them. The rows of the "wide"
+        and "array" layouts are already aggregated per cell.
+        """
+        colnames = [desc.name for desc in description]
+        if layout in _ARRAY_LAYOUTS:
+            return _format_timeseries_arrays(rows, colnames, geometry, layout)
+
+        # Climatologies are numbered by month instead of dated
+        date_idx = colnames.index("date") if "date" in colnames else None
+
+        cells = [
+            (hex_id, list(cell_rows))
+            for hex_id, cell_rows in groupby(rows, key=itemgetter(0))
+        ]
+        geometries: Sequence[Optional[str]] = [None] * len(cells)
+        if geometry and cells:
+            geometries = generate_h3_geometries(
+                [int(hex_id, 16) for hex_id, _ in cells], geometry
+            )
+
+        def record(row: tuple, start: int) -> Dict[str, Any]:
+            result = dict(zip(colnames[start:], row[start:]))
+            if date_idx is not None and row[date_idx]:
+                result["date"] = row[date_idx].isoformat()
+            return result
+
+        if layout == "cells":
+            results = []
+            for (hex_id, cell_rows), cell_geometry in zip(cells, geometries):
+                result: Dict[str, Any] = {"hex_id": hex_id}
+                if geometry:
+                    result["geometry"] = cell_geometry
+                result["timeseries"] = [record(row, 1) for row in cell_rows]
+                results.append(result)
+            return results
+
+        results = []
+        for (_, cell_rows), cell_geometry in zip(cells, geometries):
+            for row in cell_rows:
+                result = record(row, 0)
+                if geometry:
+                    result["geometry"] = cell_geometry
+                results.append(result)
+        return results
+
+    def timeseries_data_arrow(
+        self,
+        aoi: AoiModel,
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+    ) -> pa.Table:
+        """Retrieve timeseries data for an area of interest as an Arrow table.
+
+        Same as `timeseries_data`, but ``hex_id`` (and the WKB geometry, if
+        requested) are dictionary encoded so each cell is stored once rather than
+        once per date, and dates are kept as ``date32`` values.
+        """
+        if not fields:
+            raise ValueError("Fields parameter cannot be empty")
+
+        self._validate_fields_ts(fields)
+        self._validate_spatial_aggregate(spatial_aggregate, geometry)
+
+        h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
+
+        return self.timeseries_data_by_hexids_arrow(
+            hex_ids=cells_to_string(h3_ids).to_pylist(),
+            fields=fields,
+            start_date=start_date,
+            end_date=end_date,
+            geometry=geometry,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
+        )
+
+    def timeseries_data_by_hexids_arrow(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+    ) -> pa.Table:
+        """Retrieve timeseries data for specific hex IDs as an Arrow table.
+
+        See `timeseries_data_arrow`.
+        """
+        if not fields:
+            raise ValueError("Fields parameter cannot be empty")
+
+        self._validate_spatial_aggregate(spatial_aggregate, geometry)
+
+        rows, description = self._query_timeseries(
+            hex_ids,
+            fields,
+            start_date,
+            end_date,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
+        )
+
+        return self._timeseries_table(rows, description, geometry)
+
+    @staticmethod
+    def _timeseries_table(
+        rows: List[tuple],
+        description: List[Column],
+        geometry: Optional[Literal["polygon", "point"]],
+    ) -> pa.Table:
+        """Internal method to build the Arrow table of timeseries rows."""
+        table = _rows_to_arrow(rows, description)
+        if "hex_id" not in table.column_names:
+            return table
+
+        hex_id = table["hex_id"].combine_chunks().dictionary_encode()
+        table = table.set_column(0, "hex_id", hex_id)
+
+        if geometry:
+            cells = [int(h, 16) for h in hex_id.dictionary.to_pylist()]
+            wkb = pa.array(generate_h3_wkb(cells, geometry))
+            table = table.append_column(
+                "geometry", pa.DictionaryArray.from_arrays(hex_id.indices, wkb)
+            )
+
+        return table
+
+    def timeseries_data_batches(
+        self,
+        aoi: AoiModel,
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+        batch_size: int = 10_000,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream timeseries data for an area of interest as Arrow record batches.
+
+        See `summaries_batches`. Unlike `timeseries_data_arrow`, ``hex_id`` and the
+        geometry are plain columns, as the cells of later batches are not known
+        when the first one is sent.
+        """
+        if not fields:
+            raise ValueError("Fields parameter cannot be empty")
+
+        self._validate_fields_ts(fields)
+        self._validate_spatial_aggregate(spatial_aggregate, geometry)
+
+        h3_ids = self._get_h3_ids_for_aoi(aoi, spatial_join_method)
+
+        yield from self.timeseries_data_by_hexids_batches(
+            hex_ids=cells_to_string(h3_ids).to_pylist(),
+            fields=fields,
+            start_date=start_date,
+            end_date=end_date,
+            geometry=geometry,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
+            batch_size=batch_size,
+        )
+
+    def timeseries_data_by_hexids_batches(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+        batch_size: int = 10_000,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream timeseries data for specific hex IDs as Arrow record batches.
+
+        See `timeseries_data_batches`.
+        """
+        if not fields:
+            raise ValueError("Fields parameter cannot be empty")
+
+        self._validate_spatial_aggregate(spatial_aggregate, geometry)
+
+        query, params = self._timeseries_query(
+            hex_ids,
+            fields,
+            start_date,
+            end_date,
+            temporal_resolution=temporal_resolution,
+            aggregation_type=aggregation_type,
+            spatial_aggregate=spatial_aggregate,
+        )
+        for batch in self._fetch_batches(query, params, batch_size):
+            yield (
+                _add_wkb_geometry(batch, geometry, batch.num_columns)
+                if geometry
+                else batch
+            )
+
+    def _query_timeseries(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        arrays: bool = False,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+    ) -> Tuple[List[tuple], List[Column]]:
+        """Internal method to fetch timeseries rows from database."""
+        return self._query(
+            *self._timeseries_query(
+                hex_ids,
+                fields,
+                start_date,
+                end_date,
+                arrays,
+                temporal_resolution,
+                aggregation_type,
+                spatial_aggregate,
+            )
+        )
+
+    def _timeseries_query(
+        self,
+        hex_ids: List[str],
+        fields: List[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        arrays: bool = False,
+        temporal_resolution: Optional[TemporalResolution] = None,
+        aggregation_type: AggregationModel = "avg",
+        spatial_aggregate: bool = False,
+    ) -> Tuple[Union[pg.sql.Composed, _PreparedStatement], List[Any]]:
+        """Internal method to validate and build the timeseries query.
+
+        With ``arrays``, the rows of each cell are aggregated into one row
+        holding the ISO dates and the values of each field as arrays ordered
+        by date. With ``temporal_resolution`` or ``spatial_aggregate``, the rows
+        are first grouped by period (and cell, unless aggregated spatially)
+        with ``date_trunc``, and the fields reduced by ``aggregation_type``.
+        """
         # Validate fields and dates
         self._validate_fields_ts(fields)
         self._validate_date(start_date, "start_date")
         self._validate_date(end_date, "end_date")
         self._validate_date_range(start_date, end_date)
 
-        # Convert hex_ids to proper format if needed
-        h3_id_strings = [h for h in hex_ids]
-
-        # Build the query
-        field_identifiers = [pg.sql.Identifier(field) for field in fields]
-        select_fields = [
-            pg.sql.Identifier("hex_id"),
-            pg.sql.Identifier("date"),
-        ] + field_identifiers
+        resample = temporal_resolution is not None or spatial_aggregate
+        if resample:
+            self._validate_resampling(temporal_resolution, aggregation_type)
+        if spatial_aggregate and arrays:
+            raise ValueError("spatial_aggregate requires the long layout")
 
-        sql_query = pg.sql.SQL("""
-            SELECT {0}
-            FROM {2}
-            WHERE hex_id = ANY (%s)
-            {1}
-            ORDER BY hex_id, date
-        """).format(
-            pg.sql.SQL(", ").join(select_fields),
-            pg.sql.SQL(""),
-            pg.sql.Identifier(self.timeseries_table_name),
-        )
+        # Convert hex_ids to the storage type of the timeseries table
+        hex_id_int8 = self._hex_id_int8(timeseries=True)
+        h3_id_params: List[Any]
+        if hex_id_int8:
+            h3_id_params = [int(h, 16) for h in hex_ids]
+        else:
+            h3_id_params = list(hex_ids)
 
-        params: List[Any] = [h3_id_strings]
+        params: List[Any] = [h3_id_params]
 
         # Add date filters if specified
         where_clauses = []
@@ -437,9 +2395,32 @@ class StatsTable:
             where_clauses.append(pg.sql.SQL("AND date <= %s"))
             params.append(end_date)
 
-        # Add where clauses to query if they exist
-        if where_clauses:
-            sql_query = pg.sql.SQL("""
+        # Build the query
+        def build() -> pg.sql.Composed:
+            where = pg.sql.SQL(" ").join(where_clauses)
+            if resample:
+                return self._resampled_timeseries_query(
+                    hex_id_int8,
+                    fields,
+                    where,
+                    arrays,
+                    temporal_resolution,
+                    aggregation_type,
+                    spatial_aggregate,
+                )
+
+            if arrays:
+                source = pg.sql.SQL("{0} WHERE hex_id = ANY (%s) {1}").format(
+                    pg.sql.Identifier(self.timeseries_table_name), where
+                )
+                return self._timeseries_arrays_query(hex_id_int8, fields, source)
+
+            select_fields = [
+                self._hex_id_select(hex_id_int8),
+                pg.sql.Identifier("date"),
+            ] + [pg.sql.Identifier(field) for field in fields]
+
+            return pg.sql.SQL("""
                 SELECT {0}
                 FROM {2}
                 WHERE hex_id = ANY (%s)
@@ -447,47 +2428,160 @@ class StatsTable:
                 ORDER BY hex_id, date
             """).format(
                 pg.sql.SQL(", ").join(select_fields),
-                pg.sql.SQL(" ").join(where_clauses),
+                where,
                 pg.sql.Identifier(self.timeseries_table_name),
             )
 
-        # Execute the query
-        with self.conn.cursor() as cur:
-            cur.execute(sql_query, params)
-            rows = cur.fetchall()
-            colnames = [desc[0] for desc in cur.description]
-
-        # Generate geometries if requested
-        geometries = None
+        key = (
+            "timeseries",
+            self.timeseries_table_name,
+            tuple(fields),
+            _statement_aggregation(aggregation_type) if resample else None,
+        )
+        variant = (
+            hex_id_int8,
+            bool(start_date),
+            bool(end_date),
+            arrays,
+            temporal_resolution,
+            spatial_aggregate,
+        )
+        sql_query = self._statement((*key, variant), build)
+
+        return sql_query, params
+
+    @staticmethod
+    def _validate_resampling(
+        temporal_resolution: Optional[TemporalResolution],
+        aggregation_type: AggregationModel,
+    ) -> None:
+        """Validate the temporal resolution and the aggregation types reducing it."""
+        if (
+            temporal_resolution is not None
+            and temporal_resolution not in _TEMPORAL_PERIODS
+        ):
+            raise ValueError(f"Invalid temporal_resolution: {temporal_resolution}")
+        if WEIGHTED_AVG in _aggregation_types(aggregation_type):
+            raise ValueError(f"{WEIGHTED_AVG} is not supported by timeseries")
+
+    @staticmethod
+    def _validate_spatial_aggregate(
+        spatial_aggregate: bool,
+        geometry: Optional[Literal["polygon", "point"]],
+        layout: TimeseriesLayout = "long",
+    ) -> None:
+        """Validate the options of timeseries reduced over all their cells."""
+        if not spatial_aggregate:
+            return
         if geometry:
-            h3_ids_int = [int(h, 16) for h in hex_ids]
-            geometries = generate_h3_geometries(h3_ids_int, geometry)
+            raise ValueError("geometry cannot be requested with spatial_aggregate")
+        if layout != "long":
+            raise ValueError("spatial_aggregate requires the long layout")
 
-        # Format the results
-        results = []
-        for row in rows:
-            result = {}
-            for i, col in enumerate(colnames):
-                if col == "date" and row[i]:
-                    result[col] = row[i].isoformat()
-                else:
-                    result[col] = row[i]
+    def _resampled_timeseries_query(
+        self,
+        hex_id_int8: bool,
+        fields: List[str],
+        where: pg.sql.Composable,
+        arrays: bool,
+        temporal_resolution: Optional[TemporalResolution],
+        aggregation_type: AggregationModel,
+        spatial_aggregate: bool,
+    ) -> pg.sql.Composed:
+        """Internal method building the timeseries query grouped by period.
+
+        Every field is reduced by every aggregation type in a single pass, as in
+        `_aggregate_select`. The "wide" and "array" layouts aggregate the
+        periods of each cell from the grouped rows.
+        """
+        if temporal_resolution is None:
+            # Only spatially aggregated, each date is its own period
+            period, expression = "date", "date"
+        else:
+            period, expression = _TEMPORAL_PERIODS[temporal_resolution]
+        period_sql = pg.sql.SQL(expression)
+
+        group_by: List[pg.sql.Composable] = [period_sql]
+        select_fields = [
+            pg.sql.SQL("{0} AS {1}").format(period_sql, pg.sql.Identifier(period)),
+            self._aggregate_select(fields, aggregation_type),
+        ]
+        if not spatial_aggregate:
+            group_by.insert(0, pg.sql.Identifier("hex_id"))
+            select_fields.insert(
+                0,
+                pg.sql.Identifier("hex_id")
+                if arrays
+                else self._hex_id_select(hex_id_int8),
+            )
 
-            if geometry and geometries is not None:
-                hex_id = result["hex_id"]
-                if hex_id in hex_ids:
-                    hex_idx = hex_ids.index(hex_id)
-                    result["geometry"] = geometries[hex_idx]
+        query = pg.sql.SQL("""
+            SELECT {0}
+            FROM {1}
+            WHERE hex_id = ANY (%s)
+            {2}
+            GROUP BY {3}
+        """).format(
+            pg.sql.SQL(", ").join(select_fields),
+            pg.sql.Identifier(self.timeseries_table_name),
+            where,
+            pg.sql.SQL(", ").join(group_by),
+        )
+        if arrays:
+            columns = [
+                aggregate_column_name(field, aggregation, aggregation_type)
+                for field in fields
+                for aggregation in _aggregation_types(aggregation_type)
+            ]
+            source = pg.sql.SQL("({0}) AS periods").format(query)
+            return self._timeseries_arrays_query(hex_id_int8, columns, source, period)
 
-            results.append(result)
+        return pg.sql.SQL("{0} ORDER BY {1}").format(
+            query, pg.sql.SQL(", ").join(group_by)
+        )
 
-        return results
+    def _timeseries_arrays_query(
+        self,
+        hex_id_int8: bool,
+        columns: List[str],
+        source: pg.sql.Composable,
+        period: str = "date",
+    ) -> pg.sql.Composed:
+        """Internal method building the timeseries query aggregated per cell.
+
+        ``source`` is the FROM clause of the rows to aggregate, holding the
+        ``period`` of each row and the ``columns`` to aggregate by period.
+        """
+        order = pg.sql.Identifier(period)
+        dates: pg.sql.Composable
+        if period == "date":
+            dates = pg.sql.SQL("to_char(date, 'YYYY-MM-DD')")
+        else:
+            dates = order
+
+        select_fields = [
+            self._hex_id_select(hex_id_int8),
+            pg.sql.SQL("array_agg({0} ORDER BY {1}) AS {1}").format(dates, order),
+        ] + [
+            pg.sql.SQL("array_agg({0} ORDER BY {1}) AS {0}").format(
+                pg.sql.Identifier(column), order
+            )
+            for column in columns
+        ]
+
+        return pg.sql.SQL("""
+            SELECT {0}
+            FROM {1}
+            GROUP BY hex_id
+            ORDER BY hex_id
+        """).format(pg.sql.SQL(", ").join(select_fields), source)
 
     def _validate_fields_ts(self, fields: List[str]) -> None:
         """Validate that requested fields exist in the database."""
-        invalid_fields = [
-            field for field in fields if field not in self.timeseries_fields()
-        ]
+        available = self._cached_fields(
+            self.timeseries_table_name, _TIMESERIES_TABLE_EXCLUDE
+        ).lookup
+        invalid_fields = [field for field in fields if field not in available]
         if invalid_fields:
             raise ValueError(f"Invalid fields: {invalid_fields}")
 
@@ -547,9 +2641,108 @@ class StatsTable:
         # Get H3 ids from geometry
         resolution = 6
         h3_ids = generate_h3_ids(
-            aoi.geometry.model_dump(exclude_none=True),
+            _aoi_geometry(aoi),
             resolution,
             spatial_join_method,
+            cache=self.polyfill_cache,
+            executor=self.polyfill_executor,
+            parallel_min_area=self.polyfill_parallel_min_area,
+            parallel_workers=self.polyfill_workers,
+            simplify=self.polyfill_simplify,
         )
 
         return h3_ids
+
+    def _get_h3_weights_for_aoi(self, aoi: AoiModel) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the H3 IDs touching an area of interest and their weights.
+
+        See `generate_h3_weights`.
+        """
+        if not isinstance(aoi, Feature):
+            aoi = AoiModel.model_validate(aoi)
+
+        return generate_h3_weights(
+            _aoi_geometry(aoi),
+            H3_RESOLUTION,
+            cache=self.polyfill_cache,
+            executor=self.polyfill_executor,
+            parallel_min_area=self.polyfill_parallel_min_area,
+            parallel_workers=self.polyfill_workers,
+            simplify=self.polyfill_simplify,
+        )
+
+    def _get_h3_weights_for_aois(
+        self, aois: Union[FeatureCollection, List[AoiModel]]
+    ) -> Tuple[List[str], List[np.ndarray], List[np.ndarray]]:
+        """Get the ids, H3 IDs and H3 ID weights of the features of a collection.
+
+        See `_get_h3_ids_for_aois` and `generate_h3_weights`.
+        """
+        aois, feature_ids = self._feature_ids(aois)
+
+        weighted = generate_h3_weights_batch(
+            [_aoi_geometry(aoi) for aoi in aois.features],
+            H3_RESOLUTION,
+            cache=self.polyfill_cache,
+            executor=self.polyfill_executor,
+            parallel_min_area=self.polyfill_parallel_min_area,
+            parallel_workers=self.polyfill_workers,
+            simplify=self.polyfill_simplify,
+        )
+
+        return (
+            feature_ids,
+            [h3_ids for h3_ids, _ in weighted],
+            [weights for _, weights in weighted],
+        )
+
+    @staticmethod
+    def _feature_ids(
+        aois: Union[FeatureCollection, List[AoiModel]],
+    ) -> Tuple[FeatureCollection, List[str]]:
+        """Get a collection of AOIs and the unique id of each of its features."""
+        if not isinstance(aois, FeatureCollection):
+            aois = AoiCollectionModel(type="FeatureCollection", features=aois)
+
+        feature_ids = [
+            str(idx if aoi.id is None else aoi.id)
+            for idx, aoi in enumerate(aois.features)
+        ]
+        if len(set(feature_ids)) != len(feature_ids):
+            raise ValueError("Feature ids must be unique within a batch")
+
+        return aois, feature_ids
+
+    def _get_h3_ids_for_aois(
+        self,
+        aois: Union[FeatureCollection, List[AoiModel]],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+    ) -> Tuple[List[str], List[Array]]:
+        """Get the ids and H3 IDs of the features of a collection.
+
+        Parameters
+        ----------
+        aois : Union[FeatureCollection, List[Feature]]
+            The Areas of Interest
+        spatial_join_method : Literal["touches", "centroid", "within"]
+            The method to use for performing the spatial join
+
+        Returns
+        -------
+        Tuple[List[str], List[Array]]
+            The id of each feature, or its position when it has none, and its H3 IDs
+        """
+        aois, feature_ids = self._feature_ids(aois)
+
+        h3_ids = generate_h3_ids_batch(
+            [_aoi_geometry(aoi) for aoi in aois.features],
+            H3_RESOLUTION,
+            spatial_join_method,
+            cache=self.polyfill_cache,
+            executor=self.polyfill_executor,
+            parallel_min_area=self.polyfill_parallel_min_area,
+            parallel_workers=self.polyfill_workers,
+            simplify=self.polyfill_simplify,
+        )
+
+        return feature_ids, h3_ids
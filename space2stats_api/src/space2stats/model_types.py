@@ -1,6 +1,31 @@
-from typing import Dict, Union
+from typing import Dict, List, Literal, Union
 
-from geojson_pydantic import Feature, MultiPolygon, Polygon
-from typing_extensions import TypeAlias
+from geojson_pydantic import Feature, FeatureCollection, MultiPolygon, Polygon
+from pydantic import Field, StringConstraints
+from typing_extensions import Annotated, TypeAlias
 
 AoiModel: TypeAlias = Feature[Union[Polygon, MultiPolygon], Dict]
+AoiCollectionModel: TypeAlias = FeatureCollection[AoiModel]
+
+# An aggregate function, or a percentile written as "p" followed by the
+# percentile, e.g. "p90"
+Aggregation: TypeAlias = Union[
+    Literal["sum", "avg", "count", "max", "min", "stddev", "weighted_avg"],
+    Annotated[str, StringConstraints(pattern=r"^p(100|\d{1,2}(\.\d+)?)$")],
+]
+AggregationModel: TypeAlias = Union[
+    Aggregation, Annotated[List[Aggregation], Field(min_length=1)]
+]
+
+# Shape of JSON timeseries: one row per cell and date ("long"), or one record per
+# cell holding its geometry once and its dated rows ("cells"), a column per field
+# and date ("wide") or an array of the dates and of each field ("array")
+TimeseriesLayout: TypeAlias = Literal["long", "cells", "wide", "array"]
+
+# Period timeseries are grouped by: calendar months, quarters or years, or the
+# month of the year over all years ("climatology")
+TemporalResolution: TypeAlias = Literal["month", "quarter", "year", "climatology"]
+
+# How JSON responses embed the GeoJSON geometry of each cell: as a string holding
+# the GeoJSON text, or as a nested object
+GeometryFormat: TypeAlias = Literal["string", "object"]
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,9 @@ class Settings(BaseSettings):
     PGTABLENAME: str
     TIMESERIES_TABLE_NAME: str
 
+    # Table of the cells of each administrative unit, see space2stats-ingest-admin
+    ADMIN_TABLE_NAME: str = "space2stats_admin"
+
     # see https://www.psycopg.org/psycopg3/docs/api/pool.html#the-connectionpool-class for options
     DB_MIN_CONN_SIZE: int = 1
     DB_MAX_CONN_SIZE: int = 10
@@ -23,6 +28,35 @@ class Settings(BaseSettings):
     # Number of background worker threads used to maintain the pool state
     DB_NUM_WORKERS: int = 3
 
+    # Time, in seconds, that table columns are cached before information_schema is queried again.
+    # Schema changes are seen earlier: each request checks a fingerprint of the columns it uses.
+    FIELDS_CACHE_TTL: float = 300
+
+    # Number of H3 ids from which /aggregate streams the ids into a temporary table
+    # through a binary COPY instead of binding them as a text array (unset to disable)
+    COPY_IDS_THRESHOLD: Optional[int] = 1_000
+
+    # Read whole parent cells from the precomputed rollup tables in /aggregate, when they exist
+    USE_ROLLUPS: bool = True
+
+    # Size, in bytes, of the in-process cache of the cells covering each AOI (0 to disable)
+    POLYFILL_CACHE_MAX_BYTES: int = 64 * 1024**2
+
+    # Optional cache shared between processes: file:///path/to/dir or redis://host:port/db
+    POLYFILL_CACHE_URL: Optional[str] = None
+
+    # Number of worker processes polyfilling the AOIs larger than POLYFILL_PARALLEL_MIN_AREA
+    # square degrees, split into their polygons and tiles (0 to polyfill in the request thread)
+    POLYFILL_PROCESSES: int = 0
+    POLYFILL_PARALLEL_MIN_AREA: float = 10.0
+
+    # Polyfill a simplification of detailed AOIs, then check the cells along their boundary
+    POLYFILL_SIMPLIFY: bool = False
+
+    # Prepare the hot summary, aggregate and timeseries queries on each connection.
+    # Disable behind a pooler in transaction mode (e.g. PgBouncer < 1.21)
+    PREPARE_STATEMENTS: bool = True
+
     @property
     def DB_CONNECTION_STRING(self) -> str:
         host_port = f"host={self.PGHOST} port={self.PGPORT}"
@@ -1,11 +1,22 @@
 from functools import wraps
 
 import typer
+from space2stats.lib import ADMIN_TABLE_NAME
 
-from .main import load_parquet_to_db, load_parquet_to_db_ts
+from .main import (
+    TABLE_NAME,
+    build_rollup_tables,
+    load_admin_membership,
+    load_parquet_to_db,
+    load_parquet_to_db_ts,
+    migrate_hex_id_to_int8,
+)
 
 app = typer.Typer()
 app_ts = typer.Typer()
+app_migrate = typer.Typer()
+app_rollup = typer.Typer()
+app_admin = typer.Typer()
 
 
 def handle_errors(func):
@@ -30,14 +41,31 @@ def load(
     stac_item_path: str,  # Add the STAC metadata file path as an argument
     parquet_file: str,
     chunksize: int = 64_000,
+    hex_id_type: str = "text",  # "text" or "int8", used when creating the table
+    rollups: bool = False,  # Rebuild the rollup tables after loading
+    workers: int = 1,  # Parallel connections writing Parquet row groups
+    resume: bool = False,  # Skip row groups committed by an interrupted load
+    strategy: str = "update",  # "update" or "rebuild", how columns are added
 ):
     """
     Load a Parquet file into a PostgreSQL database after verifying columns with the STAC metadata.
     """
     typer.echo(f"Loading data into PostgreSQL database from {parquet_file}")
-    load_parquet_to_db(parquet_file, connection_string, stac_item_path, chunksize)
+    load_parquet_to_db(
+        parquet_file,
+        connection_string,
+        stac_item_path,
+        chunksize,
+        hex_id_type,
+        workers,
+        resume,
+        strategy,
+    )
     typer.echo("Data loaded successfully to PostgreSQL!")
 
+    if rollups:
+        _build_rollups(connection_string, TABLE_NAME)
+
 
 @app_ts.command()
 @handle_errors
@@ -47,12 +75,77 @@ def load_ts(
     table_name: str,
     parquet_file: str,
     chunksize: int = 64_000,
+    partition: bool = True,  # Partition a new table by year of its 'date' column
 ):
     """
     Load a Parquet file into a PostgreSQL database after verifying columns with the STAC metadata.
     """
     typer.echo(f"Loading data into PostgreSQL database from {parquet_file}")
     load_parquet_to_db_ts(
-        parquet_file, connection_string, stac_item_path, table_name, chunksize
+        parquet_file,
+        connection_string,
+        stac_item_path,
+        table_name,
+        chunksize,
+        partition,
     )
     typer.echo("Data loaded successfully to PostgreSQL!")
+
+
+@app_migrate.command()
+@handle_errors
+def migrate_hex_id(
+    connection_string: str,
+    table_name: str = TABLE_NAME,
+    batch_size: int = 100_000,
+    admin_table_name: str = ADMIN_TABLE_NAME,  # Admin membership table to convert
+):
+    """
+    Convert the text hex_id column of an existing table to an int8 primary key, online.
+    """
+    typer.echo(f"Migrating hex_id of {table_name} to int8")
+    migrate_hex_id_to_int8(connection_string, table_name, batch_size, admin_table_name)
+    typer.echo("hex_id migrated successfully!")
+
+
+def _build_rollups(connection_string: str, table_name: str):
+    typer.echo(f"Building rollup tables of {table_name}")
+    build_rollup_tables(connection_string, table_name)
+    typer.echo("Rollup tables built successfully!")
+
+
+@app_rollup.command()
+@handle_errors
+def rollup(
+    connection_string: str,
+    table_name: str = TABLE_NAME,
+):
+    """
+    Build the per-parent aggregate tables at H3 levels 3, 4 and 5 used by /aggregate.
+    """
+    _build_rollups(connection_string, table_name)
+
+
+@app_admin.command()
+@handle_errors
+def load_admin(
+    connection_string: str,
+    boundaries_file: str,  # GeoJSON FeatureCollection of the units, local or s3://
+    id_field: str = "shapeID",  # Property identifying each unit
+    table_name: str = ADMIN_TABLE_NAME,
+    chunksize: int = 64_000,
+    replace: bool = False,  # Drop the cells of all units not in the file
+):
+    """
+    Precompute the H3 cells of administrative units for /summary_by_admin and /aggregate_by_admin.
+    """
+    typer.echo(f"Loading administrative units from {boundaries_file}")
+    load_admin_membership(
+        connection_string,
+        boundaries_file,
+        id_field,
+        table_name,
+        chunksize=chunksize,
+        replace=replace,
+    )
+    typer.echo("Administrative units loaded successfully!")
@@ -1,29 +1,81 @@
-import tempfile
-from typing import Set
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import adbc_driver_postgresql.dbapi as pg
 import boto3
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
 import pyarrow.parquet as pq
+from h3ronpy import cells_parse, cells_to_string
+from psycopg import sql
 from pystac import Item, STACValidationError
+from shapely.geometry import shape
+from space2stats.h3_utils import cell_overlap, generate_h3_ids
+from space2stats.lib import (
+    ADMIN_TABLE_NAME,
+    H3_RESOLUTION,
+    ROLLUP_LEVELS,
+    ROLLUP_PARTIALS,
+    rollup_column_name,
+    rollup_table_name,
+)
 from tqdm import tqdm
 
 TABLE_NAME = "space2stats"
+CHECKPOINT_TABLE_NAME = f"{TABLE_NAME}_ingest_checkpoint"
+HEX_ID_TYPES = ("text", "int8")
+LOAD_STRATEGIES = ("update", "rebuild")
+NUMERIC_TYPES = ("smallint", "integer", "bigint", "real", "double precision", "numeric")
+
+
+def parquet_filesystem(file_path: str) -> Tuple[Optional[pafs.FileSystem], str]:
+    """Returns the filesystem and path to read a Parquet file from a local or S3 path.
+
+    S3 objects are read in place with ranged requests, so only the footer and the row
+    groups that are actually read are fetched, rather than downloading the whole file.
+    """
+    if file_path.startswith("s3://"):
+        return pafs.FileSystem.from_uri(file_path)
+    return None, file_path
 
 
 def read_parquet_file(file_path: str) -> pa.Table:
     """Reads a Parquet file either from a local path or an S3 path."""
-    if file_path.startswith("s3://"):
-        s3 = boto3.client("s3")
-        bucket, key = file_path[5:].split("/", 1)
-        with tempfile.NamedTemporaryFile() as tmp_file:
-            s3.download_file(bucket, key, tmp_file.name)
-            table = pq.read_table(tmp_file.name)
-    else:
-        table = pq.read_table(file_path)
+    filesystem, path = parquet_filesystem(file_path)
+    table = pq.read_table(path, filesystem=filesystem)
     return table.rename_columns([col.lower() for col in table.column_names])
 
 
+def read_parquet_schema(file_path: str) -> pa.Schema:
+    """Reads the schema of a Parquet file from its footer, with lowercased names."""
+    filesystem, path = parquet_filesystem(file_path)
+    schema = pq.read_schema(path, filesystem=filesystem)
+    return pa.schema([field.with_name(field.name.lower()) for field in schema])
+
+
+def hex_id_to_int8(table: pa.Table) -> pa.Table:
+    """Replaces the hex string 'hex_id' column with the int8 H3 cell index."""
+    cells = pa.array(cells_parse(table["hex_id"].combine_chunks()))
+    return table.set_column(
+        table.schema.get_field_index("hex_id"), "hex_id", cells.cast(pa.int64())
+    )
+
+
+def get_hex_id_type(connection_string: str, table_name: str) -> Optional[str]:
+    """Returns the data type of the 'hex_id' column, or None if the table does not exist."""
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT data_type
+                FROM information_schema.columns
+                WHERE table_name = '{table_name}' AND column_name = 'hex_id'
+            """)
+            row = cur.fetchone()
+    return row[0] if row else None
+
+
 def get_stac_fields_from_item(stac_item_path: str) -> Set[str]:
     item = Item.from_file(stac_item_path)
     columns = [c["name"].lower() for c in item.properties.get("table:columns")]
@@ -46,8 +98,7 @@ def verify_columns(
     ensures that 'hex_id' column is present, and checks that new columns don't already exist in the database."""
 
     # Read Parquet columns and STAC fields
-    parquet_table = read_parquet_file(parquet_file)
-    parquet_columns = set(parquet_table.column_names)
+    parquet_columns = set(read_parquet_schema(parquet_file).names)
     stac_fields = get_stac_fields_from_item(stac_item_path)
 
     # Check if 'hex_id' is present in the Parquet columns
@@ -90,59 +141,534 @@ def merge_tables(db_table: pa.Table, parquet_table: pa.Table) -> pa.Table:
     return db_table
 
 
-def load_parquet_to_db(
+def lowercase_columns(table: pa.Table) -> pa.Table:
+    """Lowercases the column names of an Arrow table."""
+    return table.rename_columns([col.lower() for col in table.column_names])
+
+
+def get_checkpoints(cur, table_name: str, parquet_file: str) -> Set[int]:
+    """Returns the row groups of a Parquet file already committed to a staging table."""
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE_NAME} (
+            table_name text NOT NULL,
+            parquet_file text NOT NULL,
+            row_group integer NOT NULL,
+            PRIMARY KEY (table_name, parquet_file, row_group)
+        )
+    """)
+    cur.execute(
+        f"SELECT row_group FROM {CHECKPOINT_TABLE_NAME} "
+        "WHERE table_name = $1 AND parquet_file = $2",
+        (table_name, parquet_file),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def clear_checkpoints(cur, table_name: str) -> None:
+    """Forgets the row groups committed to a staging table."""
+    cur.execute(
+        f"DELETE FROM {CHECKPOINT_TABLE_NAME} WHERE table_name = $1", (table_name,)
+    )
+
+
+def ingest_row_groups(
+    filesystem: Optional[pafs.FileSystem],
+    path: str,
     parquet_file: str,
     connection_string: str,
-    stac_item_path: str,
+    table_name: str,
+    row_groups: List[int],
+    chunksize: int,
+    hex_id_type: str,
+    pbar: tqdm,
+):
+    """Appends row groups of a Parquet file to a table over a single connection.
+
+    Each row group is streamed in batches of ``chunksize`` rows and committed together
+    with its checkpoint, so an interrupted load never leaves a row group half written.
+    """
+    parquet = pq.ParquetFile(path, filesystem=filesystem)
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            for row_group in row_groups:
+                for batch in parquet.iter_batches(
+                    batch_size=chunksize, row_groups=[row_group]
+                ):
+                    table = lowercase_columns(pa.Table.from_batches([batch]))
+                    if hex_id_type == "int8":
+                        table = hex_id_to_int8(table)
+                    cur.adbc_ingest(table_name, table, mode="append")
+                    with pbar.get_lock():
+                        pbar.update(table.num_rows)
+                cur.execute(
+                    f"INSERT INTO {CHECKPOINT_TABLE_NAME} "
+                    "(table_name, parquet_file, row_group) VALUES ($1, $2, $3)",
+                    (table_name, parquet_file, row_group),
+                )
+                conn.commit()
+
+
+def stage_parquet_file(
+    parquet_file: str,
+    connection_string: str,
+    table_name: str,
     chunksize: int = 64_000,
+    hex_id_type: str = "text",
+    workers: int = 1,
+    resume: bool = False,
 ):
-    """Main function to load and update data in PostgreSQL using Arrow in replace mode."""
-    validate_stac_item(stac_item_path)
-    verify_columns(parquet_file, stac_item_path, connection_string)
+    """Streams a Parquet file into a staging table through parallel connections.
 
-    # Check if the table already exists in the database
+    Row groups are split between ``workers`` connections, so memory is bounded by the
+    batch size rather than the file size. Committed row groups are recorded in a
+    checkpoint table: with ``resume``, a load of the same file into an existing staging
+    table skips them instead of starting over.
+    """
+    if workers < 1:
+        raise ValueError(f"Invalid number of workers: {workers}. Must be at least 1")
+
+    filesystem, path = parquet_filesystem(parquet_file)
+    metadata = pq.read_metadata(path, filesystem=filesystem)
+    schema = read_parquet_schema(parquet_file)
+    if hex_id_type == "int8":
+        schema = schema.set(
+            schema.get_field_index("hex_id"), pa.field("hex_id", pa.int64())
+        )
+
+    staged_hex_id_type = get_hex_id_type(connection_string, table_name)
     with pg.connect(connection_string) as conn:
         with conn.cursor() as cur:
-            cur.execute(f"SELECT to_regclass('{TABLE_NAME}');")
-            table_exists = cur.fetchone()[0] is not None
+            done = get_checkpoints(cur, table_name, parquet_file)
+            expected = "bigint" if hex_id_type == "int8" else "text"
+            if not resume or staged_hex_id_type != expected:
+                done = set()
+            if done:
+                print(f"Resuming after {len(done)} committed row groups")
+            else:
+                clear_checkpoints(cur, table_name)
+                cur.adbc_ingest(table_name, schema.empty_table(), mode="replace")
+        conn.commit()
 
-    if not table_exists:
-        # If the table does not exist, directly ingest the Parquet file in batches
-        parquet_table = read_parquet_file(parquet_file)
+    pending = [i for i in range(metadata.num_row_groups) if i not in done]
+    slices = [pending[i::workers] for i in range(workers) if pending[i::workers]]
+    with tqdm(
+        total=metadata.num_rows,
+        initial=sum(metadata.row_group(i).num_rows for i in done),
+        desc="Ingesting Data",
+        unit="rows",
+    ) as pbar, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                ingest_row_groups,
+                filesystem,
+                path,
+                parquet_file,
+                connection_string,
+                table_name,
+                row_groups,
+                chunksize,
+                hex_id_type,
+                pbar,
+            )
+            for row_groups in slices
+        ]
+        for future in futures:
+            future.result()
 
-        with pg.connect(connection_string) as conn, tqdm(
-            total=parquet_table.num_rows, desc="Ingesting Data", unit="rows"
-        ) as pbar:
-            with conn.cursor() as cur:
-                # Create an empty table with the same schema
-                cur.adbc_ingest(TABLE_NAME, parquet_table.slice(0, 0), mode="replace")
 
-                for batch in parquet_table.to_batches(max_chunksize=chunksize):
-                    cur.adbc_ingest(TABLE_NAME, batch, mode="append")
-                    pbar.update(batch.num_rows)
+# Objects a copy of the table would not keep, which the swap would drop or break
+REBUILD_BLOCKERS_QUERY = """
+    SELECT 'it is partitioned' FROM pg_class
+    WHERE oid = $1::regclass AND relkind = 'p'
+    UNION ALL
+    SELECT 'it has inheritance children or parents' FROM pg_inherits
+    WHERE inhrelid = $1::regclass OR inhparent = $1::regclass
+    UNION ALL
+    SELECT DISTINCT 'view ' || rule.ev_class::regclass::text || ' depends on it'
+    FROM pg_depend AS dep
+    JOIN pg_rewrite AS rule ON rule.oid = dep.objid
+    WHERE dep.classid = 'pg_rewrite'::regclass
+    AND dep.refobjid = $1::regclass
+    AND rule.ev_class <> $1::regclass
+    UNION ALL
+    SELECT 'foreign key ' || conname || ' of ' || conrelid::regclass::text
+        || ' references it'
+    FROM pg_constraint WHERE confrelid = $1::regclass AND conrelid <> confrelid
+    UNION ALL
+    SELECT 'it has the exclusion constraint ' || conname FROM pg_constraint
+    WHERE conrelid = $1::regclass AND contype = 'x'
+    UNION ALL
+    SELECT 'it has the trigger ' || tgname FROM pg_trigger
+    WHERE tgrelid = $1::regclass AND NOT tgisinternal
+    UNION ALL
+    SELECT 'it has the policy ' || polname FROM pg_policy
+    WHERE polrelid = $1::regclass
+"""
 
-                # Create an index on hex_id for future joins
-                print("Creating index")
+
+def copy_indexes(cur, table_name: str, new_table: str) -> List[Tuple[str, str]]:
+    """Recreates the indexes of a table on ``new_table``.
+
+    The DDL is composed from the ``pg_index`` columns, so that names are quoted and
+    options (operator classes, collations, sort orders, INCLUDE columns, predicates)
+    are kept. Each index is built under a short temporary name, returned along with
+    its original name, and primary key and unique constraints are attached to it.
+    """
+    cur.execute(
+        """
+        SELECT ix.indexrelid, index.relname, ix.indisunique, am.amname,
+            ix.indnkeyatts, pg_get_expr(ix.indpred, ix.indrelid), con.contype
+        FROM pg_index AS ix
+        JOIN pg_class AS index ON index.oid = ix.indexrelid
+        JOIN pg_am AS am ON am.oid = index.relam
+        LEFT JOIN pg_constraint AS con
+            ON con.conindid = ix.indexrelid
+            AND con.conrelid = ix.indrelid
+            AND con.contype IN ('p', 'u')
+        WHERE ix.indrelid = $1::regclass
+        ORDER BY ix.indexrelid
+        """,
+        (table_name,),
+    )
+    indexes = cur.fetchall()
+    cur.execute(
+        """
+        SELECT ix.indexrelid, att.attname,
+            pg_get_indexdef(ix.indexrelid, col.n::int, true),
+            opc_ns.nspname, opc.opcname, col.flags, coll_ns.nspname, coll.collname
+        FROM pg_index AS ix
+        CROSS JOIN unnest(
+            ix.indkey::int2[], ix.indclass::oid[], ix.indoption::int2[],
+            ix.indcollation::oid[]
+        ) WITH ORDINALITY AS col(attnum, class_oid, flags, coll_oid, n)
+        LEFT JOIN pg_attribute AS att
+            ON att.attrelid = ix.indrelid AND att.attnum = col.attnum
+        LEFT JOIN pg_opclass AS opc
+            ON opc.oid = col.class_oid AND NOT opc.opcdefault
+        LEFT JOIN pg_namespace AS opc_ns ON opc_ns.oid = opc.opcnamespace
+        LEFT JOIN pg_collation AS coll
+            ON coll.oid = col.coll_oid
+            AND col.coll_oid <> COALESCE(att.attcollation, 100)
+        LEFT JOIN pg_namespace AS coll_ns ON coll_ns.oid = coll.collnamespace
+        WHERE ix.indrelid = $1::regclass
+        ORDER BY ix.indexrelid, col.n
+        """,
+        (table_name,),
+    )
+    columns: Dict[int, List[tuple]] = {}
+    for row in cur.fetchall():
+        columns.setdefault(row[0], []).append(row[1:])
+
+    renames = []
+    for oid, name, unique, method, key_count, predicate, constraint in indexes:
+        # Named after the index oid, so it fits in 63 bytes whatever the name
+        temp_name = f"rebuild_{oid}"
+        keys, included = [], []
+        for i, (column, definition, *options) in enumerate(columns[oid]):
+            if i >= key_count:
+                included.append(sql.Identifier(column))
+                continue
+            opclass_schema, opclass, option, collation_schema, collation = options
+            key = (
+                sql.Identifier(column)
+                if column is not None
+                else sql.SQL("({})").format(sql.SQL(definition))
+            )
+            if collation is not None:
+                key = sql.SQL("{} COLLATE {}").format(
+                    key, sql.Identifier(collation_schema, collation)
+                )
+            if opclass is not None:
+                key = sql.SQL("{} {}").format(
+                    key, sql.Identifier(opclass_schema, opclass)
+                )
+            # indoption bits: 1 for DESC, 2 for NULLS FIRST
+            descending, nulls_first = bool(option & 1), bool(option & 2)
+            if descending:
+                key = sql.SQL("{} DESC").format(key)
+            if nulls_first != descending:
+                key = sql.SQL("{} NULLS {}").format(
+                    key, sql.SQL("FIRST" if nulls_first else "LAST")
+                )
+            keys.append(key)
+
+        query = sql.SQL("CREATE {}INDEX {} ON {} USING {} ({})").format(
+            sql.SQL("UNIQUE " if unique else ""),
+            sql.Identifier(temp_name),
+            sql.Identifier(new_table),
+            sql.Identifier(method),
+            sql.SQL(", ").join(keys),
+        )
+        if included:
+            query = sql.SQL("{} INCLUDE ({})").format(
+                query, sql.SQL(", ").join(included)
+            )
+        if predicate is not None:
+            query = sql.SQL("{} WHERE {}").format(query, sql.SQL(predicate))
+        cur.execute(query.as_string(None))
+
+        if constraint is not None:
+            cur.execute(
+                sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {} USING INDEX {}")
+                .format(
+                    sql.Identifier(new_table),
+                    sql.Identifier(temp_name),
+                    sql.SQL("PRIMARY KEY" if constraint == "p" else "UNIQUE"),
+                    sql.Identifier(temp_name),
+                )
+                .as_string(None)
+            )
+        renames.append((temp_name, name))
+    return renames
+
+
+def copy_privileges(cur, table_name: str, new_table: str) -> None:
+    """Grants the table and column privileges of a table on ``new_table``.
+
+    Privileges of the owner are left out, they follow the table owner.
+    """
+    cur.execute(
+        """
+        SELECT NULL, grantee.rolname, acl.privilege_type, acl.is_grantable
+        FROM pg_class AS rel
+        CROSS JOIN aclexplode(rel.relacl) AS acl
+        LEFT JOIN pg_roles AS grantee ON grantee.oid = acl.grantee
+        WHERE rel.oid = $1::regclass AND acl.grantee <> rel.relowner
+        UNION ALL
+        SELECT att.attname, grantee.rolname, acl.privilege_type, acl.is_grantable
+        FROM pg_class AS rel
+        JOIN pg_attribute AS att ON att.attrelid = rel.oid
+        CROSS JOIN aclexplode(att.attacl) AS acl
+        LEFT JOIN pg_roles AS grantee ON grantee.oid = acl.grantee
+        WHERE rel.oid = $1::regclass AND acl.grantee <> rel.relowner
+        """,
+        (table_name,),
+    )
+    for column, grantee, privilege, grantable in cur.fetchall():
+        query = sql.SQL("GRANT {}{} ON TABLE {} TO {}{}").format(
+            sql.SQL(privilege),
+            sql.SQL(" ({})").format(sql.Identifier(column)) if column else sql.SQL(""),
+            sql.Identifier(new_table),
+            # The grantee oid 0 stands for PUBLIC
+            sql.Identifier(grantee) if grantee else sql.SQL("PUBLIC"),
+            sql.SQL(" WITH GRANT OPTION" if grantable else ""),
+        )
+        cur.execute(query.as_string(None))
+
+
+def rebuild_with_columns(
+    connection_string: str,
+    table_name: str,
+    temp_table: str,
+    columns: List[Tuple[str, str]],
+):
+    """Adds columns from a staging table by rebuilding the table and swapping it in.
+
+    Rather than an UPDATE rewriting every row under lock, a copy of the table with
+    the new ``columns`` (names and types) is filled from a join of both tables while
+    the old one keeps serving reads. The copy keeps the column defaults, constraints,
+    comments, indexes, privileges and owner of the table. It is analyzed before the
+    two tables are swapped in a single short transaction, leaving no dead tuples
+    behind. Data should not be ingested into the table while it is rebuilt.
+
+    Tables with objects the copy would not keep, such as dependent views, foreign
+    keys referencing them or triggers, are refused: use the "update" strategy.
+    """
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(REBUILD_BLOCKERS_QUERY, (table_name,))
+            blockers = [reason for (reason,) in cur.fetchall()]
+            if blockers:
+                raise ValueError(
+                    f"Table {table_name} can't be rebuilt: {'; '.join(blockers)}."
+                )
+
+            cur.execute(
+                """
+                SELECT oid, pg_get_userbyid(relowner), obj_description(oid, 'pg_class')
+                FROM pg_class WHERE oid = $1::regclass
+                """,
+                (table_name,),
+            )
+            table_oid, owner, comment = cur.fetchone()
+            # Named after the table oid, so it fits in 63 bytes whatever the name
+            new_table = f"rebuild_{table_oid}"
+
+            cur.execute(
+                """
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = $1::regclass AND attnum > 0
+                AND NOT attisdropped AND attgenerated = ''
+                ORDER BY attnum
+                """,
+                (table_name,),
+            )
+            existing = [sql.Identifier(column) for (column,) in cur.fetchall()]
+            added = [sql.Identifier(column) for column, _ in columns]
+
+            print("Rebuilding table with new columns...")
+            new = sql.Identifier(new_table)
+            cur.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(new).as_string(None))
+            cur.execute(
+                sql.SQL("CREATE TABLE {} (LIKE {} INCLUDING ALL EXCLUDING INDEXES)")
+                .format(new, sql.Identifier(table_name))
+                .as_string(None)
+            )
+            for column, column_type in columns:
                 cur.execute(
-                    f"CREATE INDEX idx_{TABLE_NAME}_hex_id ON {TABLE_NAME} (hex_id)"
+                    sql.SQL("ALTER TABLE {} ADD COLUMN {} {}")
+                    .format(new, sql.Identifier(column), sql.SQL(column_type))
+                    .as_string(None)
                 )
-            conn.commit()
-        return
+            cur.execute(
+                sql.SQL(
+                    """
+                    INSERT INTO {new} ({columns}) OVERRIDING SYSTEM VALUE
+                    SELECT {main_columns}, {temp_columns}
+                    FROM {table} AS main
+                    LEFT JOIN {temp} AS temp ON main.hex_id = temp.hex_id
+                    """
+                )
+                .format(
+                    new=new,
+                    columns=sql.SQL(", ").join(existing + added),
+                    main_columns=sql.SQL(", ").join(
+                        sql.SQL("main.{}").format(c) for c in existing
+                    ),
+                    temp_columns=sql.SQL(", ").join(
+                        sql.SQL("temp.{}").format(c) for c in added
+                    ),
+                    table=sql.Identifier(table_name),
+                    temp=sql.Identifier(temp_table),
+                )
+                .as_string(None)
+            )
 
-    # Load Parquet file into a temporary table
-    parquet_table = read_parquet_file(parquet_file)
-    temp_table = f"{TABLE_NAME}_temp"
-    with pg.connect(connection_string) as conn, tqdm(
-        total=parquet_table.num_rows, desc="Ingesting Temporary Table", unit="rows"
-    ) as pbar:
+            print("Creating index")
+            indexes = copy_indexes(cur, table_name, new_table)
+
+            # Foreign keys are the only constraints LIKE leaves out
+            cur.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+                WHERE conrelid = $1::regclass AND contype = 'f'
+                """,
+                (table_name,),
+            )
+            for name, definition in cur.fetchall():
+                cur.execute(
+                    sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} {}")
+                    .format(new, sql.Identifier(name), sql.SQL(definition))
+                    .as_string(None)
+                )
+
+            copy_privileges(cur, table_name, new_table)
+            cur.execute(
+                sql.SQL("COMMENT ON TABLE {} IS {}")
+                .format(new, sql.Literal(comment))
+                .as_string(None)
+            )
+            cur.execute(sql.SQL("ANALYZE {}").format(new).as_string(None))
+        conn.commit()
+
+    # Swap the tables in a single short transaction. Objects depending on the
+    # table since the check above make the DROP fail rather than being dropped.
+    with pg.connect(connection_string) as conn:
         with conn.cursor() as cur:
-            cur.adbc_ingest(temp_table, parquet_table.slice(0, 0), mode="replace")
+            cur.execute(
+                sql.SQL("DROP TABLE {}")
+                .format(sql.Identifier(table_name))
+                .as_string(None)
+            )
+            cur.execute(
+                sql.SQL("ALTER TABLE {} RENAME TO {}")
+                .format(new, sql.Identifier(table_name))
+                .as_string(None)
+            )
+            for temp_name, name in indexes:
+                cur.execute(
+                    sql.SQL("ALTER INDEX {} RENAME TO {}")
+                    .format(sql.Identifier(temp_name), sql.Identifier(name))
+                    .as_string(None)
+                )
+            cur.execute(
+                sql.SQL("ALTER TABLE {} OWNER TO {}")
+                .format(sql.Identifier(table_name), sql.Identifier(owner))
+                .as_string(None)
+            )
+        conn.commit()
 
-            for batch in parquet_table.to_batches(max_chunksize=chunksize):
-                cur.adbc_ingest(temp_table, batch, mode="append")
-                pbar.update(batch.num_rows)
 
+def load_parquet_to_db(
+    parquet_file: str,
+    connection_string: str,
+    stac_item_path: str,
+    chunksize: int = 64_000,
+    hex_id_type: str = "text",
+    workers: int = 1,
+    resume: bool = False,
+    strategy: str = "update",
+):
+    """Main function to load and update data in PostgreSQL using Arrow in replace mode.
+
+    ``hex_id_type`` sets how 'hex_id' is stored when the table is created: "text" keeps
+    the hex strings with a btree index, "int8" stores the H3 cell index as a primary
+    key. When the table already exists, new files are converted to its storage type.
+
+    The file is first streamed into a staging table with ``workers`` connections (see
+    ``stage_parquet_file``); pass ``resume`` to continue an interrupted load of the
+    same file. The main table is only modified once staging is complete.
+
+    ``strategy`` sets how columns are added to an existing table: "update" fills them
+    in place with a single UPDATE, "rebuild" builds a new table and swaps it in (see
+    ``rebuild_with_columns``).
+    """
+    if hex_id_type not in HEX_ID_TYPES:
+        raise ValueError(
+            f"Invalid hex_id type: {hex_id_type}. Must be one of {HEX_ID_TYPES}"
+        )
+    if strategy not in LOAD_STRATEGIES:
+        raise ValueError(
+            f"Invalid strategy: {strategy}. Must be one of {LOAD_STRATEGIES}"
+        )
+
+    validate_stac_item(stac_item_path)
+    verify_columns(parquet_file, stac_item_path, connection_string)
+
+    # Check if the table already exists in the database
+    existing_hex_id_type = get_hex_id_type(connection_string, TABLE_NAME)
+    table_exists = existing_hex_id_type is not None
+    if table_exists:
+        hex_id_type = "int8" if existing_hex_id_type == "bigint" else "text"
+
+    temp_table = f"{TABLE_NAME}_temp"
+    stage_parquet_file(
+        parquet_file,
+        connection_string,
+        temp_table,
+        chunksize,
+        hex_id_type,
+        workers,
+        resume,
+    )
+
+    if not table_exists:
+        # If the table does not exist, the staged table becomes the main table
+        with pg.connect(connection_string) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"ALTER TABLE {temp_table} RENAME TO {TABLE_NAME}")
+
+                # Create an index on hex_id for future joins
+                print("Creating index")
+                if hex_id_type == "int8":
+                    cur.execute(f"ALTER TABLE {TABLE_NAME} ADD PRIMARY KEY (hex_id)")
+                else:
+                    cur.execute(
+                        f"CREATE INDEX idx_{TABLE_NAME}_hex_id ON {TABLE_NAME} (hex_id)"
+                    )
+                clear_checkpoints(cur, temp_table)
             conn.commit()
+        return
 
     # Fetch columns to add to the main table
     with pg.connect(connection_string) as conn:
@@ -157,58 +683,94 @@ def load_parquet_to_db(
             """)
             new_columns = cur.fetchall()
 
-    # Add new columns and attempt to update in a transaction
-    try:
-        with pg.connect(connection_string) as conn:
-            with conn.cursor() as cur:
-                # Add new columns to the main table
-                for column, column_type in new_columns:
-                    cur.execute(
-                        f"ALTER TABLE {TABLE_NAME} ADD COLUMN IF NOT EXISTS {column.lower()} {column_type}"
-                    )
+    if strategy == "rebuild":
+        rebuild_with_columns(
+            connection_string,
+            TABLE_NAME,
+            temp_table,
+            [(column.lower(), column_type) for column, column_type in new_columns],
+        )
+    else:
+        # Add new columns and attempt to update in a transaction
+        try:
+            with pg.connect(connection_string) as conn:
+                with conn.cursor() as cur:
+                    # Add new columns to the main table
+                    for column, column_type in new_columns:
+                        cur.execute(
+                            f"ALTER TABLE {TABLE_NAME} ADD COLUMN IF NOT EXISTS {column.lower()} {column_type}"
+                        )
 
-                print(f"Adding new columns: {[c[0] for c in new_columns]}...")
+                    print(f"Adding new columns: {[c[0] for c in new_columns]}...")
 
-                # Construct the SET clause for the update query
-                update_columns = [
-                    f"{column.lower()} = temp.{column.lower()}"
-                    for column, _ in new_columns
-                ]
-                set_clause = ", ".join(update_columns)
+                    # Construct the SET clause for the update query
+                    update_columns = [
+                        f"{column.lower()} = temp.{column.lower()}"
+                        for column, _ in new_columns
+                    ]
+                    set_clause = ", ".join(update_columns)
 
-                # Update TABLE_NAME with data from temp_table based on matching hex_id
-                print(
-                    "Adding columns to dataset... All or nothing operation may take some time."
-                )
-                cur.execute(f"""
-                    UPDATE {TABLE_NAME} AS main
-                    SET {set_clause}
-                    FROM {temp_table} AS temp
-                    WHERE main.hex_id = temp.hex_id
-                """)
+                    # Update TABLE_NAME with data from temp_table based on matching hex_id
+                    print(
+                        "Adding columns to dataset... All or nothing operation may take some time."
+                    )
+                    cur.execute(f"""
+                        UPDATE {TABLE_NAME} AS main
+                        SET {set_clause}
+                        FROM {temp_table} AS temp
+                        WHERE main.hex_id = temp.hex_id
+                    """)
 
-            conn.commit()  # Commit transaction if all operations succeed
-    except Exception as e:
-        # Rollback if any error occurs during the update
-        print("An error occurred during update. Rolling back changes.")
-        conn.rollback()
-        raise e  # Re-raise the exception to alert calling code
+                conn.commit()  # Commit transaction if all operations succeed
+        except Exception as e:
+            # Rollback if any error occurs during the update
+            print("An error occurred during update. Rolling back changes.")
+            conn.rollback()
+            raise e  # Re-raise the exception to alert calling code
 
     # Drop the temporary table
     with pg.connect(connection_string) as conn:
         with conn.cursor() as cur:
             cur.execute(f"DROP TABLE IF EXISTS {temp_table}")
+            clear_checkpoints(cur, temp_table)
         conn.commit()
 
 
+def date_to_date32(table: pa.Table) -> pa.Table:
+    """Casts the 'date' column to date32, so it is stored as a Postgres date."""
+    if "date" not in table.column_names:
+        raise ValueError("The 'date' column is missing from the Parquet file.")
+    if table.schema.field("date").type == pa.date32():
+        return table
+    return table.set_column(
+        table.schema.get_field_index("date"), "date", table["date"].cast(pa.date32())
+    )
+
+
+def create_ts_partitions(cur, table_name_ts: str, years) -> None:
+    """Creates the missing yearly partitions of a timeseries table."""
+    for year in sorted(years):
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name_ts}_{year}
+            PARTITION OF {table_name_ts}
+            FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+        """)
+
+
 def load_parquet_to_db_ts(
     parquet_file: str,
     connection_string: str,
     stac_item_path: str,
     table_name_ts: str,
     chunksize: int = 64_000,
+    partition: bool = True,
 ):
-    """Main function to load TS data in PostgreSQL."""
+    """Main function to load TS data in PostgreSQL.
+
+    With ``partition``, a new table is partitioned by year on 'date', so queries
+    on a date range only scan the partitions of its years. Rows are loaded in
+    date order with a composite (hex_id, date) index and a BRIN index on 'date'.
+    """
     validate_stac_item(stac_item_path)
     verify_columns(parquet_file, stac_item_path, connection_string)
 
@@ -221,24 +783,438 @@ def load_parquet_to_db_ts(
     if not table_exists:
         # If the table does not exist, directly ingest the Parquet file in batches
         parquet_table = read_parquet_file(parquet_file)
+        if partition:
+            parquet_table = date_to_date32(parquet_table).sort_by(
+                [("date", "ascending"), ("hex_id", "ascending")]
+            )
 
         with pg.connect(connection_string) as conn, tqdm(
             total=parquet_table.num_rows, desc="Ingesting Data", unit="rows"
         ) as pbar:
             with conn.cursor() as cur:
-                # Create an empty table with the same schema
-                cur.adbc_ingest(
-                    table_name_ts, parquet_table.slice(0, 0), mode="replace"
-                )
+                if partition:
+                    # Create the partitioned table from an empty table of the
+                    # same schema, with a partition per year of data and a
+                    # default partition for the rows of later loads
+                    template = f"{table_name_ts}_template"
+                    cur.adbc_ingest(template, parquet_table.slice(0, 0), mode="replace")
+                    cur.execute(f"""
+                        CREATE TABLE {table_name_ts} (LIKE {template})
+                        PARTITION BY RANGE (date)
+                    """)
+                    cur.execute(f"DROP TABLE {template}")
+                    years = pc.unique(pc.year(parquet_table["date"])).drop_null()
+                    create_ts_partitions(cur, table_name_ts, years.to_pylist())
+                    cur.execute(
+                        f"CREATE TABLE {table_name_ts}_default "
+                        f"PARTITION OF {table_name_ts} DEFAULT"
+                    )
+                else:
+                    # Create an empty table with the same schema
+                    cur.adbc_ingest(
+                        table_name_ts, parquet_table.slice(0, 0), mode="replace"
+                    )
 
                 for batch in parquet_table.to_batches(max_chunksize=chunksize):
                     cur.adbc_ingest(table_name_ts, batch, mode="append")
                     pbar.update(batch.num_rows)
 
-                # Create an index on hex_id for future joins
                 print("Creating index")
-                cur.execute(
-                    f"CREATE INDEX idx_{table_name_ts}_hex_id ON {table_name_ts} (hex_id)"
-                )
+                if partition:
+                    # Indexes of the parent are created on every partition
+                    cur.execute(
+                        f"CREATE INDEX idx_{table_name_ts}_hex_id_date "
+                        f"ON {table_name_ts} (hex_id, date)"
+                    )
+                    cur.execute(
+                        f"CREATE INDEX idx_{table_name_ts}_date "
+                        f"ON {table_name_ts} USING brin (date)"
+                    )
+                    cur.execute(f"ANALYZE {table_name_ts}")
+                else:
+                    # Create an index on hex_id for future joins
+                    cur.execute(
+                        f"CREATE INDEX idx_{table_name_ts}_hex_id ON {table_name_ts} (hex_id)"
+                    )
             conn.commit()
         return
+
+
+def migrate_hex_id_to_int8(
+    connection_string: str,
+    table_name: str = TABLE_NAME,
+    batch_size: int = 100_000,
+    admin_table_name: Optional[str] = ADMIN_TABLE_NAME,
+):
+    """Converts the text 'hex_id' column of an existing table to an int8 primary key.
+
+    The table stays readable during the migration: the new column is backfilled in
+    'hex_id' ranges of ``batch_size`` rows, each committed on its own, and its unique
+    index is built concurrently. Only the final column swap takes an exclusive lock.
+    Data should not be ingested into the table while the migration runs, and the
+    'hex_id' values must be unique, so time series tables can't be migrated.
+
+    The rollup tables of the table and the ``admin_table_name`` membership table,
+    which are joined on 'hex_id', are then rebuilt with int8 ids. Until they are,
+    /aggregate reads cells instead of rollups and the admin endpoints fail.
+    """
+    hex_id_type = get_hex_id_type(connection_string, table_name)
+    if hex_id_type is None:
+        raise ValueError(f"Table {table_name} does not exist.")
+    if hex_id_type == "bigint":
+        print(f"hex_id of {table_name} is already stored as int8.")
+        return
+
+    new_column = "hex_id_int8"
+    index_name = f"idx_{table_name}_{new_column}"
+    check_name = f"{table_name}_{new_column}_not_null"
+
+    with pg.connect(connection_string, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            # Check before the backfill rather than when the unique index fails
+            cur.execute(
+                f"SELECT hex_id FROM {table_name} "
+                "GROUP BY hex_id HAVING count(*) > 1 LIMIT 1"
+            )
+            duplicate = cur.fetchone()
+            if duplicate is not None:
+                raise ValueError(
+                    f"hex_id of {table_name} is not unique (e.g. {duplicate[0]}), "
+                    "so it can't become the primary key."
+                )
+
+            cur.execute(f"SELECT count(*) FROM {table_name}")
+            total_rows = cur.fetchone()[0]
+            cur.execute(
+                f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {new_column} int8"
+            )
+
+            # Backfill in hex_id ranges so each batch is a short transaction
+            last_hex_id = ""
+            with tqdm(total=total_rows, desc="Converting hex_id", unit="rows") as pbar:
+                while True:
+                    cur.execute(
+                        f"""
+                        WITH batch AS (
+                            SELECT hex_id FROM {table_name}
+                            WHERE hex_id > $1
+                            ORDER BY hex_id
+                            LIMIT $2
+                        ), updated AS (
+                            UPDATE {table_name} AS main
+                            SET {new_column} = ('x' || lpad(main.hex_id, 16, '0'))::bit(64)::int8
+                            FROM batch
+                            WHERE main.hex_id = batch.hex_id
+                            RETURNING 1
+                        )
+                        SELECT (SELECT max(hex_id) FROM batch), (SELECT count(*) FROM updated)
+                        """,
+                        (last_hex_id, batch_size),
+                    )
+                    last_hex_id, updated = cur.fetchone()
+                    if not updated:
+                        break
+                    pbar.update(updated)
+
+            print("Creating index")
+            # A failed concurrent build leaves an invalid index behind, which
+            # IF NOT EXISTS would keep and the primary key can't use
+            cur.execute(
+                "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)",
+                (index_name,),
+            )
+            existing_index = cur.fetchone()
+            if existing_index is not None and not existing_index[0]:
+                cur.execute(f"DROP INDEX CONCURRENTLY {index_name}")
+            cur.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                f"ON {table_name} ({new_column})"
+            )
+
+            # A validated CHECK lets SET NOT NULL skip the full table scan under lock
+            cur.execute(
+                f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {check_name}"
+            )
+            cur.execute(
+                f"ALTER TABLE {table_name} ADD CONSTRAINT {check_name} "
+                f"CHECK ({new_column} IS NOT NULL) NOT VALID"
+            )
+            cur.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {check_name}")
+
+    # Swap the columns in a single short transaction
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"ALTER TABLE {table_name} ALTER COLUMN {new_column} SET NOT NULL"
+            )
+            cur.execute(f"ALTER TABLE {table_name} DROP CONSTRAINT {check_name}")
+            cur.execute(f"ALTER TABLE {table_name} DROP COLUMN hex_id")
+            cur.execute(
+                f"ALTER TABLE {table_name} RENAME COLUMN {new_column} TO hex_id"
+            )
+            cur.execute(
+                f"ALTER TABLE {table_name} ADD CONSTRAINT {table_name}_pkey "
+                f"PRIMARY KEY USING INDEX {index_name}"
+            )
+        conn.commit()
+
+    # Rebuilt from the migrated table, so every level gets int8 ids
+    rollups = [rollup_table_name(table_name, level) for level in ROLLUP_LEVELS]
+    if any(get_hex_id_type(connection_string, r) == "text" for r in rollups):
+        build_rollup_tables(connection_string, table_name)
+
+    if (
+        admin_table_name
+        and get_hex_id_type(connection_string, admin_table_name) == "text"
+    ):
+        convert_admin_membership_hex_id(connection_string, admin_table_name)
+
+
+def convert_admin_membership_hex_id(
+    connection_string: str, table_name: str = ADMIN_TABLE_NAME
+):
+    """Rebuilds the admin membership table with int8 ids, see `migrate_hex_id_to_int8`.
+
+    The converted rows are copied into a new table that then replaces the current
+    one, so admin requests are only blocked for the final rename.
+    """
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {table_name}_new")
+            cur.execute(f"CREATE TABLE {table_name}_new (LIKE {table_name})")
+            # The new table is still empty, so there is nothing to convert yet
+            cur.execute(
+                f"ALTER TABLE {table_name}_new ALTER COLUMN hex_id TYPE int8 "
+                "USING NULL"
+            )
+            cur.execute(f"""
+                INSERT INTO {table_name}_new (admin_id, hex_id, fraction, centroid)
+                SELECT admin_id, ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8,
+                    fraction, centroid
+                FROM {table_name}
+            """)
+            cur.execute(
+                f"ALTER TABLE {table_name}_new ADD PRIMARY KEY (admin_id, hex_id)"
+            )
+            cur.execute(f"ANALYZE {table_name}_new")
+            conn.commit()
+
+            cur.execute(f"DROP TABLE {table_name}")
+            cur.execute(f"ALTER TABLE {table_name}_new RENAME TO {table_name}")
+            cur.execute(
+                f"ALTER INDEX {table_name}_new_pkey RENAME TO {table_name}_pkey"
+            )
+        conn.commit()
+
+
+def read_boundaries(boundaries_file: str) -> List[Dict[str, Any]]:
+    """Reads the features of a GeoJSON file either from a local path or an S3 path."""
+    if boundaries_file.startswith("s3://"):
+        s3 = boto3.client("s3")
+        bucket, key = boundaries_file[5:].split("/", 1)
+        collection = json.loads(s3.get_object(Bucket=bucket, Key=key)["Body"].read())
+    else:
+        with open(boundaries_file) as f:
+            collection = json.load(f)
+    return collection["features"]
+
+
+def admin_membership(
+    features: List[Dict[str, Any]], id_field: str, hex_id_int8: bool
+) -> pa.Table:
+    """Cells touching each administrative unit, with their overlap and centroid.
+
+    Every cell of a unit is stored with the fraction of its area inside the unit
+    and whether its centroid is, so that the "touches", "centroid" and "within"
+    spatial joins all read their cells from the same rows.
+    """
+    admin_ids, hex_ids, fractions, centroids = [], [], [], []
+    for feature in tqdm(features, desc="Polyfilling boundaries", unit="units"):
+        admin_id = str(feature["properties"][id_field])
+        cell_ids = generate_h3_ids(
+            feature["geometry"], H3_RESOLUTION, "touches"
+        ).to_numpy()
+        fraction, centroid = cell_overlap(shape(feature["geometry"]), cell_ids)
+
+        admin_ids.append(pa.array([admin_id] * len(cell_ids), pa.string()))
+        if hex_id_int8:
+            hex_ids.append(pa.array(cell_ids.astype("int64")))
+        else:
+            hex_ids.append(
+                pa.array(cells_to_string(pa.array(cell_ids))).cast(pa.string())
+            )
+        fractions.append(pa.array(fraction))
+        centroids.append(pa.array(centroid))
+
+    schema = pa.schema(
+        [
+            ("admin_id", pa.string()),
+            ("hex_id", pa.int64() if hex_id_int8 else pa.string()),
+            ("fraction", pa.float64()),
+            ("centroid", pa.bool_()),
+        ]
+    )
+    if not features:
+        return schema.empty_table()
+    return pa.table(
+        [
+            pa.chunked_array(admin_ids, pa.string()),
+            pa.chunked_array(hex_ids),
+            pa.chunked_array(fractions),
+            pa.chunked_array(centroids),
+        ],
+        schema=schema,
+    )
+
+
+def load_admin_membership(
+    connection_string: str,
+    boundaries_file: str,
+    id_field: str = "shapeID",
+    table_name: str = ADMIN_TABLE_NAME,
+    stats_table_name: str = TABLE_NAME,
+    chunksize: int = 64_000,
+    replace: bool = False,
+):
+    """Loads the cells of each administrative unit of a GeoJSON file.
+
+    Units are identified by the ``id_field`` property of their feature, e.g. the
+    geoBoundaries ``shapeID``. The cells of units already in the table are
+    replaced, other units are kept unless ``replace`` is set. hex_id is stored
+    with the type of the statistics table, so both are joined on their index.
+    """
+    hex_id_type = get_hex_id_type(connection_string, stats_table_name)
+    if hex_id_type is None:
+        raise ValueError(f"Table {stats_table_name} does not exist.")
+    hex_id_int8 = hex_id_type == "bigint"
+
+    features = read_boundaries(boundaries_file)
+    missing = [f for f in features if id_field not in (f.get("properties") or {})]
+    if missing:
+        raise ValueError(f"{len(missing)} features have no '{id_field}' property.")
+    membership = admin_membership(features, id_field, hex_id_int8)
+
+    staging = f"{table_name}_staging"
+    with pg.connect(connection_string) as conn, tqdm(
+        total=membership.num_rows, desc="Ingesting Cells", unit="rows"
+    ) as pbar:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table_name} (
+                    admin_id text NOT NULL,
+                    hex_id {"int8" if hex_id_int8 else "text"} NOT NULL,
+                    fraction float8 NOT NULL,
+                    centroid boolean NOT NULL,
+                    PRIMARY KEY (admin_id, hex_id)
+                )
+            """)
+            if replace:
+                cur.execute(f"TRUNCATE {table_name}")
+
+            cur.adbc_ingest(staging, membership.slice(0, 0), mode="replace")
+            for batch in membership.to_batches(max_chunksize=chunksize):
+                cur.adbc_ingest(staging, batch, mode="append")
+                pbar.update(batch.num_rows)
+
+            cur.execute(f"""
+                DELETE FROM {table_name}
+                WHERE admin_id IN (SELECT DISTINCT admin_id FROM {staging})
+            """)
+            cur.execute(f"""
+                INSERT INTO {table_name} (admin_id, hex_id, fraction, centroid)
+                SELECT admin_id, hex_id, fraction, centroid FROM {staging}
+            """)
+            cur.execute(f"DROP TABLE {staging}")
+            cur.execute(f"ANALYZE {table_name}")
+        conn.commit()
+
+
+def h3_parent_sql(cell: str, level: int) -> str:
+    """SQL expression of the int8 parent at ``level`` of an int8 H3 cell index.
+
+    The resolution bits are set to ``level`` and the digits of the finer
+    resolutions are filled with 7 (unused), as in the H3 index layout.
+    """
+    unused_digits = (1 << (3 * (15 - level))) - 1
+    return f"((({cell}) | {unused_digits}) & ({~(15 << 52)})) | {level << 52}"
+
+
+def get_column_types(cur, table_name: str) -> dict:
+    """Returns the data type of each column of a table."""
+    cur.execute(f"""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = '{table_name}'
+        ORDER BY ordinal_position
+    """)
+    return dict(cur.fetchall())
+
+
+def build_rollup_tables(
+    connection_string: str,
+    table_name: str = TABLE_NAME,
+    levels=ROLLUP_LEVELS,
+):
+    """Builds the rollup tables holding the aggregates of each parent cell.
+
+    For every numeric column, the rollup table of each level stores the sum, min,
+    max and count of the level 6 cells below each parent, so that /aggregate can
+    read whole parents instead of their cells. Each level is aggregated from the
+    next finer one, into a new table that then replaces the previous rollup.
+    """
+    hex_id_type = get_hex_id_type(connection_string, table_name)
+    if hex_id_type is None:
+        raise ValueError(f"Table {table_name} does not exist.")
+
+    if hex_id_type == "bigint":
+        cell = "hex_id"
+    else:
+        cell = "('x' || lpad(hex_id, 16, '0'))::bit(64)::int8"
+
+    with pg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            fields = [
+                column
+                for column, data_type in get_column_types(cur, table_name).items()
+                if data_type in NUMERIC_TYPES and column not in ("hex_id", "ogc_fid")
+            ]
+            if not fields:
+                raise ValueError(f"Table {table_name} has no numeric columns.")
+
+            source, source_level = table_name, H3_RESOLUTION
+            for level in tqdm(sorted(levels, reverse=True), desc="Building rollups"):
+                if source_level == H3_RESOLUTION:
+                    select = [
+                        f"{partial}({field}) AS {rollup_column_name(field, partial)}"
+                        for field in fields
+                        for partial in ROLLUP_PARTIALS
+                    ]
+                else:
+                    # Keep the types of the aggregates over cells at every level
+                    types = get_column_types(cur, source)
+                    select = [
+                        f"{merge}({column})::{types[column]} AS {column}"
+                        for field in fields
+                        for partial, merge in ROLLUP_PARTIALS.items()
+                        for column in [rollup_column_name(field, partial)]
+                    ]
+
+                parent = h3_parent_sql(cell, level)
+                if hex_id_type != "bigint":
+                    parent = f"to_hex({parent})"
+
+                rollup = rollup_table_name(table_name, level)
+                cur.execute(f"DROP TABLE IF EXISTS {rollup}_new")
+                cur.execute(f"""
+                    CREATE TABLE {rollup}_new AS
+                    SELECT {parent} AS hex_id, {", ".join(select)}
+                    FROM {source}
+                    GROUP BY 1
+                """)
+                cur.execute(f"ALTER TABLE {rollup}_new ADD PRIMARY KEY (hex_id)")
+                cur.execute(f"DROP TABLE IF EXISTS {rollup}")
+                cur.execute(f"ALTER TABLE {rollup}_new RENAME TO {rollup}")
+                cur.execute(f"ALTER INDEX {rollup}_new_pkey RENAME TO {rollup}_pkey")
+                conn.commit()
+
+                source, source_level = rollup, level
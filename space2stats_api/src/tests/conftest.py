@@ -6,8 +6,10 @@ import pytest
 from fastapi.testclient import TestClient
 from geojson_pydantic import Feature
 from moto import mock_aws
+from moto.server import ThreadedMotoServer
 from pytest_postgresql.janitor import DatabaseJanitor
 from space2stats.api.app import build_app
+from space2stats.lib import refresh_fields_cache
 
 
 @pytest.fixture
@@ -19,6 +21,22 @@ def s3_mock():
         yield s3
 
 
+@pytest.fixture
+def s3_server(monkeypatch):
+    """Run a local S3 server, for clients that moto cannot patch in process."""
+    server = ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setenv("AWS_ENDPOINT_URL", f"http://{host}:{port}")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket="mybucket")
+    yield s3
+    server.stop()
+
+
 @pytest.fixture()
 def aws_credentials():
     """Mocked AWS credentials for moto."""
@@ -99,6 +117,14 @@ def mock_env(monkeypatch, database):
     monkeypatch.setenv("TIMESERIES_TABLE_NAME", "climate")
 
 
+@pytest.fixture(autouse=True)
+def clear_fields_cache():
+    """Each test gets a fresh database, so start with an empty fields cache."""
+    refresh_fields_cache()
+    yield
+    refresh_fields_cache()
+
+
 @pytest.fixture
 def client():
     """Provide a test client for FastAPI."""
@@ -107,6 +133,16 @@ def client():
         yield test_client
 
 
+@pytest.fixture
+def streaming_client(monkeypatch):
+    """Provide a test client for FastAPI with streaming responses enabled."""
+    monkeypatch.setenv("STREAMING_ENABLED", "true")
+    monkeypatch.setenv("STREAMING_BATCH_SIZE", "1")
+    app = build_app()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture
 def aoi_example():
     """Provide an example AOI feature for testing."""
@@ -179,6 +215,38 @@ def setup_timeseries_data(database):
     return database
 
 
+@pytest.fixture(scope="function")
+def setup_admin_data(database):
+    """Set up the cells of two administrative units in the database."""
+    db_url = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    with psycopg.connect(db_url) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE space2stats_admin (
+                    admin_id TEXT,
+                    hex_id TEXT,
+                    fraction FLOAT8,
+                    centroid BOOLEAN,
+                    PRIMARY KEY (admin_id, hex_id)
+                );
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO space2stats_admin (admin_id, hex_id, fraction, centroid)
+                VALUES
+                    ('ADM-1', '862a1070fffffff', 1, true),
+                    ('ADM-1', '862a10767ffffff', 0.4, false),
+                    ('ADM-2', '867a74807ffffff', 0.6, true),
+                    ('ADM-2', '867a74817ffffff', 1, true);
+                """
+            )
+            conn.commit()
+
+    return database
+
+
 @pytest.fixture
 def timeseries_data():
     """Fixture to provide sample timeseries data."""
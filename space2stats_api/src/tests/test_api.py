@@ -1,5 +1,17 @@
+import gc
+import io
+import json
+
+import psycopg
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+import shapely
+from fastapi.testclient import TestClient
 from shapely import from_geojson
+from space2stats.api.app import build_app
+from space2stats.h3_utils import generate_h3_geometries, generate_h3_wkb
+from space2stats_ingest.main import migrate_hex_id_to_int8
 
 aoi = {
     "type": "Feature",
@@ -63,6 +75,43 @@ def test_get_summary(client):
         assert len(summary) == len(request_payload["fields"]) + 1
 
 
+def test_polyfill_cache_health(client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "within",
+        "fields": ["sum_pop_2020"],
+    }
+    before = client.get("/health").json()["polyfill_cache"]
+
+    for _ in range(2):
+        response = client.post("/summary", json=request_payload)
+        assert response.status_code == 200
+
+    after = client.get("/health").json()["polyfill_cache"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_prepared_statements_health(client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "within",
+        "fields": ["sum_pop_2020"],
+    }
+    # Forget the statements of connections closed by previous tests
+    gc.collect()
+    before = client.get("/health").json()["prepared_statements"]
+
+    for _ in range(3):
+        response = client.post("/summary", json=request_payload)
+        assert response.status_code == 200
+
+    # The pool holds a single connection, which prepares the query once
+    after = client.get("/health").json()["prepared_statements"]
+    assert after["statements"] - before["statements"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+
 def test_bad_fields_validated(client):
     request_payload = {
         "aoi": aoi,
@@ -92,6 +141,110 @@ def test_aggregate_methods(client, aggregation_type):
     assert "sum_pop_f_10_2020" in response_json
 
 
+@pytest.mark.parametrize("endpoint", ["/aggregate", "/aggregate_by_hexids"])
+def test_aggregate_multiple_types(client, endpoint):
+    request_payload = {
+        "fields": ["sum_pop_2020", "sum_pop_f_10_2020"],
+        "aggregation_type": ["avg", "stddev", "p90", "weighted_avg"],
+        "weight_field": "sum_pop_2020",
+    }
+    if endpoint == "/aggregate":
+        request_payload.update(aoi=aoi, spatial_join_method="touches")
+    else:
+        request_payload.update(hex_ids=["862a1070fffffff", "862a10767ffffff"])
+
+    response = client.post(endpoint, json=request_payload)
+    assert response.status_code == 200
+    assert list(response.json()) == [
+        f"{field}_{aggregation}"
+        for field in request_payload["fields"]
+        for aggregation in request_payload["aggregation_type"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "aggregation_type,weight_field,status_code",
+    [
+        ("median", None, 422),
+        (["sum", "p200"], None, 422),
+        ([], None, 422),
+        ("weighted_avg", None, 400),
+        (["sum", "weighted_avg"], "a_non_existent_field", 400),
+    ],
+)
+def test_aggregate_invalid_types(client, aggregation_type, weight_field, status_code):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020"],
+        "aggregation_type": aggregation_type,
+        "weight_field": weight_field,
+    }
+
+    response = client.post("/aggregate", json=request_payload)
+    assert response.status_code == status_code
+
+
+def test_aggregate_fractional(client):
+    # A square around the centroid of 862a1070fffffff, within the cell
+    cell = shapely.from_wkb(generate_h3_wkb([int("862a1070fffffff", 16)]))[0]
+    square = shapely.box(*cell.centroid.buffer(0.02).bounds)
+    request_payload = {
+        "aoi": {**aoi, "geometry": shapely.geometry.mapping(square)},
+        "fields": ["sum_pop_2020"],
+        "aggregation_type": "sum",
+    }
+
+    response = client.post(
+        "/aggregate", json={**request_payload, "spatial_join_method": "fractional"}
+    )
+    assert response.status_code == 200
+    assert response.json()["sum_pop_2020"] == pytest.approx(
+        100 * square.area / cell.area
+    )
+
+    response = client.post(
+        "/aggregate",
+        json={
+            **request_payload,
+            "spatial_join_method": "fractional",
+            "aggregation_type": "stddev",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "error": "Aggregation types ['stddev'] are not supported by the fractional "
+        "spatial join method"
+    }
+
+    # Summaries have no fractional join
+    response = client.post(
+        "/summary", json={**request_payload, "spatial_join_method": "fractional"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "path,spatial_join_method",
+    [
+        ("/summary", "touches"),
+        ("/aggregate", "touches"),
+        ("/aggregate", "fractional"),
+    ],
+)
+def test_aoi_without_geometry(client, path, spatial_join_method):
+    request_payload = {
+        "aoi": {**aoi, "geometry": None},
+        "spatial_join_method": spatial_join_method,
+        "fields": ["sum_pop_2020"],
+        "aggregation_type": "sum",
+    }
+
+    response = client.post(path, json=request_payload)
+    assert response.status_code == 400
+    assert response.json() == {"error": "The AOI feature has no geometry"}
+
+
 def test_get_summary_with_geometry_multipolygon(client):
     request_payload = {
         "aoi": {
@@ -183,6 +336,41 @@ def test_get_summary_with_geometry_point(client):
         assert len(summary) == len(request_payload["fields"]) + 2
 
 
+@pytest.mark.parametrize("geometry", ["polygon", "point"])
+def test_get_summary_geometry_format_object(client, geometry):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020"],
+        "geometry": geometry,
+    }
+    expected = client.post("/summary", json=request_payload).json()
+
+    response = client.post(
+        "/summary", json={**request_payload, "geometry_format": "object"}
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {**row, "geometry": json.loads(row["geometry"])} for row in expected
+    ]
+
+    # Rows nested under feature ids are converted too
+    response = client.post(
+        "/summary/batch",
+        json={
+            "aois": {"type": "FeatureCollection", "features": [{**aoi, "id": "a"}]},
+            "spatial_join_method": "touches",
+            "fields": ["sum_pop_2020"],
+            "geometry": geometry,
+            "geometry_format": "object",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["a"] == [
+        {**row, "geometry": json.loads(row["geometry"])} for row in expected
+    ]
+
+
 def test_get_fields(client):
     response = client.get("/fields")
     assert response.status_code == 200
@@ -194,6 +382,36 @@ def test_get_fields(client):
         assert field in response_json
 
 
+def test_fields_see_schema_changes(client, database):
+    """Test that columns added by another process are served without a refresh."""
+    assert "new_field" not in client.get("/fields").json()
+
+    with psycopg.connect(
+        f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    ) as conn:
+        conn.execute("ALTER TABLE space2stats ADD COLUMN new_field INT")
+
+    assert "new_field" in client.get("/fields").json()
+
+
+def test_migrate_hex_id_while_serving(client, database):
+    """Test that running API processes pick up the int8 hex_id after a migration."""
+    request_payload = {
+        "hex_ids": ["862a1070fffffff", "862a10767ffffff"],
+        "fields": ["sum_pop_2020"],
+    }
+    before = client.post("/summary_by_hexids", json=request_payload)
+    assert before.status_code == 200
+
+    migrate_hex_id_to_int8(
+        f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    )
+
+    after = client.post("/summary_by_hexids", json=request_payload)
+    assert after.status_code == 200
+    assert after.json() == before.json()
+
+
 def test_get_summary_by_hexids(client):
     request_payload = {
         "hex_ids": ["862a1070fffffff", "862a10767ffffff"],
@@ -233,6 +451,30 @@ def test_get_summary_by_hexids_with_geometry(client):
         assert len(summary) == len(request_payload["fields"]) + 2
 
 
+def test_get_summary_by_hexids_geometry_of_missing_cells(client):
+    """Geometries stay aligned with their rows when some cells have no data."""
+    request_payload = {
+        # The first cell has no statistics and the last one is repeated
+        "hex_ids": ["862a10747ffffff", "862a1070fffffff", "862a10767ffffff"]
+        + ["862a1070fffffff"],
+        "fields": ["sum_pop_2020"],
+        "geometry": "point",
+    }
+
+    response = client.post("/summary_by_hexids", json=request_payload)
+    assert response.status_code == 200
+    summaries = response.json()
+
+    assert [summary["hex_id"] for summary in summaries] == [
+        "862a1070fffffff",
+        "862a10767ffffff",
+    ]
+    points = generate_h3_geometries(
+        [int(summary["hex_id"], 16) for summary in summaries], "point"
+    )
+    assert [summary["geometry"] for summary in summaries] == points
+
+
 def test_get_summary_by_hexids_invalid_fields(client):
     request_payload = {
         "hex_ids": ["862a1070fffffff"],
@@ -337,6 +579,147 @@ def test_get_timeseries_by_hexids(setup_timeseries_data, timeseries_data, client
     assert response.json() == timeseries_data
 
 
+def test_get_timeseries_by_hexids_cells_layout(
+    setup_timeseries_data, timeseries_data, client
+):
+    """Test the layout holding the geometry of each cell once."""
+    response = client.post(
+        "/timeseries_by_hexids",
+        json={
+            "hex_ids": ["8611822e7ffffff"],
+            "fields": ["field1", "field2"],
+            "geometry": "point",
+            "layout": "cells",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "hex_id": "8611822e7ffffff",
+            "geometry": generate_h3_geometries([0x8611822E7FFFFFF], "point")[0],
+            "timeseries": [
+                {key: value for key, value in row.items() if key != "hex_id"}
+                for row in timeseries_data
+            ],
+        }
+    ]
+
+
+def test_get_timeseries_by_hexids_array_layouts(setup_timeseries_data, client):
+    """Test the layouts aggregated per cell by the database."""
+    payload = {
+        "hex_ids": ["8611822e7ffffff", "8611823e3ffffff"],
+        "fields": ["field1", "field2"],
+        "start_date": "2023-01-02",
+    }
+
+    response = client.post("/timeseries_by_hexids", json={**payload, "layout": "array"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "hex_id": "8611822e7ffffff",
+            "date": ["2023-01-02", "2023-01-03"],
+            "field1": [15, 20],
+            "field2": [25, 30],
+        },
+        {
+            "hex_id": "8611823e3ffffff",
+            "date": ["2023-01-02", "2023-01-03"],
+            "field1": [10, 15],
+            "field2": [20, 25],
+        },
+    ]
+
+    response = client.post("/timeseries_by_hexids", json={**payload, "layout": "wide"})
+    assert response.status_code == 200
+    assert response.json()[0] == {
+        "hex_id": "8611822e7ffffff",
+        "field1_2023-01-02": 15,
+        "field1_2023-01-03": 20,
+        "field2_2023-01-02": 25,
+        "field2_2023-01-03": 30,
+    }
+
+
+def test_get_timeseries_resampled(setup_timeseries_data, client):
+    """Test grouping the dates by period and reducing the cells of the AOI."""
+    aoi = {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [
+                [
+                    [38.15, 53.37],
+                    [38.17, 53.37],
+                    [38.17, 53.39],
+                    [38.15, 53.39],
+                    [38.15, 53.37],
+                ]
+            ],
+        },
+        "properties": {},
+    }
+    response = client.post(
+        "/timeseries",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "centroid",
+            "fields": ["field1"],
+            "temporal_resolution": "year",
+            "aggregation_type": ["max", "p50"],
+            "spatial_aggregate": True,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"date": "2023-01-01", "field1_max": 20, "field1_p50": 15}
+    ]
+
+    response = client.post(
+        "/timeseries_by_hexids",
+        json={
+            "hex_ids": ["8611822e7ffffff", "8611823e3ffffff"],
+            "fields": ["field1"],
+            "temporal_resolution": "climatology",
+            "aggregation_type": "sum",
+            "layout": "array",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"hex_id": "8611822e7ffffff", "month": [1], "field1": [45]},
+        {"hex_id": "8611823e3ffffff", "month": [1], "field1": [30]},
+    ]
+
+
+@pytest.mark.parametrize(
+    "options,status_code",
+    [
+        ({"temporal_resolution": "week"}, 422),
+        ({"temporal_resolution": "year", "aggregation_type": "weighted_avg"}, 400),
+        ({"spatial_aggregate": True, "layout": "wide"}, 400),
+        ({"spatial_aggregate": True, "geometry": "point"}, 400),
+    ],
+)
+def test_get_timeseries_invalid_resampling(
+    setup_timeseries_data, client, options, status_code
+):
+    response = client.post(
+        "/timeseries_by_hexids",
+        json={"hex_ids": ["8611822e7ffffff"], "fields": ["field1"], **options},
+    )
+    assert response.status_code == status_code
+
+
+def test_get_timeseries_invalid_layout(setup_timeseries_data, client):
+    response = client.post(
+        "/timeseries_by_hexids",
+        json={"hex_ids": ["8611822e7ffffff"], "fields": ["field1"], "layout": "pivot"},
+    )
+    assert response.status_code == 422
+
+
 def test_get_timeseries_date_filtering(setup_timeseries_data, client):
     """Test date filtering in timeseries endpoint."""
     # Test with only start_date
@@ -726,3 +1109,490 @@ def test_timeseries_end_date_before_start_date(setup_timeseries_data, client):
     assert (
         "start_date" in error_detail.lower() or "end_date" in error_detail.lower()
     ), f"Error message should mention date range issue: {error_detail}"
+
+
+def test_get_summary_arrow(client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020", "sum_pop_f_10_2020"],
+        "geometry": "point",
+    }
+    expected = client.post("/summary", json=request_payload).json()
+
+    response = client.post(
+        "/summary",
+        json=request_payload,
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == [
+        "hex_id",
+        "geometry",
+        "sum_pop_2020",
+        "sum_pop_f_10_2020",
+    ]
+    assert table.schema.field("geometry").metadata == {
+        b"ARROW:extension:name": b"geoarrow.wkb",
+        b"ARROW:extension:metadata": b"{}",
+    }
+    assert table["hex_id"].to_pylist() == [row["hex_id"] for row in expected]
+    assert table["sum_pop_2020"].to_pylist() == [
+        row["sum_pop_2020"] for row in expected
+    ]
+    points = generate_h3_geometries(
+        [int(h, 16) for h in table["hex_id"].to_pylist()], "point"
+    )
+    for wkb, point in zip(table["geometry"].to_pylist(), points):
+        assert shapely.from_wkb(wkb).equals(from_geojson(point))
+
+
+def test_get_summary_by_hexids_parquet(client):
+    request_payload = {
+        "hex_ids": ["862a1070fffffff", "862a10767ffffff"],
+        "fields": ["sum_pop_2020"],
+    }
+    expected = client.post("/summary_by_hexids", json=request_payload).json()
+
+    response = client.post(
+        "/summary_by_hexids",
+        json=request_payload,
+        headers={"Accept": "application/x-parquet"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-parquet"
+
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.to_pylist() == expected
+
+
+def test_get_summary_arrow_invalid_fields(client):
+    response = client.post(
+        "/summary",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "touches",
+            "fields": ["a_non_existent_field"],
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid fields: ['a_non_existent_field']"}
+
+
+def test_get_timeseries_by_hexids_arrow(setup_timeseries_data, client):
+    """Test retrieving timeseries data as an Arrow IPC stream."""
+    response = client.post(
+        "/timeseries_by_hexids",
+        json={
+            "hex_ids": ["8611822e7ffffff"],
+            "start_date": "2023-01-01",
+            "end_date": "2023-01-03",
+            "fields": ["field1", "field2"],
+            "geometry": "polygon",
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("date").type == pa.date32()
+    assert pa.types.is_dictionary(table.schema.field("hex_id").type)
+    assert pa.types.is_dictionary(table.schema.field("geometry").type)
+
+    hex_id = table["hex_id"].combine_chunks()
+    assert hex_id.dictionary.to_pylist() == ["8611822e7ffffff"]
+    assert [d.isoformat() for d in table["date"].to_pylist()] == [
+        "2023-01-01",
+        "2023-01-02",
+        "2023-01-03",
+    ]
+    assert table["field1"].to_pylist() == [10, 15, 20]
+
+    geometry = table["geometry"].combine_chunks()
+    assert len(geometry.dictionary) == 1
+    assert shapely.from_wkb(geometry.dictionary[0].as_py()).geom_type == "Polygon"
+
+
+def test_get_summary_ndjson_requires_streaming(client):
+    response = client.post(
+        "/summary",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "touches",
+            "fields": ["sum_pop_2020"],
+        },
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 406
+
+
+def test_get_summary_streaming_ndjson(streaming_client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020", "sum_pop_f_10_2020"],
+    }
+    expected = streaming_client.post("/summary", json=request_payload).json()
+
+    response = streaming_client.post(
+        "/summary",
+        json=request_payload,
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-length" not in response.headers
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == expected
+
+
+def test_get_summary_streaming_single_connection(monkeypatch):
+    """Test that streamed responses hold a single pooled connection."""
+    monkeypatch.setenv("STREAMING_ENABLED", "true")
+    monkeypatch.setenv("STREAMING_BATCH_SIZE", "1")
+    monkeypatch.setenv("DB_MIN_CONN_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_CONN_SIZE", "1")
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020"],
+    }
+    with TestClient(build_app()) as client:
+        expected = client.post("/summary", json=request_payload).json()
+        response = client.post(
+            "/summary",
+            json=request_payload,
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == expected
+
+
+def test_get_summary_streaming_ndjson_geometry_object(streaming_client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020"],
+        "geometry": "polygon",
+    }
+    expected = streaming_client.post("/summary", json=request_payload).json()
+
+    response = streaming_client.post(
+        "/summary",
+        json={**request_payload, "geometry_format": "object"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {**row, "geometry": json.loads(row["geometry"])} for row in expected
+    ]
+
+
+def test_get_summary_streaming_arrow(streaming_client):
+    request_payload = {
+        "aoi": aoi,
+        "spatial_join_method": "touches",
+        "fields": ["sum_pop_2020"],
+        "geometry": "polygon",
+    }
+    expected = streaming_client.post("/summary", json=request_payload).json()
+
+    response = streaming_client.post(
+        "/summary",
+        json=request_payload,
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    reader = pa.ipc.open_stream(response.content)
+    batches = list(reader)
+    assert len(expected) > 1
+    assert [batch.num_rows for batch in batches] == [1] * len(expected)
+
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    assert table["hex_id"].to_pylist() == [row["hex_id"] for row in expected]
+    assert table.schema.field("geometry").metadata == {
+        b"ARROW:extension:name": b"geoarrow.wkb",
+        b"ARROW:extension:metadata": b"{}",
+    }
+
+
+def test_get_summary_streaming_invalid_fields(streaming_client):
+    response = streaming_client.post(
+        "/summary",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "touches",
+            "fields": ["a_non_existent_field"],
+        },
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": "Invalid fields: ['a_non_existent_field']"}
+
+
+def test_get_timeseries_by_hexids_streaming_ndjson(
+    setup_timeseries_data, timeseries_data, streaming_client
+):
+    response = streaming_client.post(
+        "/timeseries_by_hexids",
+        json={
+            "hex_ids": ["8611822e7ffffff"],
+            "start_date": "2023-01-01",
+            "end_date": "2023-01-03",
+            "fields": ["field1", "field2"],
+        },
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == timeseries_data
+
+
+def test_get_timeseries_by_hexids_streaming_empty(
+    setup_timeseries_data, streaming_client
+):
+    response = streaming_client.post(
+        "/timeseries_by_hexids",
+        json={
+            "hex_ids": ["8611822e7ffffff"],
+            "start_date": "2030-01-01",
+            "fields": ["field1"],
+            "geometry": "point",
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 0
+    assert table.column_names == ["hex_id", "date", "field1", "geometry"]
+
+
+far_aoi = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [
+            [[-150.1, 10.1], [-150.0, 10.1], [-150.0, 10.2], [-150.1, 10.1]]
+        ],
+    },
+    "properties": {},
+}
+
+
+def test_get_summary_batch(client):
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+    expected = client.post(
+        "/summary",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "touches",
+            "fields": fields,
+            "geometry": "point",
+        },
+    ).json()
+
+    response = client.post(
+        "/summary/batch",
+        json={
+            "aois": {
+                "type": "FeatureCollection",
+                "features": [{**aoi, "id": "a"}, far_aoi, aoi],
+            },
+            "spatial_join_method": "touches",
+            "fields": fields,
+            "geometry": "point",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+
+    assert list(response_json) == ["a", "1", "2"]
+    assert response_json["1"] == []
+    for rows in (response_json["a"], response_json["2"]):
+        assert [row["hex_id"] for row in rows] == [row["hex_id"] for row in expected]
+        assert [row["sum_pop_2020"] for row in rows] == [
+            row["sum_pop_2020"] for row in expected
+        ]
+        points = generate_h3_geometries(
+            [int(row["hex_id"], 16) for row in rows], "point"
+        )
+        assert [row["geometry"] for row in rows] == list(points)
+
+
+def test_get_summary_batch_arrow(client):
+    response = client.post(
+        "/summary/batch",
+        json={
+            "aois": {
+                "type": "FeatureCollection",
+                "features": [{**aoi, "id": 7}, far_aoi],
+            },
+            "spatial_join_method": "touches",
+            "fields": ["sum_pop_2020"],
+            "geometry": "polygon",
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["feature_id", "hex_id", "geometry", "sum_pop_2020"]
+    assert set(table["feature_id"].to_pylist()) == {"7"}
+
+
+def test_get_aggregate_batch(client):
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+    expected = client.post(
+        "/aggregate",
+        json={
+            "aoi": aoi,
+            "spatial_join_method": "touches",
+            "fields": fields,
+            "aggregation_type": "sum",
+        },
+    ).json()
+
+    response = client.post(
+        "/aggregate/batch",
+        json={
+            "aois": {"type": "FeatureCollection", "features": [aoi, far_aoi]},
+            "spatial_join_method": "touches",
+            "fields": fields,
+            "aggregation_type": "sum",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {"0": expected, "1": {}}
+
+
+@pytest.mark.parametrize(
+    "features, fields, error",
+    [
+        (
+            [{**aoi, "id": "a"}, {**aoi, "id": "a"}],
+            ["sum_pop_2020"],
+            "Feature ids must be unique within a batch",
+        ),
+        ([aoi], ["a_non_existent_field"], "Invalid fields: ['a_non_existent_field']"),
+    ],
+)
+def test_get_aggregate_batch_invalid(client, features, fields, error):
+    response = client.post(
+        "/aggregate/batch",
+        json={
+            "aois": {"type": "FeatureCollection", "features": features},
+            "spatial_join_method": "touches",
+            "fields": fields,
+            "aggregation_type": "sum",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json() == {"error": error}
+
+
+@pytest.mark.parametrize(
+    "spatial_join_method, hex_ids",
+    [
+        (
+            "touches",
+            {
+                "ADM-1": ["862a1070fffffff", "862a10767ffffff"],
+                "ADM-2": ["867a74807ffffff", "867a74817ffffff"],
+            },
+        ),
+        (
+            "centroid",
+            {
+                "ADM-1": ["862a1070fffffff"],
+                "ADM-2": ["867a74807ffffff", "867a74817ffffff"],
+            },
+        ),
+        ("within", {"ADM-1": ["862a1070fffffff"], "ADM-2": ["867a74817ffffff"]}),
+    ],
+)
+def test_get_summary_by_admin(client, setup_admin_data, spatial_join_method, hex_ids):
+    response = client.post(
+        "/summary_by_admin",
+        json={
+            "admin_ids": ["ADM-2", "ADM-1", "ADM-3"],
+            "spatial_join_method": spatial_join_method,
+            "fields": ["sum_pop_2020"],
+            "geometry": "point",
+        },
+    )
+    assert response.status_code == 200
+    response_json = response.json()
+
+    assert list(response_json) == ["ADM-2", "ADM-1", "ADM-3"]
+    assert response_json["ADM-3"] == []
+    for admin_id, expected in hex_ids.items():
+        rows = response_json[admin_id]
+        assert [row["hex_id"] for row in rows] == expected
+        assert [row["geometry"] for row in rows] == list(
+            generate_h3_geometries([int(h, 16) for h in expected], "point")
+        )
+
+
+def test_get_summary_by_admin_arrow(client, setup_admin_data):
+    response = client.post(
+        "/summary_by_admin",
+        json={
+            "admin_ids": ["ADM-1", "ADM-2"],
+            "spatial_join_method": "within",
+            "fields": ["sum_pop_2020"],
+            "geometry": "polygon",
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["admin_id", "hex_id", "geometry", "sum_pop_2020"]
+    assert table.select(["admin_id", "hex_id", "sum_pop_2020"]).to_pylist() == [
+        {"admin_id": "ADM-1", "hex_id": "862a1070fffffff", "sum_pop_2020": 100},
+        {"admin_id": "ADM-2", "hex_id": "867a74817ffffff", "sum_pop_2020": 125},
+    ]
+
+
+def test_get_aggregate_by_admin(client, setup_admin_data):
+    response = client.post(
+        "/aggregate_by_admin",
+        json={
+            "admin_ids": ["ADM-1", "ADM-2", "ADM-3"],
+            "spatial_join_method": "centroid",
+            "fields": ["sum_pop_2020"],
+            "aggregation_type": ["sum", "count"],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "ADM-1": {"sum_pop_2020_sum": 100, "sum_pop_2020_count": 1},
+        "ADM-2": {"sum_pop_2020_sum": 250, "sum_pop_2020_count": 2},
+        "ADM-3": {},
+    }
+
+
+def test_get_aggregate_by_admin_without_table(client):
+    response = client.post(
+        "/aggregate_by_admin",
+        json={
+            "admin_ids": ["ADM-1"],
+            "spatial_join_method": "touches",
+            "fields": ["sum_pop_2020"],
+            "aggregation_type": "sum",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json() == {
+        "error": "Admin membership table space2stats_admin does not exist"
+    }
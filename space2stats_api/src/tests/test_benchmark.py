@@ -1,8 +1,24 @@
+import asyncio
 import os
+from datetime import date, timedelta
+from types import SimpleNamespace
 
+import httpx
+import numpy as np
 import pytest
 import requests
-from shapely.geometry import Point, Polygon
+from h3ronpy import cells_to_string
+from shapely import from_wkb, to_geojson
+from shapely.geometry import Point, Polygon, box, mapping
+from space2stats.api.app import build_app
+from space2stats.h3_utils import (
+    generate_h3_geometries,
+    generate_h3_ids,
+    generate_h3_wkb,
+    polyfill_executor,
+)
+from space2stats.lib import StatsTable
+from space2stats_ingest.main import build_rollup_tables
 
 
 def generate_aoi_params(area, centroid_latitude, centroid_longitude):
@@ -76,3 +92,203 @@ def test_benchmark_summary_aoi_10_varying_fields(
         centroid_longitude=37.9062,
         fields=field_subset,
     )
+
+
+@pytest.mark.parametrize("area", [1, 10, 50])
+@pytest.mark.parametrize("copy_ids", [False, True], ids=["array", "copy"])
+def test_benchmark_aggregate_id_transfer(benchmark, area, copy_ids, database):
+    """Compare binding H3 ids as a text array with streaming them through COPY."""
+    aoi = generate_aoi_params(
+        area, centroid_latitude=0.0236, centroid_longitude=37.9062
+    )
+
+    with StatsTable.connect() as stats_table:
+        stats_table.copy_ids_threshold = 0 if copy_ids else None
+        h3_ids = stats_table._get_h3_ids_for_aoi(aoi, "centroid")
+
+        benchmark(
+            stats_table._aggregate_by_h3_ids,
+            h3_ids,
+            ["sum_pop_2020", "sum_pop_f_10_2020"],
+            "sum",
+        )
+
+
+@pytest.fixture
+def populated_h3_ids(database):
+    """Fill the statistics table with 50k cells and return their ids."""
+    h3_ids = generate_h3_ids(mapping(box(31.0, -6.0, 44.0, 7.0)), 6, "centroid")
+    h3_ids = h3_ids.to_pylist()[:50_000]
+    hex_ids = cells_to_string(h3_ids).to_pylist()
+
+    with StatsTable.connect() as stats_table:
+        with stats_table.conn.cursor() as cur:
+            cur.execute("DELETE FROM space2stats")
+            with cur.copy(
+                "COPY space2stats (hex_id, sum_pop_2020, sum_pop_f_10_2020) FROM STDIN"
+            ) as copy:
+                for i, hex_id in enumerate(hex_ids):
+                    copy.write_row((hex_id, i, i))
+            cur.execute("ANALYZE space2stats")
+        stats_table.conn.commit()
+
+    return h3_ids
+
+
+@pytest.mark.parametrize("cell_count", [1_000, 10_000, 50_000])
+def test_benchmark_get_summaries_cell_count(benchmark, cell_count, populated_h3_ids):
+    """Latency of fetching ordered summaries as the number of cells grows."""
+    h3_ids = populated_h3_ids[:cell_count]
+
+    with StatsTable.connect() as stats_table:
+        rows, _ = benchmark(
+            stats_table._get_summaries, fields=["sum_pop_2020"], h3_ids=h3_ids
+        )
+
+    assert len(rows) == cell_count
+
+
+@pytest.mark.parametrize("area", [1, 10, 50])
+@pytest.mark.parametrize("use_rollups", [False, True], ids=["cells", "rollups"])
+def test_benchmark_aggregate_rollups(
+    benchmark, area, use_rollups, populated_h3_ids, database
+):
+    """Compare aggregating level 6 cells with reading compacted parents from rollups."""
+    connection_string = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    build_rollup_tables(connection_string)
+
+    aoi = generate_aoi_params(
+        area, centroid_latitude=0.0236, centroid_longitude=37.9062
+    )
+
+    with StatsTable.connect() as stats_table:
+        stats_table.use_rollups = use_rollups
+        benchmark(
+            stats_table.aggregate,
+            aoi,
+            "centroid",
+            ["sum_pop_2020", "sum_pop_f_10_2020"],
+            "sum",
+        )
+
+
+@pytest.mark.parametrize("processes", [0, 4])
+@pytest.mark.parametrize("area", [10, 100, 400])
+def test_benchmark_polyfill_processes(benchmark, area, processes):
+    """Polyfill of large AOIs in the request thread and split across processes."""
+    # A detailed outline, like the boundary of a country
+    aoi = mapping(Point(20, 10).buffer((area / 3.14) ** 0.5, quad_segs=5_000))
+    if not processes:
+        benchmark(generate_h3_ids, aoi, 6, "touches")
+        return
+
+    with polyfill_executor(processes) as executor:
+        # Start the workers before timing
+        generate_h3_ids(aoi, 6, "touches", executor=executor)
+        benchmark(generate_h3_ids, aoi, 6, "touches", executor=executor)
+
+
+@pytest.mark.parametrize("simplify", [False, True], ids=["outline", "simplified"])
+@pytest.mark.parametrize("spatial_join_method", ["touches", "centroid"])
+def test_benchmark_polyfill_simplify(benchmark, spatial_join_method, simplify):
+    """Polyfill of a detailed outline as is and from its simplification."""
+    # 100k vertices with a ~200m noise, like an ESRI or geoBoundaries coastline
+    angles = np.linspace(0, 2 * np.pi, 100_000, endpoint=False)
+    radii = 2 * (1 + 0.05 * np.sin(7 * angles))
+    radii += np.random.default_rng(0).normal(0, 0.002, len(angles))
+    aoi = mapping(Polygon(np.c_[20 + radii * np.cos(angles), radii * np.sin(angles)]))
+
+    benchmark(generate_h3_ids, aoi, 6, spatial_join_method, simplify=simplify)
+
+
+def _shapely_geojson(h3_ids, geometry_type):
+    return to_geojson(from_wkb(generate_h3_wkb(h3_ids, geometry_type)))
+
+
+@pytest.mark.parametrize("geometry_type", ["polygon", "point"])
+@pytest.mark.parametrize(
+    "generate", [_shapely_geojson, generate_h3_geometries], ids=["shapely", "wkb"]
+)
+def test_benchmark_h3_geometries(benchmark, generate, geometry_type):
+    """GeoJSON of ~75k cells through shapely and read straight from the WKB."""
+    h3_ids = generate_h3_ids(mapping(box(0, 0, 20, 10)), 6, "touches")
+
+    benchmark(generate, h3_ids, geometry_type)
+
+
+@pytest.mark.parametrize("layout", ["long", "cells"])
+def test_benchmark_format_timeseries_geometry(benchmark, layout):
+    """Format 2k cells x 250 dates of timeseries with their polygons."""
+    h3_ids = generate_h3_ids(mapping(box(0, 0, 3, 3)), 6, "centroid").to_numpy()[:2_000]
+    hex_ids = cells_to_string(h3_ids).to_pylist()
+    dates = [date(2000, 1, 1) + timedelta(days=i) for i in range(250)]
+    rows = [(hex_id, day, 1.0) for hex_id in hex_ids for day in dates]
+    description = [SimpleNamespace(name=name) for name in ["hex_id", "date", "field1"]]
+
+    results = benchmark(
+        StatsTable._format_timeseries, rows, description, "polygon", layout
+    )
+    assert len(results) == (len(rows) if layout == "long" else len(hex_ids))
+
+
+@pytest.mark.parametrize("threadpool_size", [1, 40])
+@pytest.mark.parametrize("concurrency", [1, 10])
+def test_benchmark_concurrent_summary_requests(
+    benchmark, monkeypatch, concurrency, threadpool_size, populated_h3_ids
+):
+    """Throughput of concurrent /summary requests for a number of worker threads."""
+    request_count = 50
+    payload = {
+        "aoi": generate_aoi_params(
+            1, centroid_latitude=0.0236, centroid_longitude=37.9062
+        ),
+        "spatial_join_method": "centroid",
+        "fields": ["sum_pop_2020", "sum_pop_f_10_2020"],
+    }
+    monkeypatch.setenv("THREADPOOL_SIZE", str(threadpool_size))
+    app = build_app()
+
+    async def load(client: httpx.AsyncClient) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post() -> None:
+            async with semaphore:
+                response = await client.post("/summary", json=payload)
+                assert response.status_code == 200
+
+        await asyncio.gather(*(post() for _ in range(request_count)))
+
+    # The thread limiter set up by the lifespan belongs to its event loop
+    loop = asyncio.new_event_loop()
+    lifespan = app.router.lifespan_context(app)
+    loop.run_until_complete(lifespan.__aenter__())
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+    try:
+        benchmark.pedantic(
+            lambda: loop.run_until_complete(load(client)), rounds=5, warmup_rounds=1
+        )
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.run_until_complete(lifespan.__aexit__(None, None, None))
+        loop.close()
+
+    benchmark.extra_info["requests_per_second"] = (
+        request_count / benchmark.stats.stats.mean
+    )
+
+
+@pytest.mark.parametrize("prepare", [False, True], ids=["unprepared", "prepared"])
+def test_benchmark_prepared_summaries(benchmark, prepare, populated_h3_ids):
+    """Latency of a repeated summary query with and without a prepared statement."""
+    h3_ids = populated_h3_ids[:1_000]
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+
+    with StatsTable.connect(PREPARE_STATEMENTS=prepare) as stats_table:
+        if not prepare:
+            # Also disable psycopg's automatic preparation of repeated queries
+            stats_table.conn.prepare_threshold = None
+        rows, _ = benchmark(stats_table._get_summaries, fields=fields, h3_ids=h3_ids)
+
+    assert len(rows) == 1_000
@@ -1,8 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+import pyarrow as pa
 import pytest
 from h3ronpy import cells_parse
-from shapely import from_geojson
-from shapely.geometry import MultiPolygon, Polygon, mapping
-from space2stats.h3_utils import generate_h3_geometries, generate_h3_ids
+from shapely import area, equals_exact, from_geojson, from_wkb, to_geojson
+from shapely.geometry import MultiPolygon, Point, Polygon, mapping
+from space2stats.h3_utils import (
+    DiskCacheBackend,
+    PolyfillCache,
+    RedisCacheBackend,
+    cache_backend_from_url,
+    generate_h3_geometries,
+    generate_h3_ids,
+    generate_h3_ids_batch,
+    generate_h3_weights,
+    generate_h3_weights_batch,
+    generate_h3_wkb,
+    polyfill_executor,
+    simplify_tolerance,
+    wkb_to_geojson,
+)
 
 polygon_coords_1 = [
     [-74.3, 40.5],
@@ -140,3 +159,275 @@ def test_generate_h3_sliver_polygon_centroid():
 
 if __name__ == "__main__":
     pytest.main()
+
+
+def test_generate_h3_ids_cache_hit():
+    cache = PolyfillCache()
+    h3_ids = generate_h3_ids(aoi_geojson_multi, resolution, "touches", cache=cache)
+    cached = generate_h3_ids(aoi_geojson_multi, resolution, "touches", cache=cache)
+
+    assert cached.to_numpy().tolist() == h3_ids.to_numpy().tolist()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_polyfill_cache_key():
+    polygon = Polygon(polygon_coords_1)
+    reversed_polygon = Polygon(polygon_coords_1[::-1])
+
+    assert PolyfillCache.key(polygon, 6, "touches") == PolyfillCache.key(
+        reversed_polygon, 6, "touches"
+    )
+    assert PolyfillCache.key(polygon, 6, "touches") != PolyfillCache.key(
+        polygon, 5, "touches"
+    )
+    assert PolyfillCache.key(polygon, 6, "touches") != PolyfillCache.key(
+        polygon, 6, "centroid"
+    )
+
+
+def test_polyfill_cache_evicts_least_recently_used():
+    cells = generate_h3_ids(mapping(Polygon(polygon_coords_1)), resolution, "touches")
+    cache = PolyfillCache(max_bytes=2 * cells.nbytes)
+
+    cache.set("a", cells)
+    cache.set("b", cells)
+    cache.get("a")
+    cache.set("c", cells)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["bytes"] == 2 * cells.nbytes
+
+
+def test_polyfill_cache_disk_backend(tmp_path):
+    backend = cache_backend_from_url(f"file://{tmp_path}")
+    assert isinstance(backend, DiskCacheBackend)
+
+    h3_ids = generate_h3_ids(
+        aoi_geojson_multi, resolution, "touches", cache=PolyfillCache(backend=backend)
+    )
+
+    # A new process starts with an empty in-process cache
+    cache = PolyfillCache(backend=backend)
+    cached = generate_h3_ids(aoi_geojson_multi, resolution, "touches", cache=cache)
+
+    assert cached.to_numpy().tolist() == h3_ids.to_numpy().tolist()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 0
+
+
+def test_polyfill_cache_redis_backend():
+    class FakeRedis(dict):
+        def set(self, key, value, ex=None):
+            self[key] = value
+
+    client = FakeRedis()
+    backend = RedisCacheBackend(client)
+
+    h3_ids = generate_h3_ids(
+        aoi_geojson_multi, resolution, "centroid", cache=PolyfillCache(backend=backend)
+    )
+    cache = PolyfillCache(backend=backend)
+    cached = generate_h3_ids(aoi_geojson_multi, resolution, "centroid", cache=cache)
+
+    assert all(key.startswith("space2stats:polyfill:") for key in client)
+    assert cached.to_numpy().tolist() == h3_ids.to_numpy().tolist()
+    assert cache.stats()["hits"] == 1
+
+
+def test_polyfill_cache_invalid_url():
+    with pytest.raises(ValueError, match="Unsupported polyfill cache URL"):
+        cache_backend_from_url("memcached://localhost")
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with polyfill_executor(max_workers=2) as executor:
+        yield executor
+
+
+# An island and a large, detailed polygon at high latitude, split into tiles
+archipelago = MultiPolygon(
+    [
+        Point(25, 62).buffer(2.5, quad_segs=256),
+        Point(40, -10).buffer(0.3),
+    ]
+)
+
+
+@pytest.mark.parametrize("spatial_join_method", ["touches", "within", "centroid"])
+def test_generate_h3_ids_parallel(executor, spatial_join_method):
+    h3_ids = generate_h3_ids(mapping(archipelago), resolution, spatial_join_method)
+    parallel = generate_h3_ids(
+        mapping(archipelago),
+        resolution,
+        spatial_join_method,
+        executor=executor,
+        parallel_min_area=1,
+    )
+
+    assert sorted(parallel.to_numpy().tolist()) == sorted(h3_ids.to_numpy().tolist())
+    # Cells on the seams of the tiles are only returned once
+    assert len(set(parallel.to_numpy().tolist())) == len(parallel)
+
+
+def test_generate_h3_ids_parallel_below_threshold():
+    class FailingExecutor:
+        def map(self, *args):
+            raise AssertionError("Small AOIs are polyfilled in the calling thread")
+
+    h3_ids = generate_h3_ids(
+        aoi_geojson_multi, resolution, "touches", executor=FailingExecutor()
+    )
+    assert len(h3_ids) > 0
+
+
+def test_generate_h3_ids_batch_parallel(executor):
+    aois = [mapping(archipelago), aoi_geojson_multi]
+    h3_ids = generate_h3_ids_batch(aois, resolution, "centroid")
+    parallel = generate_h3_ids_batch(
+        aois, resolution, "centroid", executor=executor, parallel_min_area=1
+    )
+
+    for cells, parallel_cells in zip(h3_ids, parallel):
+        assert sorted(parallel_cells.to_numpy().tolist()) == sorted(
+            cells.to_numpy().tolist()
+        )
+
+
+def test_generate_h3_ids_batch_keeps_executor():
+    class RecordingExecutor(ThreadPoolExecutor):
+        calls = 0
+
+        def map(self, *args, **kwargs):
+            RecordingExecutor.calls += 1
+            return super().map(*args, **kwargs)
+
+    aois = [mapping(archipelago), aoi_geojson_multi]
+    with RecordingExecutor(max_workers=2) as executor:
+        generate_h3_ids_batch(
+            aois, resolution, "touches", executor=executor, parallel_min_area=0
+        )
+    # Each AOI is split across the given executor, not the batch's threads
+    assert RecordingExecutor.calls == len(aois)
+
+
+def test_generate_h3_ids_parallel_workers():
+    class RecordingExecutor(ThreadPoolExecutor):
+        pieces: List[int] = []
+
+        def map(self, fn, *iterables, **kwargs):
+            RecordingExecutor.pieces.append(len(iterables[0]))
+            return super().map(fn, *iterables, **kwargs)
+
+    with RecordingExecutor(max_workers=1) as executor:
+        for parallel_workers in [1, 4]:
+            generate_h3_ids(
+                mapping(archipelago),
+                resolution,
+                "touches",
+                executor=executor,
+                parallel_min_area=0.1,
+                parallel_workers=parallel_workers,
+            )
+    # The AOI is split into more tiles for more workers, whatever the executor
+    assert RecordingExecutor.pieces[0] < RecordingExecutor.pieces[1]
+
+
+def test_generate_h3_weights():
+    h3_ids, weights = generate_h3_weights(aoi_geojson_multi, resolution)
+
+    touches = generate_h3_ids(aoi_geojson_multi, resolution, "touches").to_numpy()
+    within = generate_h3_ids(aoi_geojson_multi, resolution, "within").to_numpy()
+    assert set(h3_ids.tolist()) <= set(touches.tolist())
+    assert set(h3_ids[weights == 1].tolist()) == set(within.tolist())
+    assert ((weights > 0) & (weights <= 1)).all()
+
+    # The weighted cells add up to the area of the AOI
+    cells_area = area(from_wkb(generate_h3_wkb(h3_ids)))
+    aoi_area = multi_polygon.area
+    assert np.isclose((cells_area * weights).sum(), aoi_area)
+
+    [(batch_ids, batch_weights), _] = generate_h3_weights_batch(
+        [aoi_geojson_multi, aoi_geojson_multi], resolution
+    )
+    assert batch_ids.tolist() == h3_ids.tolist()
+    assert batch_weights.tolist() == weights.tolist()
+
+
+def detailed_outline(n, radius, x, y, seed=0):
+    """A jagged ring of ``n`` vertices, like the coastline of admin boundaries."""
+    rng = np.random.default_rng(seed)
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    radii = radius * (1 + 0.05 * np.sin(7 * angles)) + rng.normal(0, 0.002, n)
+    return Polygon(np.c_[x + radii * np.cos(angles), y + radii * np.sin(angles)])
+
+
+@pytest.mark.parametrize("spatial_join_method", ["touches", "within", "centroid"])
+def test_generate_h3_ids_simplify(spatial_join_method):
+    aoi = mapping(
+        MultiPolygon(
+            [detailed_outline(20_000, 1, 20, 10), detailed_outline(5_000, 0.3, 40, -10)]
+        )
+    )
+    h3_ids = generate_h3_ids(aoi, resolution, spatial_join_method)
+    simplified = generate_h3_ids(aoi, resolution, spatial_join_method, simplify=True)
+
+    assert sorted(simplified.to_numpy().tolist()) == sorted(h3_ids.to_numpy().tolist())
+
+
+def test_generate_h3_ids_simplify_invalid_geometry():
+    # A self-intersecting bow tie, made valid as two triangles
+    bow_tie = Polygon([(0, 0), (1, 1), (1, 0), (0, 1), (0, 0)])
+    triangles = MultiPolygon(
+        [
+            Polygon([(0, 0), (0.5, 0.5), (0, 1), (0, 0)]),
+            Polygon([(1, 0), (0.5, 0.5), (1, 1), (1, 0)]),
+        ]
+    )
+    h3_ids = generate_h3_ids(mapping(bow_tie), resolution, "centroid", simplify=True)
+    expected = generate_h3_ids(mapping(triangles), resolution, "centroid")
+
+    assert sorted(h3_ids.to_numpy().tolist()) == sorted(expected.to_numpy().tolist())
+
+
+def test_generate_h3_ids_simplify_clips_to_bounds():
+    aoi = mapping(Polygon([(179, 0), (181, 0), (181, 1), (179, 1), (179, 0)]))
+    h3_ids = generate_h3_ids(aoi, resolution, "touches", simplify=True)
+    clipped = generate_h3_ids(
+        mapping(Polygon([(179, 0), (180, 0), (180, 1), (179, 1), (179, 0)])),
+        resolution,
+        "touches",
+    )
+
+    assert sorted(h3_ids.to_numpy().tolist()) == sorted(clipped.to_numpy().tolist())
+
+
+def test_simplify_tolerance():
+    # A tenth of the ~3.2km edge of level 6 cells, in degrees
+    assert simplify_tolerance(6) == pytest.approx(0.0029, abs=1e-4)
+    assert simplify_tolerance(7) < simplify_tolerance(6)
+
+
+@pytest.mark.parametrize("geometry_type", ["polygon", "point"])
+def test_generate_h3_geometries_matches_shapely(geometry_type):
+    h3_ids = generate_h3_ids(aoi_geojson_multi, resolution, "touches")
+    geometries = generate_h3_geometries(h3_ids, geometry_type)
+    expected = to_geojson(from_wkb(generate_h3_wkb(h3_ids, geometry_type)))
+
+    assert len(geometries) == len(expected)
+    for geometry, shapely_geometry in zip(geometries, expected):
+        assert equals_exact(from_geojson(geometry), from_geojson(shapely_geometry), 0)
+
+
+def test_wkb_to_geojson_slice():
+    h3_ids = generate_h3_ids(aoi_geojson_multi, resolution, "touches")
+    wkb = pa.array(generate_h3_wkb(h3_ids, "polygon"))
+    geometries = generate_h3_geometries(h3_ids, "polygon")
+
+    assert wkb_to_geojson(wkb.slice(2, 3)) == geometries[2:5]
+    assert wkb_to_geojson(wkb.cast(pa.binary())) == geometries
+    assert wkb_to_geojson(wkb.slice(0, 0)) == []
@@ -1,9 +1,24 @@
 import json
+import re
 
 import psycopg
 import pyarrow as pa
 import pyarrow.parquet as pq
-from space2stats_ingest.main import load_parquet_to_db
+import pytest
+from h3ronpy import cells_parse, cells_to_string, change_resolution
+from h3ronpy.vector import cells_to_wkb_polygons
+from shapely import affinity, box, from_wkb
+from shapely.geometry import mapping
+from space2stats.lib import StatsTable
+from space2stats_ingest import main
+from space2stats_ingest.main import (
+    build_rollup_tables,
+    load_admin_membership,
+    load_parquet_to_db,
+    load_parquet_to_db_ts,
+    lowercase_columns,
+    migrate_hex_id_to_int8,
+)
 
 
 def test_load_parquet_to_db(clean_database, tmpdir):
@@ -55,6 +70,25 @@ def test_load_parquet_to_db(clean_database, tmpdir):
             assert result == ("hex_2", 200, 250)
 
 
+def test_load_parquet_to_db_s3(clean_database, tmpdir, s3_server):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    s3_server.upload_file(parquet_file, "mybucket", "local.parquet")
+
+    load_parquet_to_db("s3://mybucket/local.parquet", connection_string, item_file)
+
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM space2stats ORDER BY hex_id")
+            assert cur.fetchall() == [
+                ("862a1070fffffff", 100, 150),
+                ("862a10767ffffff", 200, 250),
+            ]
+
+
 def test_updating_table(clean_database, tmpdir):
     connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
 
@@ -343,3 +377,695 @@ def test_case_sensitivity_in_columns(clean_database, tmpdir):
             cur.execute("SELECT * FROM space2stats WHERE hex_id = 'hex_2'")
             result = cur.fetchone()
             assert result == ("hex_2", 200)
+
+
+def write_population_files(tmpdir, hex_ids):
+    parquet_file = tmpdir.join("local.parquet")
+    item_file = tmpdir.join("space2stats_population_2020.json")
+
+    table = pa.table(
+        {
+            "hex_id": hex_ids,
+            "sum_pop_f_10_2020": [100, 200],
+            "sum_pop_m_10_2020": [150, 250],
+        }
+    )
+    pq.write_table(table, parquet_file)
+
+    stac_item = {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": "space2stats_population_2020",
+        "properties": {
+            "table:columns": [
+                {"name": "hex_id", "type": "string"},
+                {"name": "sum_pop_f_10_2020", "type": "int64"},
+                {"name": "sum_pop_m_10_2020", "type": "int64"},
+            ],
+            "datetime": "2024-10-07T11:21:25.944150Z",
+        },
+        "geometry": None,
+        "bbox": [-180, -90, 180, 90],
+        "links": [],
+        "assets": {},
+    }
+    with open(item_file, "w") as f:
+        json.dump(stac_item, f)
+
+    return str(parquet_file), str(item_file)
+
+
+def test_load_parquet_to_db_int8_hex_id(clean_database, tmpdir):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    load_parquet_to_db(parquet_file, connection_string, item_file, hex_id_type="int8")
+
+    # New columns are converted to the int8 storage of the existing table
+    update_parquet_file = tmpdir.join("update_local.parquet")
+    update_item_file = tmpdir.join("update_item.json")
+    pq.write_table(
+        pa.table(
+            {
+                "hex_id": ["862a10767ffffff", "862a1070fffffff"],
+                "nighttime_lights": [20_000, 10_000],
+            }
+        ),
+        update_parquet_file,
+    )
+    with open(update_item_file, "w") as f:
+        json.dump(
+            {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": "space2stats_nighttime_lights_2020",
+                "properties": {
+                    "table:columns": [
+                        {"name": "hex_id", "type": "string"},
+                        {"name": "nighttime_lights", "type": "int64"},
+                    ],
+                    "datetime": "2024-10-07T11:21:25.944150Z",
+                },
+                "geometry": None,
+                "bbox": [-180, -90, 180, 90],
+                "links": [],
+                "assets": {},
+            },
+            f,
+        )
+    load_parquet_to_db(
+        str(update_parquet_file), connection_string, str(update_item_file)
+    )
+
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = 'space2stats' AND column_name = 'hex_id'"
+            )
+            assert cur.fetchone() == ("bigint",)
+
+            cur.execute(
+                "SELECT to_hex(hex_id), sum_pop_f_10_2020, nighttime_lights "
+                "FROM space2stats WHERE hex_id = x'862a1070fffffff'::bigint"
+            )
+            assert cur.fetchone() == ("862a1070fffffff", 100, 10_000)
+
+            cur.execute(
+                "SELECT 1 FROM pg_index "
+                "WHERE indrelid = 'space2stats'::regclass AND indisprimary"
+            )
+            assert cur.fetchone() is not None
+
+
+def test_load_parquet_to_db_resume(clean_database, tmpdir, monkeypatch):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    table = pa.table(
+        {
+            "hex_id": [f"hex_{i}" for i in range(10)],
+            "sum_pop_f_10_2020": list(range(10)),
+            "sum_pop_m_10_2020": list(range(10, 20)),
+        }
+    )
+    pq.write_table(table, parquet_file, row_group_size=2)
+
+    # Interrupt the load while reading the fourth of five row groups
+    batches = []
+
+    def interrupted(table):
+        batches.append(table.num_rows)
+        if len(batches) == 4:
+            raise RuntimeError("Connection lost")
+        return lowercase_columns(table)
+
+    monkeypatch.setattr(main, "lowercase_columns", interrupted)
+    with pytest.raises(RuntimeError):
+        load_parquet_to_db(parquet_file, connection_string, item_file)
+
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('space2stats')")
+            assert cur.fetchone() == (None,)
+            cur.execute("SELECT count(*) FROM space2stats_temp")
+            assert cur.fetchone() == (6,)
+
+    # Resuming only reads the remaining row groups
+    batches.clear()
+    load_parquet_to_db(
+        parquet_file, connection_string, item_file, workers=2, resume=True
+    )
+    assert len(batches) == 2
+
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT hex_id, sum_pop_f_10_2020, sum_pop_m_10_2020 "
+                "FROM space2stats ORDER BY sum_pop_f_10_2020"
+            )
+            assert cur.fetchall() == [(f"hex_{i}", i, i + 10) for i in range(10)]
+            cur.execute("SELECT to_regclass('space2stats_temp')")
+            assert cur.fetchone() == (None,)
+            cur.execute("SELECT count(*) FROM space2stats_ingest_checkpoint")
+            assert cur.fetchone() == (0,)
+
+
+@pytest.mark.parametrize("hex_id_type", ["text", "int8"])
+def test_load_parquet_to_db_rebuild(clean_database, tmpdir, hex_id_type):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    load_parquet_to_db(
+        parquet_file, connection_string, item_file, hex_id_type=hex_id_type
+    )
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT indexrelid::regclass::text FROM pg_index "
+                "WHERE indrelid = 'space2stats'::regclass"
+            )
+            indexes = cur.fetchall()
+
+    update_parquet_file = tmpdir.join("update_local.parquet")
+    update_item_file = tmpdir.join("update_item.json")
+    pq.write_table(
+        pa.table({"hex_id": ["862a10767ffffff"], "nighttime_lights": [20_000]}),
+        update_parquet_file,
+    )
+    with open(update_item_file, "w") as f:
+        json.dump(
+            {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": "space2stats_nighttime_lights_2020",
+                "properties": {
+                    "table:columns": [
+                        {"name": "hex_id", "type": "string"},
+                        {"name": "nighttime_lights", "type": "int64"},
+                    ],
+                    "datetime": "2024-10-07T11:21:25.944150Z",
+                },
+                "geometry": None,
+                "bbox": [-180, -90, 180, 90],
+                "links": [],
+                "assets": {},
+            },
+            f,
+        )
+    load_parquet_to_db(
+        str(update_parquet_file),
+        connection_string,
+        str(update_item_file),
+        strategy="rebuild",
+    )
+
+    hex_id = "hex_id" if hex_id_type == "text" else "to_hex(hex_id)"
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"SELECT {hex_id}, sum_pop_f_10_2020, sum_pop_m_10_2020, "
+                "nighttime_lights FROM space2stats ORDER BY hex_id"
+            )
+            assert cur.fetchall() == [
+                ("862a1070fffffff", 100, 150, None),
+                ("862a10767ffffff", 200, 250, 20_000),
+            ]
+
+            # The indexes are carried over under their original names
+            cur.execute(
+                "SELECT indexrelid::regclass::text FROM pg_index "
+                "WHERE indrelid = 'space2stats'::regclass"
+            )
+            assert cur.fetchall() == indexes
+            cur.execute(
+                "SELECT count(*) FROM pg_constraint "
+                "WHERE conrelid = 'space2stats'::regclass AND contype = 'p'"
+            )
+            assert cur.fetchone() == (int(hex_id_type == "int8"),)
+
+            cur.execute(
+                "SELECT count(*) FROM pg_class "
+                "WHERE relname LIKE 'rebuild\\_%' OR relname = 'space2stats_temp'"
+            )
+            assert cur.fetchone() == (0,)
+
+
+def test_rebuild_with_columns_keeps_table_definition(clean_database):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+    # As long as Postgres allows, and quoted
+    index_name = "Idx " + "x" * 59
+    definition_queries = {
+        "indexes": "SELECT pg_get_indexdef(indexrelid) "
+        "FROM pg_index WHERE indrelid = 'climate'::regclass ORDER BY 1",
+        "constraints": "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = 'climate'::regclass ORDER BY 1",
+        "columns": "SELECT column_name, column_default FROM information_schema.columns "
+        "WHERE table_name = 'climate' ORDER BY ordinal_position",
+        "privileges": "SELECT grantee, privilege_type FROM "
+        "information_schema.role_table_grants WHERE table_name = 'climate' "
+        "ORDER BY 1, 2",
+        "comment": "SELECT obj_description('climate'::regclass, 'pg_class')",
+    }
+
+    with psycopg.connect(connection_string) as conn:
+        conn.execute(
+            "CREATE TABLE climate (hex_id TEXT PRIMARY KEY, "
+            "spi FLOAT DEFAULT 0 CHECK (spi > -10), source TEXT)"
+        )
+        conn.execute(
+            f'CREATE INDEX "{index_name}" ON climate '
+            "(lower(source) text_pattern_ops, spi DESC NULLS LAST) "
+            "INCLUDE (hex_id) WHERE spi > 0"
+        )
+        conn.execute("COMMENT ON TABLE climate IS 'Climate indicators'")
+        conn.execute("GRANT SELECT ON climate TO PUBLIC")
+        conn.execute("INSERT INTO climate VALUES ('862a1070fffffff', 1, 'CRU')")
+        conn.execute("CREATE TABLE climate_temp (hex_id TEXT, spei FLOAT)")
+        conn.execute("INSERT INTO climate_temp VALUES ('862a1070fffffff', 0.5)")
+        before = {
+            key: conn.execute(query).fetchall()
+            for key, query in definition_queries.items()
+        }
+
+    main.rebuild_with_columns(
+        connection_string, "climate", "climate_temp", [("spei", "double precision")]
+    )
+
+    with psycopg.connect(connection_string) as conn:
+        after = {
+            key: conn.execute(query).fetchall()
+            for key, query in definition_queries.items()
+        }
+        assert conn.execute("SELECT * FROM climate").fetchall() == [
+            ("862a1070fffffff", 1, "CRU", 0.5)
+        ]
+
+    assert after["columns"] == before["columns"] + [("spei", None)]
+    assert {key: value for key, value in after.items() if key != "columns"} == {
+        key: value for key, value in before.items() if key != "columns"
+    }
+
+
+def test_rebuild_with_columns_refuses_dependent_views(clean_database):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    with psycopg.connect(connection_string) as conn:
+        conn.execute("CREATE TABLE climate (hex_id TEXT PRIMARY KEY, spi FLOAT)")
+        conn.execute("CREATE VIEW dry AS SELECT hex_id FROM climate WHERE spi < 0")
+        conn.execute("CREATE TABLE climate_temp (hex_id TEXT, spei FLOAT)")
+
+    with pytest.raises(ValueError, match="view dry depends on it"):
+        main.rebuild_with_columns(
+            connection_string, "climate", "climate_temp", [("spei", "float")]
+        )
+
+    # The view and the table were left alone
+    with psycopg.connect(connection_string) as conn:
+        assert conn.execute("SELECT * FROM dry").fetchall() == []
+
+
+def test_migrate_hex_id_to_int8(clean_database, tmpdir):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    load_parquet_to_db(parquet_file, connection_string, item_file)
+
+    migrate_hex_id_to_int8(connection_string, batch_size=1)
+
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT column_name, data_type, is_nullable "
+                "FROM information_schema.columns "
+                "WHERE table_name = 'space2stats' AND column_name LIKE 'hex_id%'"
+            )
+            assert cur.fetchall() == [("hex_id", "bigint", "NO")]
+
+            cur.execute(
+                "SELECT to_hex(hex_id), sum_pop_f_10_2020, sum_pop_m_10_2020 "
+                "FROM space2stats ORDER BY hex_id"
+            )
+            assert cur.fetchall() == [
+                ("862a1070fffffff", 100, 150),
+                ("862a10767ffffff", 200, 250),
+            ]
+
+            cur.execute(
+                "SELECT 1 FROM pg_index "
+                "WHERE indrelid = 'space2stats'::regclass AND indisprimary"
+            )
+            assert cur.fetchone() is not None
+
+    # Running the migration again is a no-op
+    migrate_hex_id_to_int8(connection_string)
+
+
+def test_migrate_hex_id_to_int8_not_unique(clean_database):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    with psycopg.connect(connection_string) as conn:
+        conn.execute("CREATE TABLE climate (hex_id TEXT, date DATE, spi FLOAT)")
+        conn.execute(
+            "INSERT INTO climate VALUES "
+            "('862a1070fffffff', '2020-01-01', 0.1), "
+            "('862a1070fffffff', '2020-02-01', 0.2)"
+        )
+
+    with pytest.raises(ValueError, match="not unique"):
+        migrate_hex_id_to_int8(connection_string, table_name="climate")
+
+    # Nothing was changed before the check failed
+    with psycopg.connect(connection_string) as conn:
+        cur = conn.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = 'climate' ORDER BY ordinal_position"
+        )
+        assert [row[0] for row in cur.fetchall()] == ["hex_id", "date", "spi"]
+
+
+def test_migrate_hex_id_to_int8_rerun_after_invalid_index(clean_database, tmpdir):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    parquet_file, item_file = write_population_files(
+        tmpdir, ["862a1070fffffff", "862a10767ffffff"]
+    )
+    load_parquet_to_db(parquet_file, connection_string, item_file)
+
+    # Leave behind what an interrupted run does: a backfilled column with an
+    # invalid unique index and the NOT NULL check
+    with psycopg.connect(connection_string, autocommit=True) as conn:
+        conn.execute("ALTER TABLE space2stats ADD COLUMN hex_id_int8 int8")
+        conn.execute("UPDATE space2stats SET hex_id_int8 = 1")
+        with pytest.raises(psycopg.errors.UniqueViolation):
+            conn.execute(
+                "CREATE UNIQUE INDEX CONCURRENTLY idx_space2stats_hex_id_int8 "
+                "ON space2stats (hex_id_int8)"
+            )
+        conn.execute(
+            "ALTER TABLE space2stats ADD CONSTRAINT space2stats_hex_id_int8_not_null "
+            "CHECK (hex_id_int8 IS NOT NULL) NOT VALID"
+        )
+
+    migrate_hex_id_to_int8(connection_string)
+
+    with psycopg.connect(connection_string) as conn:
+        cur = conn.execute("SELECT to_hex(hex_id) FROM space2stats ORDER BY hex_id")
+        assert cur.fetchall() == [("862a1070fffffff",), ("862a10767ffffff",)]
+        cur = conn.execute(
+            "SELECT indisvalid FROM pg_index "
+            "WHERE indrelid = 'space2stats'::regclass AND indisprimary"
+        )
+        assert cur.fetchone() == (True,)
+
+
+def test_migrate_hex_id_to_int8_rollups_and_admin(clean_database, tmpdir):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    hex_ids = ["862a1070fffffff", "862a10767ffffff"]
+    parquet_file, item_file = write_population_files(tmpdir, hex_ids)
+    load_parquet_to_db(parquet_file, connection_string, item_file)
+    build_rollup_tables(connection_string)
+
+    boundaries_file = tmpdir.join("boundaries.geojson")
+    cells = from_wkb(cells_to_wkb_polygons(cells_parse(pa.array(hex_ids))))
+    with open(boundaries_file, "w") as f:
+        json.dump(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": {"shapeID": "ADM-A"},
+                        "geometry": mapping(affinity.scale(cells[0], 0.5, 0.5)),
+                    }
+                ],
+            },
+            f,
+        )
+    load_admin_membership(connection_string, str(boundaries_file))
+
+    migrate_hex_id_to_int8(connection_string)
+
+    with psycopg.connect(connection_string) as conn:
+        rows = conn.execute("""
+            SELECT table_name, data_type FROM information_schema.columns
+            WHERE column_name = 'hex_id' ORDER BY table_name
+        """).fetchall()
+        assert rows == [
+            ("space2stats", "bigint"),
+            ("space2stats_admin", "bigint"),
+            ("space2stats_rollup_3", "bigint"),
+            ("space2stats_rollup_4", "bigint"),
+            ("space2stats_rollup_5", "bigint"),
+        ]
+
+        stats_table = StatsTable(conn, "space2stats", "climate")
+        assert stats_table.aggregate_by_admin(
+            ["ADM-A"], "centroid", ["sum_pop_f_10_2020"], "sum"
+        ) == {"ADM-A": {"sum_pop_f_10_2020": 100}}
+
+
+@pytest.mark.parametrize("hex_id_type", ["text", "int8"])
+def test_build_rollup_tables(clean_database, tmpdir, hex_id_type):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    # All the level 6 cells of a level 4 cell, and a cell elsewhere
+    parent = cells_parse(["842a107ffffffff"])
+    hex_ids = cells_to_string(change_resolution(parent, 6)).to_pylist()
+    hex_ids.append("867a74817ffffff")
+    population = list(range(len(hex_ids)))
+
+    parquet_file = tmpdir.join("local.parquet")
+    item_file = tmpdir.join("space2stats_population_2020.json")
+    pq.write_table(
+        pa.table({"hex_id": hex_ids, "sum_pop_2020": population}), parquet_file
+    )
+    with open(item_file, "w") as f:
+        json.dump(
+            {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": "space2stats_population_2020",
+                "properties": {
+                    "table:columns": [
+                        {"name": "hex_id", "type": "string"},
+                        {"name": "sum_pop_2020", "type": "int64"},
+                    ],
+                    "datetime": "2024-10-07T11:21:25.944150Z",
+                },
+                "geometry": None,
+                "bbox": [-180, -90, 180, 90],
+                "links": [],
+                "assets": {},
+            },
+            f,
+        )
+    load_parquet_to_db(
+        str(parquet_file), connection_string, str(item_file), hex_id_type=hex_id_type
+    )
+
+    build_rollup_tables(connection_string)
+    # Rebuilding replaces the existing rollups
+    build_rollup_tables(connection_string)
+
+    def parents(level):
+        cells = change_resolution(cells_parse(hex_ids), level)
+        return sorted(set(cells_to_string(cells).to_pylist()))
+
+    hex_id = "to_hex(hex_id)" if hex_id_type == "int8" else "hex_id"
+    with psycopg.connect(connection_string) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT {hex_id}, sum_pop_2020__sum, sum_pop_2020__min,
+                    sum_pop_2020__max, sum_pop_2020__count
+                FROM space2stats_rollup_4 ORDER BY 1
+            """)
+            assert cur.fetchall() == [
+                ("842a107ffffffff", sum(population[:-1]), 0, 48, 49),
+                (parents(4)[1], 49, 49, 49, 1),
+            ]
+
+            for level in (3, 5):
+                cur.execute(f"""
+                    SELECT {hex_id}, sum_pop_2020__sum, sum_pop_2020__count
+                    FROM space2stats_rollup_{level}
+                """)
+                rows = cur.fetchall()
+                assert sorted(row[0] for row in rows) == parents(level)
+                assert sum(row[1] for row in rows) == sum(population)
+                assert sum(row[2] for row in rows) == len(population)
+
+
+@pytest.mark.parametrize("plan_cache_mode", ["force_custom_plan", "force_generic_plan"])
+def test_load_parquet_to_db_ts_partitioned(clean_database, tmpdir, plan_cache_mode):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    hex_ids = ["8611822e7ffffff", "8611823e3ffffff"]
+    dates = [
+        f"{year}-{month:02d}-01" for year in (2022, 2023, 2024) for month in (1, 7)
+    ]
+    parquet_file = tmpdir.join("climate.parquet")
+    item_file = tmpdir.join("climate.json")
+    pq.write_table(
+        pa.table(
+            {
+                "hex_id": [h for h in hex_ids for _ in dates],
+                "date": dates * len(hex_ids),
+                "field1": [float(i) for i in range(len(hex_ids) * len(dates))],
+            }
+        ),
+        parquet_file,
+    )
+    with open(item_file, "w") as f:
+        json.dump(
+            {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": "climate",
+                "properties": {
+                    "table:columns": [
+                        {"name": "hex_id", "type": "string"},
+                        {"name": "date", "type": "string"},
+                        {"name": "field1", "type": "float64"},
+                    ],
+                    "datetime": "2024-10-07T11:21:25.944150Z",
+                },
+                "geometry": None,
+                "bbox": [-180, -90, 180, 90],
+                "links": [],
+                "assets": {},
+            },
+            f,
+        )
+
+    load_parquet_to_db_ts(
+        str(parquet_file), connection_string, str(item_file), "climate", chunksize=5
+    )
+
+    with psycopg.connect(connection_string) as conn:
+        partitions = conn.execute("""
+            SELECT inhrelid::regclass::text FROM pg_inherits
+            WHERE inhparent = 'climate'::regclass ORDER BY 1
+        """).fetchall()
+        assert [row[0] for row in partitions] == [
+            "climate_2022",
+            "climate_2023",
+            "climate_2024",
+            "climate_default",
+        ]
+        indexes = conn.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'climate' ORDER BY 1"
+        ).fetchall()
+        assert indexes == [("idx_climate_date",), ("idx_climate_hex_id_date",)]
+
+        stats_table = StatsTable(conn, "space2stats", "climate")
+        rows = stats_table.timeseries_data_by_hexids(
+            hex_ids, ["field1"], start_date="2024-01-01"
+        )
+        assert [(row["hex_id"], row["date"]) for row in rows] == [
+            (h, date) for h in hex_ids for date in dates[-2:]
+        ]
+
+        # The query of the API only scans the partitions of the requested years,
+        # pruned when planning or, for generic plans, when starting to execute
+        query, params = stats_table._timeseries_query(
+            hex_ids, ["field1"], "2024-01-01", None
+        )
+        conn.execute(f"SET plan_cache_mode = {plan_cache_mode}")
+        placeholders = iter(range(1, len(params) + 1))
+        conn.execute(
+            "PREPARE timeseries (text[], date) AS "
+            + re.sub("%s", lambda _: f"${next(placeholders)}", query.sql)
+        )
+        plan = "\n".join(
+            row[0]
+            for row in psycopg.ClientCursor(conn)
+            .execute("EXPLAIN EXECUTE timeseries (%s, %s)", params)
+            .fetchall()
+        )
+        if plan_cache_mode == "force_generic_plan":
+            assert "Subplans Removed: 2" in plan
+        assert "climate_2024" in plan
+        assert "climate_2022" not in plan
+        assert "climate_2023" not in plan
+
+
+@pytest.mark.parametrize("hex_id_type", ["text", "int8"])
+def test_load_admin_membership(clean_database, tmpdir, hex_id_type):
+    connection_string = f"postgresql://{clean_database.user}:{clean_database.password}@{clean_database.host}:{clean_database.port}/{clean_database.dbname}"
+
+    hex_ids = ["862a1070fffffff", "862a10767ffffff"]
+    parquet_file, item_file = write_population_files(tmpdir, hex_ids)
+    load_parquet_to_db(
+        parquet_file, connection_string, item_file, hex_id_type=hex_id_type
+    )
+
+    # A unit slightly larger than the first cell, and one in the middle of the second
+    cells = from_wkb(cells_to_wkb_polygons(cells_parse(pa.array(hex_ids))))
+    centroid = cells[1].centroid
+    boundaries_file = tmpdir.join("boundaries.geojson")
+    with open(boundaries_file, "w") as f:
+        json.dump(
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "properties": {"shapeID": "ADM-A"},
+                        "geometry": mapping(affinity.scale(cells[0], 1.05, 1.05)),
+                    },
+                    {
+                        "type": "Feature",
+                        "properties": {"shapeID": "ADM-B"},
+                        "geometry": mapping(
+                            box(
+                                centroid.x - 0.01,
+                                centroid.y - 0.01,
+                                centroid.x + 0.01,
+                                centroid.y + 0.01,
+                            )
+                        ),
+                    },
+                ],
+            },
+            f,
+        )
+
+    load_admin_membership(connection_string, str(boundaries_file))
+    # Loading a unit again replaces its cells
+    load_admin_membership(connection_string, str(boundaries_file))
+
+    hex_id = "to_hex(hex_id)" if hex_id_type == "int8" else "hex_id"
+    with psycopg.connect(connection_string) as conn:
+        rows = conn.execute(f"""
+            SELECT admin_id, {hex_id}, fraction, centroid FROM space2stats_admin
+            ORDER BY admin_id, fraction DESC
+        """).fetchall()
+
+        unit_a = [row for row in rows if row[0] == "ADM-A"]
+        assert unit_a[0][1:] == (hex_ids[0], 1.0, True)
+        # Its neighbours are only touched, on a sliver of their area
+        assert len(unit_a) == 7
+        assert all(0 < row[2] < 0.1 and not row[3] for row in unit_a[1:])
+
+        unit_b = [row for row in rows if row[0] == "ADM-B"]
+        assert len(unit_b) == 1
+        assert unit_b[0][1] == hex_ids[1]
+        assert 0 < unit_b[0][2] < 1 and unit_b[0][3]
+
+        stats_table = StatsTable(conn, "space2stats", "climate")
+        assert stats_table.aggregate_by_admin(
+            ["ADM-A", "ADM-B", "ADM-C"], "within", ["sum_pop_f_10_2020"], "sum"
+        ) == {"ADM-A": {"sum_pop_f_10_2020": 100}, "ADM-B": {}, "ADM-C": {}}
+        assert stats_table.summaries_by_admin(
+            ["ADM-B"], "centroid", ["sum_pop_f_10_2020"]
+        ) == {"ADM-B": [{"hex_id": hex_ids[1], "sum_pop_f_10_2020": 200}]}
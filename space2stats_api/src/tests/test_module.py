@@ -1,7 +1,18 @@
+import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import psycopg
+import pyarrow as pa
 import pytest
 from geojson_pydantic import Feature
-from h3ronpy import cells_parse
+from h3ronpy import cells_parse, cells_to_string, change_resolution
+from h3ronpy.vector import cells_to_wkb_polygons
+from shapely import affinity, area, box, from_wkb, intersection
+from shapely.geometry import MultiPolygon, mapping
 from space2stats.lib import Settings, StatsTable
+from space2stats_ingest.main import build_rollup_tables
 
 
 def test_stats_table(mock_env):
@@ -190,3 +201,681 @@ def test_get_summaries_ordering(mock_env, database):
         assert (
             returned_h3_ids_str == input_h3_ids_str
         ), f"Mismatch in order: input={input_h3_ids_str}, returned={returned_h3_ids_str}"
+
+
+def test_summaries_batches_stream_in_order(mock_env, database):
+    """Test that streamed batches hold the same rows as the buffered table."""
+    hex_ids = ["862a1070fffffff", "867a74817ffffff", "862a10767ffffff"]
+
+    with StatsTable.connect() as stats_table:
+        expected = stats_table.summaries_by_hexids_arrow(
+            hex_ids, ["sum_pop_2020"], geometry="point"
+        )
+        batches = list(
+            stats_table.summaries_by_hexids_batches(
+                hex_ids, ["sum_pop_2020"], geometry="point", batch_size=2
+            )
+        )
+        # The server-side cursor is closed once the batches are exhausted
+        cursors = stats_table.conn.execute("SELECT count(*) FROM pg_cursors")
+        assert cursors.fetchone()[0] == 0
+
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert pa.Table.from_batches(batches).equals(expected)
+
+
+def test_fields_are_cached(mock_env, database):
+    """Test that table columns are served from the cache until refreshed."""
+    with StatsTable.connect() as stats_table:
+        assert stats_table.fields() == ["sum_pop_2020", "sum_pop_f_10_2020"]
+
+        stats_table.conn.execute("ALTER TABLE space2stats ADD COLUMN new_field INT")
+        stats_table.conn.commit()
+
+        assert "new_field" not in stats_table.fields()
+        with pytest.raises(ValueError, match="new_field"):
+            stats_table._validate_fields(["new_field"])
+
+        stats_table.refresh_fields()
+
+        assert "new_field" in stats_table.fields()
+        stats_table._validate_fields(["sum_pop_2020", "new_field"])
+
+
+def test_fields_cache_ttl(mock_env, database):
+    """Test that a zero TTL always reads the columns from the database."""
+    with StatsTable.connect(FIELDS_CACHE_TTL=0) as stats_table:
+        assert "new_field" not in stats_table.fields()
+
+        stats_table.conn.execute("ALTER TABLE space2stats ADD COLUMN new_field INT")
+        stats_table.conn.commit()
+
+        assert "new_field" in stats_table.fields()
+
+
+@pytest.mark.parametrize("aggregation_type", ["sum", "avg", "count", "max", "min"])
+def test_aggregate_copied_ids_matches_array(
+    mock_env, database, aoi_example, aggregation_type
+):
+    """Test that streaming ids through COPY gives the same result as ANY(array)."""
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+    with StatsTable.connect() as stats_table:
+        stats_table.copy_ids_threshold = None
+        expected = stats_table.aggregate(
+            aoi=aoi_example,
+            spatial_join_method="touches",
+            fields=fields,
+            aggregation_type=aggregation_type,
+        )
+
+        stats_table.copy_ids_threshold = 0
+        result = stats_table.aggregate(
+            aoi=aoi_example,
+            spatial_join_method="touches",
+            fields=fields,
+            aggregation_type=aggregation_type,
+        )
+
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "aggregation_type",
+    ["sum", "avg", "count", "max", "min", ["sum", "avg", "count", "max", "min"]],
+)
+def test_aggregate_with_rollups_matches_cells(
+    mock_env, database, mocker, aggregation_type
+):
+    """Test that reading whole parents from the rollups gives the cell aggregate."""
+    # Populate every level 6 cell of a few level 4 cells, with some NULLs
+    parents = cells_parse(["842a107ffffffff", "842a105ffffffff"])
+    cells = cells_to_string(change_resolution(parents, 6)).to_pylist()
+    with StatsTable.connect() as stats_table:
+        with stats_table.conn.cursor() as cur:
+            cur.execute("DELETE FROM space2stats")
+            cur.executemany(
+                "INSERT INTO space2stats VALUES (%s, %s, %s)",
+                [(h, i, None if i % 5 else i * 2) for i, h in enumerate(sorted(cells))],
+            )
+        stats_table.conn.commit()
+
+    connection_string = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    build_rollup_tables(connection_string)
+
+    # An AOI covering the first parent and part of the second
+    boundary = from_wkb(cells_to_wkb_polygons(parents)[0].as_py())
+    aoi = Feature(
+        type="Feature",
+        geometry=mapping(boundary.buffer(0.05)),
+        properties={},
+    )
+
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+    with StatsTable.connect() as stats_table:
+        stats_table.use_rollups = False
+        expected = stats_table.aggregate(aoi, "touches", fields, aggregation_type)
+
+        stats_table.use_rollups = True
+        spy = mocker.spy(stats_table, "_aggregate_with_rollups")
+        result = stats_table.aggregate(aoi, "touches", fields, aggregation_type)
+
+    assert spy.spy_return is not None
+    assert result == pytest.approx(expected)
+
+
+def test_aggregate_skips_rollups_of_other_hex_id_type(mock_env, database, mocker):
+    """Test that rollups not yet rebuilt after a hex_id migration are not read."""
+    parents = cells_parse(["842a107ffffffff"])
+    cells = cells_to_string(change_resolution(parents, 6)).to_pylist()
+    with StatsTable.connect() as stats_table:
+        with stats_table.conn.cursor() as cur:
+            cur.execute("DELETE FROM space2stats")
+            cur.executemany(
+                "INSERT INTO space2stats VALUES (%s, %s, %s)",
+                [(h, i, i) for i, h in enumerate(cells)],
+            )
+        stats_table.conn.commit()
+
+    connection_string = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    build_rollup_tables(connection_string)
+    with psycopg.connect(connection_string) as conn:
+        conn.execute("""
+            ALTER TABLE space2stats ALTER COLUMN hex_id TYPE int8
+            USING ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8
+        """)
+
+    boundary = from_wkb(cells_to_wkb_polygons(parents)[0].as_py())
+    aoi = Feature(
+        type="Feature", geometry=mapping(boundary.buffer(0.05)), properties={}
+    )
+    with StatsTable.connect() as stats_table:
+        spy = mocker.spy(stats_table, "_aggregate_with_rollups")
+        result = stats_table.aggregate(aoi, "touches", ["sum_pop_2020"], "sum")
+
+    assert spy.spy_return is None
+    assert result == {"sum_pop_2020": sum(range(len(cells)))}
+
+
+@pytest.mark.parametrize("copy_ids_threshold", [None, 0])
+def test_aggregate_multiple_types(mock_env, database, aoi_example, copy_ids_threshold):
+    """Test that a list of aggregation types gives the result of each type alone."""
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+    types = [
+        "sum",
+        "avg",
+        "count",
+        "max",
+        "min",
+        "stddev",
+        "p50",
+        "p90",
+        "weighted_avg",
+    ]
+    with StatsTable.connect(COPY_IDS_THRESHOLD=copy_ids_threshold) as stats_table:
+        summaries = stats_table.summaries(aoi_example, "touches", fields)
+        result = stats_table.aggregate(
+            aoi_example, "touches", fields, types, weight_field="sum_pop_2020"
+        )
+        expected = {
+            t: stats_table.aggregate(aoi_example, "touches", fields, t)
+            for t in types[:5]
+        }
+
+    assert list(result) == [f"{f}_{t}" for f in fields for t in types]
+    for t, aggregate in expected.items():
+        for field in fields:
+            assert result[f"{field}_{t}"] == aggregate[field]
+
+    pop = np.array([s["sum_pop_2020"] for s in summaries], dtype=float)
+    pop_f = np.array([s["sum_pop_f_10_2020"] for s in summaries], dtype=float)
+    assert result["sum_pop_f_10_2020_stddev"] == pytest.approx(np.std(pop_f, ddof=1))
+    assert result["sum_pop_f_10_2020_p50"] == pytest.approx(np.median(pop_f))
+    assert result["sum_pop_f_10_2020_p90"] == pytest.approx(np.percentile(pop_f, 90))
+    assert result["sum_pop_f_10_2020_weighted_avg"] == pytest.approx(
+        np.average(pop_f, weights=pop)
+    )
+
+
+@pytest.mark.parametrize(
+    "aggregation_type,weight_field,error",
+    [
+        ("median", None, "Invalid aggregation types: ['median']"),
+        (["sum", "p101"], None, "Invalid aggregation types: ['p101']"),
+        (["sum", "sum"], None, "Duplicate aggregation types"),
+        ([], None, "aggregation_type cannot be empty"),
+        ("weighted_avg", None, "weighted_avg requires a weight_field"),
+        ("weighted_avg", "a_non_existent_field", "Invalid fields"),
+    ],
+)
+def test_aggregate_invalid_types(
+    mock_env, database, aoi_example, aggregation_type, weight_field, error
+):
+    with StatsTable.connect() as stats_table:
+        with pytest.raises(ValueError, match=re.escape(error)):
+            stats_table.aggregate(
+                aoi_example,
+                "touches",
+                ["sum_pop_2020"],
+                aggregation_type,
+                weight_field=weight_field,
+            )
+
+
+def test_aggregate_by_hexids_copied_ids_deduplicates(mock_env, database):
+    """Test that repeated hex ids are only counted once when streamed through COPY."""
+    with StatsTable.connect(COPY_IDS_THRESHOLD=0) as stats_table:
+        result = stats_table.aggregate_by_hexids(
+            hex_ids=["862a1070fffffff", "862a1070fffffff", "862a10767ffffff"],
+            fields=["sum_pop_2020"],
+            aggregation_type="sum",
+        )
+
+    assert result == {"sum_pop_2020": 250}
+
+
+def test_shared_polyfill_executor_outlives_table(mock_env, database):
+    """Test that closing a table leaves an executor it was given running."""
+    settings = Settings()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with StatsTable(
+            conn=psycopg.connect(settings.DB_CONNECTION_STRING),
+            table_name=settings.PGTABLENAME,
+            timeseries_table_name=settings.TIMESERIES_TABLE_NAME,
+            polyfill_executor=executor,
+        ) as stats_table:
+            stats_table.fields()
+
+        assert executor.submit(sum, [1, 2]).result() == 3
+
+
+@pytest.mark.parametrize(
+    "hex_ids,geometry",
+    [(["8611823e3ffffff", "8611822e7ffffff"], None), (["8611822e7ffffff"], "polygon")],
+)
+def test_timeseries_layouts(mock_env, setup_timeseries_data, hex_ids, geometry):
+    """Test that both layouts hold the same rows and geometries."""
+    with StatsTable.connect() as stats_table:
+        rows = stats_table.timeseries_data_by_hexids(
+            hex_ids, ["field1"], end_date="2023-01-02", geometry=geometry
+        )
+        cells = stats_table.timeseries_data_by_hexids(
+            hex_ids,
+            ["field1"],
+            end_date="2023-01-02",
+            geometry=geometry,
+            layout="cells",
+        )
+
+    assert len(rows) == 2 * len(hex_ids)
+    assert len(cells) == len(hex_ids)
+    assert rows == [
+        {
+            "hex_id": cell["hex_id"],
+            **row,
+            **{k: cell[k] for k in cell if k == "geometry"},
+        }
+        for cell in cells
+        for row in cell["timeseries"]
+    ]
+
+
+@pytest.mark.parametrize("geometry", [None, "point"])
+def test_timeseries_array_layouts(mock_env, setup_timeseries_data, geometry):
+    """Test that the layouts aggregated in the database hold the long rows."""
+    hex_ids = (
+        ["8611822e7ffffff"] if geometry else ["8611823e3ffffff", "8611822e7ffffff"]
+    )
+    fields = ["field1", "field2"]
+    with StatsTable.connect() as stats_table:
+        rows = stats_table.timeseries_data_by_hexids(
+            hex_ids, fields, start_date="2023-01-02", geometry=geometry
+        )
+        arrays = stats_table.timeseries_data_by_hexids(
+            hex_ids, fields, start_date="2023-01-02", geometry=geometry, layout="array"
+        )
+        wide = stats_table.timeseries_data_by_hexids(
+            hex_ids, fields, start_date="2023-01-02", geometry=geometry, layout="wide"
+        )
+
+    assert len(arrays) == len(wide) == len(hex_ids)
+    exploded = [
+        {
+            "hex_id": cell["hex_id"],
+            "date": date,
+            **{field: cell[field][i] for field in fields},
+            **({"geometry": cell["geometry"]} if geometry else {}),
+        }
+        for cell in arrays
+        for i, date in enumerate(cell["date"])
+    ]
+    assert exploded == rows
+    for cell, wide_cell in zip(arrays, wide):
+        assert wide_cell.get("geometry") == cell.get("geometry")
+        for field in fields:
+            for date, value in zip(cell["date"], cell[field]):
+                assert wide_cell[f"{field}_{date}"] == value
+
+
+@pytest.fixture
+def setup_resampling_data(setup_timeseries_data):
+    """Add dates of other months and years to the timeseries test data."""
+    database = setup_timeseries_data
+    db_url = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    with psycopg.connect(db_url) as conn:
+        conn.execute(
+            """
+            INSERT INTO climate (hex_id, date, field1, field2)
+            VALUES
+                ('8611822e7ffffff', '2023-03-15', 30, 40),
+                ('8611822e7ffffff', '2024-01-10', 40, 50);
+            """
+        )
+    return database
+
+
+def test_timeseries_temporal_resolution(mock_env, setup_resampling_data):
+    """Test that the dates of each cell are grouped by period in the database."""
+    hex_id = "8611822e7ffffff"
+    with StatsTable.connect() as stats_table:
+
+        def resample(temporal_resolution, aggregation_type="avg", **kwargs):
+            return stats_table.timeseries_data_by_hexids(
+                [hex_id],
+                ["field1"],
+                temporal_resolution=temporal_resolution,
+                aggregation_type=aggregation_type,
+                **kwargs,
+            )
+
+        assert resample("month") == [
+            {"hex_id": hex_id, "date": "2023-01-01", "field1": 15},
+            {"hex_id": hex_id, "date": "2023-03-01", "field1": 30},
+            {"hex_id": hex_id, "date": "2024-01-01", "field1": 40},
+        ]
+        assert resample("quarter", end_date="2023-12-31") == [
+            {"hex_id": hex_id, "date": "2023-01-01", "field1": 18.75},
+        ]
+        assert resample("year", ["min", "max"]) == [
+            {
+                "hex_id": hex_id,
+                "date": "2023-01-01",
+                "field1_min": 10,
+                "field1_max": 30,
+            },
+            {
+                "hex_id": hex_id,
+                "date": "2024-01-01",
+                "field1_min": 40,
+                "field1_max": 40,
+            },
+        ]
+        assert resample("climatology") == [
+            {"hex_id": hex_id, "month": 1, "field1": 21.25},
+            {"hex_id": hex_id, "month": 3, "field1": 30},
+        ]
+        assert resample("year", layout="array") == [
+            {
+                "hex_id": hex_id,
+                "date": ["2023-01-01", "2024-01-01"],
+                "field1": [18.75, 40],
+            }
+        ]
+        assert resample("climatology", "sum", layout="wide") == [
+            {"hex_id": hex_id, "field1_1": 85, "field1_3": 30}
+        ]
+        assert resample("year", layout="cells", geometry="point") == [
+            {
+                "hex_id": hex_id,
+                "geometry": resample(None, geometry="point")[0]["geometry"],
+                "timeseries": [
+                    {"date": "2023-01-01", "field1": 18.75},
+                    {"date": "2024-01-01", "field1": 40},
+                ],
+            }
+        ]
+
+        table = stats_table.timeseries_data_by_hexids_arrow(
+            [hex_id], ["field1"], temporal_resolution="year"
+        )
+        assert table.column_names == ["hex_id", "date", "field1"]
+        assert table["date"].type == pa.date32()
+
+        with pytest.raises(ValueError, match="weighted_avg"):
+            resample("year", "weighted_avg")
+        with pytest.raises(ValueError, match="temporal_resolution"):
+            resample("week")
+
+
+@pytest.mark.parametrize("batches", [False, True])
+def test_timeseries_spatial_aggregate(mock_env, setup_resampling_data, batches):
+    """Test that the cells are reduced together into one row per period."""
+    hex_ids = ["8611822e7ffffff", "8611823e3ffffff"]
+    with StatsTable.connect() as stats_table:
+        by_date = stats_table.timeseries_data_by_hexids(
+            hex_ids,
+            ["field1"],
+            end_date="2023-01-31",
+            aggregation_type="sum",
+            spatial_aggregate=True,
+        )
+        assert by_date == [
+            {"date": "2023-01-01", "field1": 15},
+            {"date": "2023-01-02", "field1": 25},
+            {"date": "2023-01-03", "field1": 35},
+        ]
+
+        kwargs = dict(temporal_resolution="year", spatial_aggregate=True)
+        if batches:
+            table = pa.Table.from_batches(
+                stats_table.timeseries_data_by_hexids_batches(
+                    hex_ids, ["field1", "field2"], **kwargs
+                )
+            )
+        else:
+            table = stats_table.timeseries_data_by_hexids_arrow(
+                hex_ids, ["field1", "field2"], **kwargs
+            )
+        assert table.to_pylist() == [
+            {"date": datetime.date(2023, 1, 1), "field1": 15, "field2": 25},
+            {"date": datetime.date(2024, 1, 1), "field1": 40, "field2": 50},
+        ]
+
+        for invalid in [dict(geometry="polygon"), dict(layout="cells")]:
+            with pytest.raises(ValueError, match="spatial_aggregate"):
+                stats_table.timeseries_data_by_hexids(
+                    hex_ids, ["field1"], spatial_aggregate=True, **invalid
+                )
+
+
+@pytest.fixture
+def fractional_aoi():
+    """An AOI over a part of 862a1070fffffff and all of 867a74817ffffff.
+
+    Returns the AOI and the fraction of the area inside it of 862a1070fffffff
+    and of 867a74807ffffff, a neighbour of the second cell.
+    """
+    hex_ids = ["862a1070fffffff", "867a74817ffffff", "867a74807ffffff"]
+    cells = from_wkb(cells_to_wkb_polygons(cells_parse(pa.array(hex_ids))))
+    centroid = cells[0].centroid
+    part = box(
+        centroid.x - 0.02, centroid.y - 0.02, centroid.x + 0.02, centroid.y + 0.02
+    )
+    whole = affinity.scale(cells[1], 1.01, 1.01)
+    aoi = Feature(
+        type="Feature",
+        geometry=mapping(MultiPolygon([part, whole])),
+        properties={},
+    )
+    fractions = (
+        area(intersection(part, cells[0])) / area(cells[0]),
+        area(intersection(whole, cells[2])) / area(cells[2]),
+    )
+    return aoi, fractions
+
+
+def test_aggregate_fractional(mock_env, database, fractional_aoi):
+    """Test that the fractional join weights the cells by their area in the AOI."""
+    aoi, (partial, sliver) = fractional_aoi
+    fields = ["sum_pop_2020"]
+    aggregations = ["sum", "avg", "count", "max", "min", "weighted_avg"]
+
+    # sum_pop_2020 and sum_pop_f_10_2020 of the cells, with their weights
+    cells = [(100, 200, partial), (125, 225, 1), (125, 225, sliver)]
+    total = sum(value * w for value, _, w in cells)
+    count = sum(w for _, _, w in cells)
+    expected = {
+        "sum_pop_2020_sum": total,
+        "sum_pop_2020_avg": total / count,
+        "sum_pop_2020_count": count,
+        "sum_pop_2020_max": 125,
+        "sum_pop_2020_min": 100,
+        "sum_pop_2020_weighted_avg": sum(v * p * w for v, p, w in cells)
+        / sum(p * w for _, p, w in cells),
+    }
+
+    with StatsTable.connect() as stats_table:
+        result = stats_table.aggregate(
+            aoi, "fractional", fields, aggregations, "sum_pop_f_10_2020"
+        )
+        assert result == pytest.approx(expected)
+        assert 0 < sliver < 0.01 < partial < 1
+        # Touching cells are otherwise counted whole
+        assert stats_table.aggregate(aoi, "touches", fields, "sum") == {
+            "sum_pop_2020": 350
+        }
+
+        batch = stats_table.aggregate_batch(
+            [aoi, aoi.model_copy(update={"id": "a"})], "fractional", fields, "sum"
+        )
+        assert batch == {
+            "0": {"sum_pop_2020": pytest.approx(total)},
+            "a": {"sum_pop_2020": pytest.approx(total)},
+        }
+
+        with pytest.raises(ValueError, match="not supported by the fractional"):
+            stats_table.aggregate(aoi, "fractional", fields, ["sum", "p90"])
+
+
+def test_aggregate_by_admin_fractional(mock_env, setup_admin_data):
+    """Test that the fractional join of admin units reads the stored fractions."""
+    with StatsTable.connect() as stats_table:
+        assert stats_table.aggregate_by_admin(
+            ["ADM-1", "ADM-2"], "fractional", ["sum_pop_2020"], ["sum", "count"]
+        ) == {
+            "ADM-1": {
+                "sum_pop_2020_sum": pytest.approx(100 + 0.4 * 150),
+                "sum_pop_2020_count": pytest.approx(1.4),
+            },
+            "ADM-2": {
+                "sum_pop_2020_sum": pytest.approx(0.6 * 125 + 125),
+                "sum_pop_2020_count": pytest.approx(1.6),
+            },
+        }
+
+
+def test_prepared_statements(mock_env, database, aoi_example):
+    """Test that repeated queries reuse a statement prepared on the connection."""
+    fields = ["sum_pop_2020"]
+    with StatsTable.connect(USE_ROLLUPS=False) as stats_table:
+        for _ in range(3):
+            summaries = stats_table.summaries(aoi_example, "touches", fields)
+            aggregate = stats_table.aggregate(aoi_example, "touches", fields, "sum")
+
+        assert stats_table.prepared_statements() == {
+            ("summaries", "space2stats", ("sum_pop_2020",), None, (False,)): 2,
+            ("aggregate", "space2stats", ("sum_pop_2020",), "sum", (False, None)): 2,
+        }
+        prepared = stats_table.conn.execute(
+            "SELECT count(*) FROM pg_prepared_statements"
+        ).fetchone()
+        assert prepared == (2,)
+
+    with StatsTable.connect(USE_ROLLUPS=False, PREPARE_STATEMENTS=False) as stats_table:
+        assert stats_table.summaries(aoi_example, "touches", fields) == summaries
+        assert stats_table.aggregate(aoi_example, "touches", fields, "sum") == aggregate
+        assert stats_table.prepared_statements() == {}
+
+
+@pytest.mark.parametrize(
+    "start_date,end_date", [(None, None), ("2023-01-02", None), (None, "2023-01-02")]
+)
+def test_prepared_statements_timeseries_dates(
+    mock_env, setup_timeseries_data, start_date, end_date
+):
+    """Test that date filters are part of the prepared timeseries statement."""
+    hex_ids = ["8611822e7ffffff", "8611823e3ffffff"]
+    with StatsTable.connect() as stats_table:
+        expected = stats_table.timeseries_data_by_hexids(
+            hex_ids, ["field1"], start_date, end_date
+        )
+        for dates in [(None, None), ("2023-01-02", None), (None, "2023-01-02")]:
+            stats_table.timeseries_data_by_hexids(hex_ids, ["field1"], *dates)
+
+        assert (
+            stats_table.timeseries_data_by_hexids(
+                hex_ids, ["field1"], start_date, end_date
+            )
+            == expected
+        )
+        assert sorted(stats_table.prepared_statements().values()) == [0, 0, 2]
+
+
+def test_int8_hex_id_storage(mock_env, database, aoi_example):
+    """Test that a table storing hex_id as int8 gives the same results as text."""
+    hex_ids = ["862a1070fffffff", "867a74817ffffff", "862a10767ffffff"]
+    fields = ["sum_pop_2020", "sum_pop_f_10_2020"]
+
+    with StatsTable.connect() as stats_table:
+        expected_summaries = stats_table.summaries_by_hexids(hex_ids, fields)
+        expected_aggregate = stats_table.aggregate(
+            aoi=aoi_example,
+            spatial_join_method="touches",
+            fields=fields,
+            aggregation_type="sum",
+        )
+
+        stats_table.conn.execute(
+            """
+            ALTER TABLE space2stats ALTER COLUMN hex_id TYPE int8
+            USING ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8
+            """
+        )
+        stats_table.conn.commit()
+        stats_table.refresh_fields()
+
+        assert stats_table.summaries_by_hexids(hex_ids, fields) == expected_summaries
+        for copy_ids_threshold in [None, 0]:
+            stats_table.copy_ids_threshold = copy_ids_threshold
+            result = stats_table.aggregate(
+                aoi=aoi_example,
+                spatial_join_method="touches",
+                fields=fields,
+                aggregation_type="sum",
+            )
+            assert result == expected_aggregate
+
+
+def test_int8_hex_id_storage_admin(mock_env, setup_admin_data):
+    """Test that admin queries need hex_id stored with the type of the stats table."""
+    args = (["ADM-1", "ADM-2"], "within", ["sum_pop_2020"])
+
+    with StatsTable.connect() as stats_table:
+        expected = stats_table.summaries_by_admin(*args)
+
+        stats_table.conn.execute(
+            """
+            ALTER TABLE space2stats ALTER COLUMN hex_id TYPE int8
+            USING ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8
+            """
+        )
+        stats_table.conn.commit()
+        stats_table.refresh_fields()
+
+        with pytest.raises(ValueError, match="should be rebuilt"):
+            stats_table.summaries_by_admin(*args)
+
+        stats_table.conn.execute(
+            """
+            ALTER TABLE space2stats_admin ALTER COLUMN hex_id TYPE int8
+            USING ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8
+            """
+        )
+        stats_table.conn.commit()
+        stats_table.refresh_fields()
+
+        assert stats_table.summaries_by_admin(*args) == expected
+        assert stats_table.aggregate_by_admin(*args, "sum") == {
+            "ADM-1": {"sum_pop_2020": 100},
+            "ADM-2": {"sum_pop_2020": 125},
+        }
+        with pytest.raises(ValueError, match="Invalid spatial join method"):
+            stats_table.aggregate_by_admin(["ADM-1"], "bbox", ["sum_pop_2020"], "sum")
+
+
+def test_int8_hex_id_storage_timeseries(mock_env, setup_timeseries_data):
+    """Test that timeseries queries bind int8 ids when hex_id is stored as int8."""
+    hex_ids = ["8611822e7ffffff", "8611823e3ffffff"]
+
+    resampled = dict(temporal_resolution="month", layout="array")
+    with StatsTable.connect() as stats_table:
+        expected = stats_table.timeseries_data_by_hexids(hex_ids, ["field1"])
+        expected_resampled = stats_table.timeseries_data_by_hexids(
+            hex_ids, ["field1"], **resampled
+        )
+
+        stats_table.conn.execute(
+            """
+            ALTER TABLE climate ALTER COLUMN hex_id TYPE int8
+            USING ('x' || lpad(hex_id, 16, '0'))::bit(64)::int8
+            """
+        )
+        stats_table.conn.commit()
+        stats_table.refresh_fields()
+
+        assert stats_table.timeseries_data_by_hexids(hex_ids, ["field1"]) == expected
+        assert len(expected) == 6
+        assert (
+            stats_table.timeseries_data_by_hexids(hex_ids, ["field1"], **resampled)
+            == expected_resampled
+        )
+        assert len(expected_resampled) == 2
@@ -1,6 +1,6 @@
 """Space2Stats-Client - A World Bank Python client for accessing spatial statistics."""
 
-from .client import Space2StatsClient
+from .client import Space2StatsClient, timeseries_frame
 
 __version__ = "1.4.1"
 __license__ = "World Bank Master Community License Agreement"
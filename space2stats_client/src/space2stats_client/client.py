@@ -2,14 +2,29 @@
 
 import inspect
 import json
+import re
 import urllib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import geopandas as gpd
 import pandas as pd
 import requests
 from pystac import Catalog
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .utils import download_esri_boundaries
 
@@ -17,6 +32,84 @@ _DDH_CONFIG_PATH = Path(__file__).parent / "ddh_datasets.json"
 with open(_DDH_CONFIG_PATH, encoding="utf-8") as _f:
     _DDH_CONFIG = json.load(_f)
 
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Responses worth retrying: throttling and API Gateway/Lambda overload
+RETRY_STATUS_CODES = (429, 503)
+
+# Aggregation types of the API, besides percentiles written as "p90"
+AGGREGATION_TYPES = ("sum", "avg", "count", "max", "min", "stddev", "weighted_avg")
+_PERCENTILE_PATTERN = re.compile(r"^p(100|\d{1,2}(\.\d+)?)$")
+
+
+def _aggregation_payload(
+    aggregation_type: Union[str, List[str]], weight_field: Optional[str]
+) -> Dict:
+    """Validate the aggregation types and build their part of a request payload."""
+    aggregations = (
+        [aggregation_type] if isinstance(aggregation_type, str) else aggregation_type
+    )
+    if not aggregations or not all(
+        a in AGGREGATION_TYPES or _PERCENTILE_PATTERN.match(a) for a in aggregations
+    ):
+        raise ValueError(
+            "Input should be 'sum', 'avg', 'count', 'max', 'min', 'stddev', "
+            "'weighted_avg' or a percentile such as 'p90', or a list of them"
+        )
+    if "weighted_avg" in aggregations and weight_field is None:
+        raise ValueError("weighted_avg requires a weight_field")
+
+    payload = {"aggregation_type": aggregation_type}
+    if weight_field is not None:
+        payload["weight_field"] = weight_field
+    return payload
+
+
+def timeseries_frame(
+    records: List[Dict], layout: Literal["long", "wide", "array"] = "long"
+) -> pd.DataFrame:
+    """Build a DataFrame from the JSON records of a timeseries response.
+
+    Parameters
+    ----------
+    records : List[Dict]
+        Records returned by the timeseries endpoints in ``layout``
+    layout : ["long", "wide", "array"]
+        Layout the records were requested in:
+            - "long": one row per hex ID and date
+            - "wide": one row per hex ID and a "{field}_{date}" column per field and date
+            - "array": one record per hex ID with lists of dates and values, which
+              are expanded into the same rows as "long"
+
+    Returns
+    -------
+    DataFrame
+        One row per hex ID and date, or per hex ID with the "wide" layout
+    """
+    df = pd.DataFrame(records)
+    if layout != "array" or df.empty:
+        return df
+
+    # Every list of a record holds one value per date
+    lists = [col for col in df.columns if col not in ("hex_id", "geometry")]
+    df = df.explode(lists, ignore_index=True)
+    for col in lists:
+        if col != "date":
+            df[col] = pd.to_numeric(df[col])
+    return df[["hex_id", *lists, *(["geometry"] if "geometry" in df else [])]]
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only required for Arrow responses."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "response_format='arrow' requires pyarrow. "
+            "Install with: pip install space2stats-client[arrow]"
+        ) from e
+    return pyarrow
+
 
 class Space2StatsClient:
     """Client for interacting with the Space2Stats API.
@@ -27,7 +120,13 @@ class Space2StatsClient:
     """
 
     def __init__(
-        self, base_url: str = "https://space2stats.ds.io", verify_ssl: bool = True
+        self,
+        base_url: str = "https://space2stats.ds.io",
+        verify_ssl: bool = True,
+        response_format: Literal["json", "arrow"] = "json",
+        max_concurrency: int = 1,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
     ):
         """Initialize the Space2Stats client.
 
@@ -37,14 +136,42 @@ class Space2StatsClient:
             Base URL for the Space2Stats API
         verify_ssl : bool
             Whether to verify SSL certificates in requests (default: True)
+        response_format : ["json", "arrow"]
+            Format requested for the summary and timeseries endpoints (default: "json")
+                - "json": Rows are returned as JSON records
+                - "arrow": Rows are returned as an Arrow IPC stream and decoded into
+                  Arrow-backed DataFrame columns without copying. Geometries are
+                  returned as WKB. Requires pyarrow.
+        max_concurrency : int
+            Maximum number of requests sent at the same time by the methods
+            querying many boundaries (default: 1, one request at a time)
+        max_retries : int
+            Number of times a request is retried after a 429 or 503 response
+            (default: 3)
+        backoff_factor : float
+            Base delay in seconds of the exponential backoff between retries,
+            unless the response has a Retry-After header (default: 0.5)
         """
         if not isinstance(verify_ssl, bool):
             raise TypeError("verify_ssl must be a boolean value (True or False)")
+        if response_format not in ["json", "arrow"]:
+            raise ValueError("response_format should be 'json' or 'arrow'")
+        if response_format == "arrow":
+            _import_pyarrow()
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError("max_concurrency should be a positive integer")
 
         self.base_url = base_url
         self.verify_ssl = verify_ssl
+        self.response_format = response_format
+        self.max_concurrency = max_concurrency
+        self.session = self._create_session(
+            max_concurrency, max_retries, backoff_factor
+        )
         self.summary_endpoint = f"{base_url}/summary"
+        self.summary_batch_endpoint = f"{base_url}/summary/batch"
         self.aggregation_endpoint = f"{base_url}/aggregate"
+        self.aggregation_batch_endpoint = f"{base_url}/aggregate/batch"
         self.fields_endpoint = f"{base_url}/fields"
         self.timeseries_endpoint = f"{base_url}/timeseries"
         self.timeseries_by_hexids_endpoint = f"{base_url}/timeseries_by_hexids"
@@ -53,6 +180,183 @@ class Space2StatsClient:
             "https://raw.githubusercontent.com/worldbank/DECAT_Space2Stats/refs/heads/main/space2stats_api/src/space2stats_ingest/METADATA/stac/catalog.json"
         )
 
+    @staticmethod
+    def _create_session(
+        max_concurrency: int, max_retries: int, backoff_factor: float
+    ) -> requests.Session:
+        """HTTP session keeping connections alive and retrying throttled requests."""
+        retry = Retry(
+            total=max_retries,
+            status_forcelist=RETRY_STATUS_CODES,
+            # The API only reads data, so its POST requests are safe to retry
+            allowed_methods=None,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_maxsize=max(max_concurrency, 10),
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _map(self, func: Callable, items: Iterable) -> Iterator:
+        """Apply ``func`` to each item, up to ``max_concurrency`` at a time.
+
+        Results are yielded in the order of ``items``.
+        """
+        if self.max_concurrency == 1:
+            yield from map(func, items)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            yield from executor.map(func, items)
+
+    def _table_headers(self) -> Optional[Dict[str, str]]:
+        """Request headers for the endpoints returning one row per H3 cell."""
+        if self.response_format == "arrow":
+            return {"Accept": ARROW_STREAM_MEDIA_TYPE}
+        return None
+
+    def _read_table(self, response: requests.Response) -> pd.DataFrame:
+        """Decode a summary or timeseries response into a DataFrame."""
+        if self.response_format == "arrow":
+            pa = _import_pyarrow()
+            table = pa.ipc.open_stream(response.content).read_all()
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        return pd.DataFrame(response.json())
+
+    def _timeseries_headers(self, layout: str) -> Optional[Dict[str, str]]:
+        """Request headers for the timeseries endpoints, JSON only outside "long"."""
+        return self._table_headers() if layout == "long" else None
+
+    @staticmethod
+    def _layout_payload(layout: str) -> Dict[str, str]:
+        """Request payload selecting a timeseries layout, omitted for the default."""
+        if layout not in ("long", "wide", "array"):
+            raise ValueError("layout should be 'long', 'wide' or 'array'")
+        return {} if layout == "long" else {"layout": layout}
+
+    @staticmethod
+    def _resampling_payload(
+        temporal_resolution: Optional[str],
+        aggregation_type: Union[str, List[str]],
+        spatial_aggregate: bool,
+    ) -> Dict[str, Any]:
+        """Request payload grouping timeseries by period, omitted by default."""
+        if temporal_resolution is None and not spatial_aggregate:
+            return {}
+        payload: Dict[str, Any] = {"aggregation_type": aggregation_type}
+        if temporal_resolution is not None:
+            payload["temporal_resolution"] = temporal_resolution
+        if spatial_aggregate:
+            payload["spatial_aggregate"] = True
+        return payload
+
+    def _read_timeseries(
+        self, response: requests.Response, layout: str
+    ) -> pd.DataFrame:
+        """Decode a timeseries response in ``layout`` into a DataFrame."""
+        if layout == "long":
+            return self._read_table(response)
+        return timeseries_frame(response.json(), layout)
+
+    def _post_batches(
+        self,
+        endpoint: str,
+        gdf: gpd.GeoDataFrame,
+        payload: Dict,
+        batch_size: int,
+        verbose: bool,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[gpd.GeoDataFrame, requests.Response]]:
+        """Post the boundaries of a GeoDataFrame to a batch endpoint, in chunks.
+
+        Features are identified by their position in the chunk. Stops after the
+        first response if the endpoint is not available on this deployment, and
+        yields nothing if ``batch_size`` is None.
+        """
+        if not batch_size:
+            return
+
+        total_boundaries = len(gdf)
+        starts = range(0, total_boundaries, batch_size)
+
+        def post(start: int) -> requests.Response:
+            chunk = gdf.iloc[start : start + batch_size]
+            if verbose:
+                print(
+                    f"Fetching data for boundaries {start + 1} to "
+                    f"{start + len(chunk)} of {total_boundaries}..."
+                )
+
+            aois = {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "id": str(position),
+                        "geometry": geometry.__geo_interface__,
+                        "properties": {},
+                    }
+                    for position, geometry in enumerate(chunk.geometry)
+                ],
+            }
+            return self.session.post(
+                endpoint,
+                json={"aois": aois, **payload},
+                headers=headers,
+                verify=self.verify_ssl,
+            )
+
+        # Send the first chunk alone to find out if the endpoint exists
+        response = post(0)
+        yield gdf.iloc[:batch_size], response
+        if response.status_code == 404:
+            return
+
+        for start, response in zip(starts[1:], self._map(post, starts[1:])):
+            yield gdf.iloc[start : start + batch_size], response
+
+    def _post_each(
+        self,
+        endpoint: str,
+        gdf: gpd.GeoDataFrame,
+        payload: Dict,
+        verbose: bool,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[object, requests.Response]]:
+        """Post each boundary of a GeoDataFrame to an endpoint as the ``aoi``.
+
+        Yields the index of each boundary and its response, in the order of ``gdf``.
+        """
+        total_boundaries = len(gdf)
+
+        def post(boundary: Tuple[int, object]) -> requests.Response:
+            boundary_num, geometry = boundary
+            if verbose:
+                print(
+                    f"Fetching data for boundary {boundary_num} of {total_boundaries}..."
+                )
+
+            aoi = {
+                "type": "Feature",
+                "geometry": geometry.__geo_interface__,
+                "properties": {},
+            }
+            return self.session.post(
+                endpoint,
+                json={"aoi": aoi, **payload},
+                headers=headers,
+                verify=self.verify_ssl,
+            )
+
+        responses = self._map(post, enumerate(gdf.geometry, 1))
+        yield from zip(gdf.index, responses)
+
     def _handle_api_error(self, response: requests.Response) -> None:
         """Handle API error responses with specific handling for different status codes."""
         caller = inspect.currentframe().f_back.f_code.co_name
@@ -158,7 +462,7 @@ class Space2StatsClient:
         Exception
             If the API request fails.
         """
-        response = requests.get(self.fields_endpoint, verify=self.verify_ssl)
+        response = self.session.get(self.fields_endpoint, verify=self.verify_ssl)
         if response.status_code != 200:
             raise Exception(f"Failed to get fields: {response.text}")
 
@@ -222,6 +526,7 @@ class Space2StatsClient:
         fields: List[str],
         geometry: Optional[Literal["polygon", "point"]] = None,
         verbose: bool = True,
+        batch_size: Optional[int] = None,
     ) -> pd.DataFrame:
         """Extract h3 level data from Space2Stats for a GeoDataFrame.
 
@@ -245,6 +550,11 @@ class Space2StatsClient:
         verbose : bool
             Whether to display progress messages (default: True)
 
+        batch_size : Optional[int]
+            Number of boundaries sent per request to the batch endpoint (default: None).
+            If None, or if the API has no batch endpoint, one request is sent per boundary.
+            Chunks too large for the API are sent one boundary at a time.
+
         Returns
         -------
         DataFrame
@@ -253,38 +563,67 @@ class Space2StatsClient:
         if spatial_join_method not in ["touches", "centroid", "within"]:
             raise ValueError("Input should be 'touches', 'centroid' or 'within'")
 
-        total_boundaries = len(gdf)
         res_all = {}
 
-        for boundary_num, (idx, row) in enumerate(gdf.iterrows(), 1):
-            if verbose:
-                print(
-                    f"Fetching data for boundary {boundary_num} of {total_boundaries}..."
-                )
-
-            request_payload = {
-                "aoi": {
-                    "type": "Feature",
-                    "geometry": row.geometry.__geo_interface__,
-                    "properties": {},
-                },
+        batches = self._post_batches(
+            self.summary_batch_endpoint,
+            gdf,
+            {
                 "spatial_join_method": spatial_join_method,
                 "fields": fields,
                 "geometry": geometry,
-            }
-            response = requests.post(
-                self.summary_endpoint, json=request_payload, verify=self.verify_ssl
-            )
+            },
+            batch_size,
+            verbose,
+            headers=self._table_headers(),
+        )
+        for chunk, response in batches:
+            if response.status_code == 404:
+                break
+            if response.status_code == 413:
+                continue
+            if response.status_code != 200:
+                self._handle_api_error(response)
+
+            if self.response_format == "arrow":
+                df = self._read_table(response)
+                rows = {
+                    feature_id: group.drop(columns="feature_id").reset_index(drop=True)
+                    for feature_id, group in df.groupby("feature_id", sort=False)
+                }
+                empty = df.iloc[:0].drop(columns="feature_id")
+            else:
+                rows = {
+                    feature_id: pd.DataFrame(summaries)
+                    for feature_id, summaries in response.json().items()
+                }
+                empty = pd.DataFrame()
+
+            for position, idx in enumerate(chunk.index):
+                df = rows.get(str(position), empty)
+                if df.empty:
+                    print(f"Failed to get summary for {idx}")
+                res_all[idx] = df
 
+        responses = self._post_each(
+            self.summary_endpoint,
+            gdf[~gdf.index.isin(list(res_all))],
+            {
+                "spatial_join_method": spatial_join_method,
+                "fields": fields,
+                "geometry": geometry,
+            },
+            verbose,
+            headers=self._table_headers(),
+        )
+        for idx, response in responses:
             if response.status_code != 200:
                 self._handle_api_error(response)
 
-            summary_data = response.json()
-            if not summary_data:
+            df = self._read_table(response)
+            if df.empty:
                 print(f"Failed to get summary for {idx}")
-                summary_data = pd.DataFrame()
 
-            df = pd.DataFrame(summary_data)
             res_all[idx] = df
 
         res_all = pd.concat(res_all, names=["index_gdf", "index_h3"])
@@ -297,10 +636,12 @@ class Space2StatsClient:
     def get_aggregate(
         self,
         gdf: gpd.GeoDataFrame,
-        spatial_join_method: Literal["touches", "centroid", "within"],
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
         fields: list,
-        aggregation_type: Literal["sum", "avg", "count", "max", "min"],
+        aggregation_type: Union[str, List[str]],
         verbose: bool = True,
+        batch_size: Optional[int] = None,
+        weight_field: Optional[str] = None,
     ) -> pd.DataFrame:
         """Extract summary statistic from underlying H3 Space2Stats data.
 
@@ -309,49 +650,81 @@ class Space2StatsClient:
         gdf : GeoDataFrame
             The Areas of Interest
 
-        spatial_join_method : ["touches", "centroid", "within"]
-            The method to use for performing the spatial join
+        spatial_join_method : ["touches", "centroid", "within", "fractional"]
+            The method to use for performing the spatial join. "fractional"
+            weights the cells touching each AOI by the fraction of their area
+            inside it, for the "sum", "avg", "count", "max", "min" and
+            "weighted_avg" aggregations.
 
         fields : List[str]
             A list of field names to retrieve
 
-        aggregation_type : ["sum", "avg", "count", "max", "min"]
-            Statistical function to apply to each field per AOI.
+        aggregation_type : str or List[str]
+            Statistical function to apply to each field per AOI: "sum", "avg",
+            "count", "max", "min", "stddev", "weighted_avg" or a percentile such
+            as "p90". A list of functions is computed in a single request, in
+            columns named "<field>_<function>" (e.g. "sum_pop_2020_p90").
+
+        weight_field : Optional[str]
+            Field weighting the values of "weighted_avg", e.g. "sum_pop_2020".
 
         verbose : bool
             Whether to display progress messages (default: True)
 
+        batch_size : Optional[int]
+            Number of boundaries sent per request to the batch endpoint (default: None).
+            If None, or if the API has no batch endpoint, one request is sent per boundary.
+            Chunks too large for the API are sent one boundary at a time.
+
         Returns
         -------
         DataFrame
             A DataFrame with the aggregated statistics.
         """
-        if aggregation_type not in ["sum", "avg", "count", "max", "min"]:
-            raise ValueError("Input should be 'sum', 'avg', 'count', 'max' or 'min'")
+        aggregation = _aggregation_payload(aggregation_type, weight_field)
 
-        total_boundaries = len(gdf)
         res_all = []
+        fetched = set()
 
-        for boundary_num, (idx, row) in enumerate(gdf.iterrows(), 1):
-            if verbose:
-                print(
-                    f"Fetching data for boundary {boundary_num} of {total_boundaries}..."
-                )
-
-            request_payload = {
-                "aoi": {
-                    "type": "Feature",
-                    "geometry": row.geometry.__geo_interface__,
-                    "properties": {},
-                },
+        batches = self._post_batches(
+            self.aggregation_batch_endpoint,
+            gdf,
+            {
                 "spatial_join_method": spatial_join_method,
                 "fields": fields,
-                "aggregation_type": aggregation_type,
-            }
-            response = requests.post(
-                self.aggregation_endpoint, json=request_payload, verify=self.verify_ssl
-            )
+                **aggregation,
+            },
+            batch_size,
+            verbose,
+        )
+        for chunk, response in batches:
+            if response.status_code == 404:
+                break
+            if response.status_code == 413:
+                continue
+            if response.status_code != 200:
+                self._handle_api_error(response)
 
+            aggregates = response.json()
+            for position, idx in enumerate(chunk.index):
+                aggregate_data = aggregates.get(str(position))
+                if not aggregate_data:
+                    print(f"Failed to get summary for {idx}")
+                    aggregate_data = pd.DataFrame()
+                res_all.append(pd.DataFrame(aggregate_data, index=[idx]))
+                fetched.add(idx)
+
+        responses = self._post_each(
+            self.aggregation_endpoint,
+            gdf[~gdf.index.isin(list(fetched))],
+            {
+                "spatial_join_method": spatial_join_method,
+                "fields": fields,
+                **aggregation,
+            },
+            verbose,
+        )
+        for idx, response in responses:
             if response.status_code != 200:
                 self._handle_api_error(response)
 
@@ -401,24 +774,25 @@ class Space2StatsClient:
             "fields": fields,
             "geometry": geometry,
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/summary_by_hexids",
             json=request_payload,
+            headers=self._table_headers(),
             verify=self.verify_ssl,
         )
 
         if response.status_code != 200:
             self._handle_api_error(response)
 
-        summary_data = response.json()
-        return pd.DataFrame(summary_data)
+        return self._read_table(response)
 
     def get_aggregate_by_hexids(
         self,
         hex_ids: List[str],
         fields: List[str],
-        aggregation_type: Literal["sum", "avg", "count", "max", "min"],
+        aggregation_type: Union[str, List[str]],
         verbose: bool = True,
+        weight_field: Optional[str] = None,
     ) -> pd.DataFrame:
         """Aggregate statistics for specific hex IDs.
 
@@ -428,25 +802,29 @@ class Space2StatsClient:
             List of H3 hexagon IDs to aggregate
         fields : List[str]
             List of field names to aggregate
-        aggregation_type : Literal["sum", "avg", "count", "max", "min"]
-            Type of aggregation to perform
+        aggregation_type : str or List[str]
+            Type of aggregation to perform, or a list of them. See `get_aggregate`.
         verbose : bool
             Whether to display progress messages (default: True)
+        weight_field : Optional[str]
+            Field weighting the values of "weighted_avg"
 
         Returns
         -------
         DataFrame
             A DataFrame with the aggregated statistics.
         """
+        aggregation = _aggregation_payload(aggregation_type, weight_field)
+
         if verbose:
             print(f"Aggregating data for {len(hex_ids)} hex IDs...")
 
         request_payload = {
             "hex_ids": hex_ids,
             "fields": fields,
-            "aggregation_type": aggregation_type,
+            **aggregation,
         }
-        response = requests.post(
+        response = self.session.post(
             f"{self.base_url}/aggregate_by_hexids",
             json=request_payload,
             verify=self.verify_ssl,
@@ -458,6 +836,127 @@ class Space2StatsClient:
         aggregate_data = response.json()
         return pd.DataFrame([aggregate_data])
 
+    def get_summary_by_admin(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within"],
+        fields: List[str],
+        geometry: Optional[Literal["polygon", "point"]] = None,
+        verbose: bool = True,
+    ) -> pd.DataFrame:
+        """Retrieve statistics for administrative units by id.
+
+        The H3 cells of each unit are precomputed by the API, so no boundary is
+        uploaded or polyfilled.
+
+        Parameters
+        ----------
+        admin_ids : List[str]
+            Ids of the administrative units, e.g. geoBoundaries ``shapeID``s
+        spatial_join_method : ["touches", "centroid", "within"]
+            The method to use for performing the spatial join between the units and H3 cells
+        fields : List[str]
+            List of field names to retrieve from the statistics table
+        geometry : Optional[Literal["polygon", "point"]]
+            Specifies if the H3 geometries should be included in the response.
+        verbose : bool
+            Whether to display progress messages (default: True)
+
+        Returns
+        -------
+        DataFrame
+            A DataFrame with the requested fields for each H3 cell of each unit,
+            whose ``admin_id`` column identifies their unit.
+        """
+        if verbose:
+            print(f"Fetching data for {len(admin_ids)} administrative units...")
+
+        request_payload = {
+            "admin_ids": admin_ids,
+            "spatial_join_method": spatial_join_method,
+            "fields": fields,
+            "geometry": geometry,
+        }
+        response = self.session.post(
+            f"{self.base_url}/summary_by_admin",
+            json=request_payload,
+            headers=self._table_headers(),
+            verify=self.verify_ssl,
+        )
+
+        if response.status_code != 200:
+            self._handle_api_error(response)
+
+        if self.response_format == "arrow":
+            return self._read_table(response)
+        return pd.DataFrame(
+            [
+                {"admin_id": admin_id, **row}
+                for admin_id, rows in response.json().items()
+                for row in rows
+            ]
+        )
+
+    def get_aggregate_by_admin(
+        self,
+        admin_ids: List[str],
+        spatial_join_method: Literal["touches", "centroid", "within", "fractional"],
+        fields: List[str],
+        aggregation_type: Union[str, List[str]],
+        verbose: bool = True,
+        weight_field: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Aggregate statistics for administrative units by id.
+
+        Parameters
+        ----------
+        admin_ids : List[str]
+            Ids of the administrative units, e.g. geoBoundaries ``shapeID``s
+        spatial_join_method : ["touches", "centroid", "within", "fractional"]
+            The method to use for performing the spatial join between the units
+            and H3 cells. See `get_aggregate` for "fractional".
+        fields : List[str]
+            List of field names to aggregate
+        aggregation_type : str or List[str]
+            Type of aggregation to perform, or a list of them. See `get_aggregate`.
+        verbose : bool
+            Whether to display progress messages (default: True)
+        weight_field : Optional[str]
+            Field weighting the values of "weighted_avg"
+
+        Returns
+        -------
+        DataFrame
+            A DataFrame with the aggregated statistics of each unit, indexed by
+            admin id. Units covering no cell have missing values.
+        """
+        aggregation = _aggregation_payload(aggregation_type, weight_field)
+
+        if verbose:
+            print(f"Aggregating data for {len(admin_ids)} administrative units...")
+
+        request_payload = {
+            "admin_ids": admin_ids,
+            "spatial_join_method": spatial_join_method,
+            "fields": fields,
+            **aggregation,
+        }
+        response = self.session.post(
+            f"{self.base_url}/aggregate_by_admin",
+            json=request_payload,
+            verify=self.verify_ssl,
+        )
+
+        if response.status_code != 200:
+            self._handle_api_error(response)
+
+        aggregate_data = response.json()
+        return (
+            pd.DataFrame.from_dict(aggregate_data, orient="index")
+            .reindex(list(aggregate_data))
+            .rename_axis("admin_id")
+        )
+
     def get_timeseries_fields(self) -> List[str]:
         """Get available fields from the timeseries table.
 
@@ -471,7 +970,9 @@ class Space2StatsClient:
         Exception
             If the API request fails
         """
-        response = requests.get(self.timeseries_fields_endpoint)
+        response = self.session.get(
+            self.timeseries_fields_endpoint, verify=self.verify_ssl
+        )
         if response.status_code != 200:
             self._handle_api_error(response)
         return response.json()
@@ -485,6 +986,12 @@ class Space2StatsClient:
         end_date: Optional[str] = None,
         geometry: Optional[Literal["polygon", "point"]] = None,
         verbose: bool = True,
+        layout: Literal["long", "wide", "array"] = "long",
+        temporal_resolution: Optional[
+            Literal["month", "quarter", "year", "climatology"]
+        ] = None,
+        aggregation_type: Union[str, List[str]] = "avg",
+        spatial_aggregate: bool = False,
     ) -> pd.DataFrame:
         """Get timeseries data for areas of interest.
 
@@ -505,41 +1012,51 @@ class Space2StatsClient:
             End date for filtering data (format: 'YYYY-MM-DD')
         verbose : bool
             Whether to display progress messages (default: True)
+        layout : ["long", "wide", "array"]
+            Layout requested from the API, see `timeseries_frame`. "wide" and
+            "array" send one row per hex ID, and are always requested as JSON
+        temporal_resolution : Optional["month", "quarter", "year", "climatology"]
+            If specified, the API groups the dates of each hex ID by month,
+            quarter or year, or by month of the year ("climatology", numbered
+            under a "month" column instead of "date")
+        aggregation_type : str or List[str]
+            Aggregation(s) reducing the values of each period (default: "avg"),
+            e.g. "sum", "max" or "p90"
+        spatial_aggregate : bool
+            If True, the API reduces all the hex IDs together into one row per
+            period, or per date without ``temporal_resolution``
 
         Returns
         -------
         DataFrame
-            A DataFrame containing timeseries data for each hex ID and date
+            A DataFrame containing timeseries data for each hex ID and date,
+            or for each hex ID with the "wide" layout
         """
-        total_boundaries = len(gdf)
         res_all = []
 
-        for boundary_num, (idx, row) in enumerate(gdf.iterrows(), 1):
-            if verbose:
-                print(
-                    f"Fetching data for boundary {boundary_num} of {total_boundaries}..."
-                )
-
-            request_payload = {
-                "aoi": {
-                    "type": "Feature",
-                    "geometry": row.geometry.__geo_interface__,
-                    "properties": {},
-                },
+        responses = self._post_each(
+            self.timeseries_endpoint,
+            gdf,
+            {
                 "spatial_join_method": spatial_join_method,
                 "start_date": start_date,
                 "end_date": end_date,
                 "fields": fields,
                 "geometry": geometry,
-            }
-
-            response = requests.post(self.timeseries_endpoint, json=request_payload)
+                **self._layout_payload(layout),
+                **self._resampling_payload(
+                    temporal_resolution, aggregation_type, spatial_aggregate
+                ),
+            },
+            verbose,
+            headers=self._timeseries_headers(layout),
+        )
+        for idx, response in responses:
             if response.status_code != 200:
                 self._handle_api_error(response)
 
-            timeseries_data = response.json()
-            if timeseries_data:
-                df = pd.DataFrame(timeseries_data)
+            df = self._read_timeseries(response, layout)
+            if not df.empty:
                 df["area_id"] = idx
                 res_all.append(df)
 
@@ -562,6 +1079,12 @@ class Space2StatsClient:
         end_date: Optional[str] = None,
         geometry: Optional[Literal["polygon", "point"]] = None,
         verbose: bool = True,
+        layout: Literal["long", "wide", "array"] = "long",
+        temporal_resolution: Optional[
+            Literal["month", "quarter", "year", "climatology"]
+        ] = None,
+        aggregation_type: Union[str, List[str]] = "avg",
+        spatial_aggregate: bool = False,
     ) -> pd.DataFrame:
         """Get timeseries data for specific hex IDs.
 
@@ -579,11 +1102,24 @@ class Space2StatsClient:
             Specifies if the H3 geometries should be included in the response.
         verbose : bool
             Whether to display progress messages (default: True)
+        layout : ["long", "wide", "array"]
+            Layout requested from the API, see `timeseries_frame`
+        temporal_resolution : Optional["month", "quarter", "year", "climatology"]
+            If specified, the API groups the dates of each hex ID by month,
+            quarter or year, or by month of the year ("climatology", numbered
+            under a "month" column instead of "date")
+        aggregation_type : str or List[str]
+            Aggregation(s) reducing the values of each period (default: "avg"),
+            e.g. "sum", "max" or "p90"
+        spatial_aggregate : bool
+            If True, the API reduces all the hex IDs together into one row per
+            period, or per date without ``temporal_resolution``
 
         Returns
         -------
         DataFrame
-            A DataFrame containing timeseries data for each hex ID and date
+            A DataFrame containing timeseries data for each hex ID and date,
+            or for each hex ID with the "wide" layout
         """
         if verbose:
             print(f"Fetching timeseries data for {len(hex_ids)} hex IDs...")
@@ -594,19 +1130,24 @@ class Space2StatsClient:
             "start_date": start_date,
             "end_date": end_date,
             "geometry": geometry,
+            **self._layout_payload(layout),
+            **self._resampling_payload(
+                temporal_resolution, aggregation_type, spatial_aggregate
+            ),
         }
 
         # Remove None values from payload
         request_payload = {k: v for k, v in request_payload.items() if v is not None}
 
-        response = requests.post(
-            self.timeseries_by_hexids_endpoint, json=request_payload
+        response = self.session.post(
+            self.timeseries_by_hexids_endpoint,
+            json=request_payload,
+            headers=self._timeseries_headers(layout),
         )
         if response.status_code != 200:
             self._handle_api_error(response)
 
-        timeseries_data = response.json()
-        return pd.DataFrame(timeseries_data)
+        return self._read_timeseries(response, layout)
 
     # ADM2 Summaries functionality for World Bank DDH API
 
@@ -83,6 +83,22 @@ def mock_api_response(mocker, mock_catalog):
             }
         elif "fields" in str(args[0]) and "timeseries" not in str(args[0]):
             mock.json.return_value = ["sum_pop_2020", "sum_pop_f_10_2020"]
+        elif "summary/batch" in str(args[0]):
+            mock.json.return_value = {
+                feature["id"]: [
+                    {
+                        "hex_id": "862a1070fffffff",
+                        "sum_pop_2020": 1000,
+                        "sum_pop_f_10_2020": 500,
+                    }
+                ]
+                for feature in kwargs["json"]["aois"]["features"]
+            }
+        elif "aggregate/batch" in str(args[0]):
+            mock.json.return_value = {
+                feature["id"]: {"sum_pop_2020": 5000, "sum_pop_f_10_2020": 2500}
+                for feature in kwargs["json"]["aois"]["features"]
+            }
         elif "summary_by_hexids" in str(args[0]):
             if "geometry" in kwargs.get("json", {}):
                 mock.json.return_value = [
@@ -171,6 +187,8 @@ def mock_api_response(mocker, mock_catalog):
     # Mock requests
     mocker.patch("requests.get", side_effect=mock_response)
     mocker.patch("requests.post", side_effect=mock_response)
+    mocker.patch("requests.Session.get", side_effect=mock_response)
+    mocker.patch("requests.Session.post", side_effect=mock_response)
 
     # Use pre-created GeoDataFrame
     mocker.patch("geopandas.read_file", return_value=MOCK_GDF)
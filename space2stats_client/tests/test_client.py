@@ -1,10 +1,15 @@
 import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
 import geopandas as gpd
 import pandas as pd
 import pytest
+import requests
+from shapely.geometry import Polygon
 
-from space2stats_client import Space2StatsClient
+from space2stats_client import Space2StatsClient, timeseries_frame
 from space2stats_client.utils import download_esri_boundaries
 
 
@@ -68,6 +73,125 @@ def test_get_aggregate(mock_api_response, sample_geodataframe):
     assert "sum_pop_2020" in result
 
 
+def _three_boundaries():
+    geometry = Polygon([[0, 0], [0, 1], [1, 1], [1, 0], [0, 0]])
+    return gpd.GeoDataFrame(
+        {"name": ["a", "b", "c"], "geometry": [geometry] * 3},
+        index=[10, 20, 30],
+        crs="EPSG:4326",
+    )
+
+
+def test_get_summary_batches(mocker, mock_api_response):
+    """Test that get_summary sends the boundaries in chunks to the batch endpoint."""
+    mock_post = requests.Session.post
+    client = Space2StatsClient()
+    result = client.get_summary(
+        gdf=_three_boundaries(),
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        batch_size=2,
+    )
+
+    assert [call.args[0] for call in mock_post.call_args_list] == [
+        client.summary_batch_endpoint
+    ] * 2
+    features = mock_post.call_args_list[0].kwargs["json"]["aois"]["features"]
+    assert [feature["id"] for feature in features] == ["0", "1"]
+    assert result["index_gdf"].tolist() == [10, 20, 30]
+    assert result["name"].tolist() == ["a", "b", "c"]
+    assert result["sum_pop_2020"].tolist() == [1000] * 3
+
+
+def test_get_aggregate_batches(mocker, mock_api_response):
+    """Test that get_aggregate sends the boundaries in chunks to the batch endpoint."""
+    mock_post = requests.Session.post
+    client = Space2StatsClient()
+    result = client.get_aggregate(
+        gdf=_three_boundaries(),
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        aggregation_type="sum",
+        batch_size=2,
+    )
+
+    assert [call.args[0] for call in mock_post.call_args_list] == [
+        client.aggregation_batch_endpoint
+    ] * 2
+    assert result.index.tolist() == [10, 20, 30]
+    assert result["sum_pop_2020"].tolist() == [5000] * 3
+
+
+def test_get_aggregate_without_batches(mocker, mock_api_response):
+    """Test that get_aggregate sends one request per boundary by default."""
+    mock_post = requests.Session.post
+    client = Space2StatsClient()
+    client.get_aggregate(
+        gdf=_three_boundaries(),
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        aggregation_type="sum",
+    )
+
+    assert [call.args[0] for call in mock_post.call_args_list] == [
+        client.aggregation_endpoint
+    ] * 3
+
+
+def test_get_summary_batch_endpoint_not_found(mocker, mock_api_response):
+    """Test that get_summary falls back to one request per boundary on older APIs."""
+    post = requests.Session.post
+
+    def mock_post(url, *args, **kwargs):
+        if url.endswith("/batch"):
+            response = mocker.Mock()
+            response.status_code = 404
+            return response
+        return post(url, *args, **kwargs)
+
+    mock = mocker.patch("requests.Session.post", side_effect=mock_post)
+    client = Space2StatsClient()
+    result = client.get_summary(
+        gdf=_three_boundaries(),
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        batch_size=2,
+    )
+
+    assert [call.args[0] for call in mock.call_args_list] == [
+        client.summary_batch_endpoint
+    ] + [client.summary_endpoint] * 3
+    assert result["index_gdf"].tolist() == [10, 20, 30]
+
+
+def test_get_aggregate_batch_too_large(mocker, mock_api_response):
+    """Test that get_aggregate sends chunks rejected as too large one boundary at a time."""
+    post = requests.Session.post
+
+    def mock_post(url, *args, **kwargs):
+        if url.endswith("/batch") and len(kwargs["json"]["aois"]["features"]) > 1:
+            response = mocker.Mock()
+            response.status_code = 413
+            return response
+        return post(url, *args, **kwargs)
+
+    mock = mocker.patch("requests.Session.post", side_effect=mock_post)
+    client = Space2StatsClient()
+    result = client.get_aggregate(
+        gdf=_three_boundaries(),
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        aggregation_type="sum",
+        batch_size=2,
+    )
+
+    assert [call.args[0] for call in mock.call_args_list] == [
+        client.aggregation_batch_endpoint
+    ] * 2 + [client.aggregation_endpoint] * 2
+    assert result.index.tolist() == [10, 20, 30]
+    assert result["sum_pop_2020"].tolist() == [5000] * 3
+
+
 def test_invalid_spatial_join_method(sample_geodataframe):
     """Test that invalid spatial join method raises ValueError."""
     client = Space2StatsClient()
@@ -84,9 +208,7 @@ def test_invalid_spatial_join_method(sample_geodataframe):
 def test_invalid_aggregation_type(sample_geodataframe):
     """Test that invalid aggregation type raises ValueError."""
     client = Space2StatsClient()
-    with pytest.raises(
-        Exception, match="Input should be 'sum', 'avg', 'count', 'max' or 'min'"
-    ):
+    with pytest.raises(Exception, match="Input should be 'sum', 'avg', 'count'"):
         client.get_aggregate(
             gdf=sample_geodataframe,
             spatial_join_method="centroid",
@@ -95,6 +217,45 @@ def test_invalid_aggregation_type(sample_geodataframe):
         )
 
 
+def test_get_aggregate_multiple_types(mock_api_response, sample_geodataframe):
+    """Test that a list of aggregation types and a weight field are sent as is."""
+    client = Space2StatsClient()
+    client.get_aggregate(
+        gdf=sample_geodataframe,
+        spatial_join_method="centroid",
+        fields=["sum_pop_f_10_2020"],
+        aggregation_type=["avg", "stddev", "p90", "weighted_avg"],
+        weight_field="sum_pop_2020",
+        verbose=False,
+    )
+
+    payload = requests.Session.post.call_args.kwargs["json"]
+    assert payload["aggregation_type"] == ["avg", "stddev", "p90", "weighted_avg"]
+    assert payload["weight_field"] == "sum_pop_2020"
+
+
+@pytest.mark.parametrize(
+    "aggregation_type,weight_field,error",
+    [
+        (["sum", "median"], None, "Input should be"),
+        ([], None, "Input should be"),
+        ("weighted_avg", None, "weighted_avg requires a weight_field"),
+    ],
+)
+def test_get_aggregate_by_hexids_invalid_types(
+    mock_api_response, aggregation_type, weight_field, error
+):
+    """Test that aggregation types are validated before sending a request."""
+    client = Space2StatsClient()
+    with pytest.raises(ValueError, match=error):
+        client.get_aggregate_by_hexids(
+            hex_ids=["862a1070fffffff"],
+            fields=["sum_pop_2020"],
+            aggregation_type=aggregation_type,
+            weight_field=weight_field,
+        )
+
+
 def test_get_summary_by_hexids(mock_api_response):
     """Test get_summary_by_hexids with sample data."""
     client = Space2StatsClient()
@@ -231,6 +392,254 @@ def test_get_timeseries_by_hexids_values(mock_api_response):
     assert 1.5 in second_hex_data["value"].values
 
 
+def _arrow_response(mocker, table):
+    """Mock response carrying an Arrow IPC stream."""
+    pa = pytest.importorskip("pyarrow")
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = mocker.Mock()
+    response.status_code = 200
+    response.content = sink.getvalue().to_pybytes()
+    return response
+
+
+def test_get_summary_by_hexids_arrow(mocker, mock_api_response):
+    """Test that Arrow responses are requested and decoded into a DataFrame."""
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table(
+        {
+            "hex_id": ["862a1070fffffff", "862a10767ffffff"],
+            "sum_pop_2020": [1000.0, 1500.0],
+        }
+    )
+    mock_post = mocker.patch(
+        "requests.Session.post", return_value=_arrow_response(mocker, table)
+    )
+
+    client = Space2StatsClient(response_format="arrow")
+    result = client.get_summary_by_hexids(
+        hex_ids=["862a1070fffffff", "862a10767ffffff"], fields=["sum_pop_2020"]
+    )
+
+    assert mock_post.call_args.kwargs["headers"] == {
+        "Accept": "application/vnd.apache.arrow.stream"
+    }
+    assert isinstance(result, pd.DataFrame)
+    assert isinstance(result["sum_pop_2020"].dtype, pd.ArrowDtype)
+    assert result["hex_id"].tolist() == ["862a1070fffffff", "862a10767ffffff"]
+    assert result["sum_pop_2020"].tolist() == [1000.0, 1500.0]
+
+
+def test_get_timeseries_arrow(mocker, mock_api_response, sample_geodataframe):
+    """Test get_timeseries with Arrow responses."""
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table(
+        {
+            "hex_id": pa.array(["8611822e7ffffff"] * 2).dictionary_encode(),
+            "date": pa.array(pd.to_datetime(["2024-01-01", "2024-01-02"]).date),
+            "value": [0.5, 0.75],
+        }
+    )
+    mocker.patch("requests.Session.post", return_value=_arrow_response(mocker, table))
+
+    client = Space2StatsClient(response_format="arrow")
+    result = client.get_timeseries(
+        gdf=sample_geodataframe, spatial_join_method="centroid", fields=["value"]
+    )
+
+    assert len(result) == 2
+    assert result["value"].tolist() == [0.5, 0.75]
+    assert (result["area_id"] == sample_geodataframe.index[0]).all()
+
+
+def test_get_timeseries_by_hexids_array_layout(mocker):
+    """Test that the array layout is expanded into one row per date."""
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = [
+        {
+            "hex_id": "8611822e7ffffff",
+            "date": ["2024-01-01", "2024-01-02"],
+            "value": [0.5, 0.75],
+        },
+        {"hex_id": "8611823e3ffffff", "date": ["2024-01-01"], "value": [1.0]},
+    ]
+    mocker.patch("pystac.Catalog.from_file")
+    post = mocker.patch("requests.Session.post", return_value=response)
+
+    client = Space2StatsClient(response_format="arrow")
+    result = client.get_timeseries_by_hexids(
+        hex_ids=["8611822e7ffffff", "8611823e3ffffff"],
+        fields=["value"],
+        layout="array",
+    )
+
+    assert post.call_args.kwargs["json"]["layout"] == "array"
+    assert post.call_args.kwargs["headers"] is None
+    assert result.to_dict("records") == [
+        {"hex_id": "8611822e7ffffff", "date": "2024-01-01", "value": 0.5},
+        {"hex_id": "8611822e7ffffff", "date": "2024-01-02", "value": 0.75},
+        {"hex_id": "8611823e3ffffff", "date": "2024-01-01", "value": 1.0},
+    ]
+    assert result["value"].dtype == float
+
+
+def test_get_timeseries_wide_layout(mocker, sample_geodataframe):
+    """Test that the wide layout returns one row per hex ID."""
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = [
+        {
+            "hex_id": "8611822e7ffffff",
+            "value_2024-01-01": 0.5,
+            "value_2024-01-02": 0.75,
+        }
+    ]
+    mocker.patch("pystac.Catalog.from_file")
+    mocker.patch("requests.Session.post", return_value=response)
+
+    client = Space2StatsClient()
+    result = client.get_timeseries(
+        gdf=sample_geodataframe,
+        spatial_join_method="centroid",
+        fields=["value"],
+        layout="wide",
+        verbose=False,
+    )
+
+    assert len(result) == 1
+    assert result["value_2024-01-02"].tolist() == [0.75]
+    assert (result["area_id"] == sample_geodataframe.index[0]).all()
+
+
+def test_get_timeseries_resampled(mocker, sample_geodataframe):
+    """Test that the resampling options are only sent when requested."""
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = [{"date": "2023-01-01", "value": 1.5}]
+    mocker.patch("pystac.Catalog.from_file")
+    post = mocker.patch("requests.Session.post", return_value=response)
+
+    client = Space2StatsClient()
+    result = client.get_timeseries(
+        gdf=sample_geodataframe,
+        spatial_join_method="centroid",
+        fields=["value"],
+        temporal_resolution="year",
+        aggregation_type="max",
+        spatial_aggregate=True,
+        verbose=False,
+    )
+
+    payload = post.call_args.kwargs["json"]
+    assert payload["temporal_resolution"] == "year"
+    assert payload["aggregation_type"] == "max"
+    assert payload["spatial_aggregate"] is True
+    assert result["value"].tolist() == [1.5] * len(sample_geodataframe)
+
+    client.get_timeseries_by_hexids(
+        hex_ids=["8611822e7ffffff"], fields=["value"], verbose=False
+    )
+    payload = post.call_args.kwargs["json"]
+    assert not {"temporal_resolution", "aggregation_type", "spatial_aggregate"} & set(
+        payload
+    )
+
+
+def test_timeseries_frame_empty_and_invalid_layout(mocker):
+    mocker.patch("pystac.Catalog.from_file")
+    assert timeseries_frame([], "array").empty
+    with pytest.raises(ValueError, match="layout"):
+        Space2StatsClient().get_timeseries_by_hexids(
+            hex_ids=["8611822e7ffffff"], fields=["value"], layout="cells"
+        )
+
+
+def test_invalid_response_format():
+    """Test that an unknown response format is rejected."""
+    with pytest.raises(ValueError, match="response_format"):
+        Space2StatsClient(response_format="csv")
+
+
+def test_invalid_max_concurrency():
+    """Test that max_concurrency must be a positive integer."""
+    with pytest.raises(ValueError, match="max_concurrency"):
+        Space2StatsClient(max_concurrency=0)
+
+
+def test_get_aggregate_concurrent(mocker, mock_api_response):
+    """Test that concurrent requests are reassembled in the order of the boundaries."""
+    gdf = gpd.GeoDataFrame(
+        {"geometry": [Polygon([[i, 0], [i, 1], [i + 1, 1], [i, 0]]) for i in range(6)]},
+        index=list("abcdef"),
+        crs="EPSG:4326",
+    )
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def mock_post(url, json, **kwargs):
+        x = json["aoi"]["geometry"]["coordinates"][0][0][0]
+        with lock:
+            in_flight.append(x)
+            max_in_flight.append(len(in_flight))
+        # Later boundaries complete first
+        time.sleep(0.01 * (6 - x))
+        with lock:
+            in_flight.remove(x)
+        response = mocker.Mock()
+        response.status_code = 200
+        response.json.return_value = {"sum_pop_2020": x}
+        return response
+
+    mocker.patch("requests.Session.post", side_effect=mock_post)
+    client = Space2StatsClient(max_concurrency=3)
+    result = client.get_aggregate(
+        gdf=gdf,
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        aggregation_type="sum",
+        batch_size=None,
+    )
+
+    assert result.index.tolist() == list("abcdef")
+    assert result["sum_pop_2020"].tolist() == [0, 1, 2, 3, 4, 5]
+    assert 1 < max(max_in_flight) <= 3
+
+
+def test_retry_throttled_requests(mocker):
+    """Test that 429 and 503 responses are retried by the client session."""
+    mocker.patch("pystac.Catalog.from_file")
+    statuses = [429, 503, 200]
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            status = statuses[len(requests_seen) - 1]
+            body = json.dumps(["sum_pop_2020"] if status == 200 else {}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = Space2StatsClient(
+            base_url=f"http://127.0.0.1:{server.server_port}", backoff_factor=0
+        )
+        assert client.get_fields() == ["sum_pop_2020"]
+    finally:
+        server.shutdown()
+
+    assert requests_seen == ["/fields"] * 3
+
+
 def test_handle_api_error_413(mock_error_response_413):
     """Test handling of 413 Request Entity Too Large error."""
     client = Space2StatsClient()
@@ -626,3 +1035,55 @@ def test_download_esri_boundaries_pagination_error(mock_esri_pagination_error):
 
     with pytest.raises(RuntimeError, match="Failed to read GeoJSON page at offset 1"):
         download_esri_boundaries(url, layer, iso3)
+
+
+def test_get_summary_by_admin(mocker):
+    """Test that the rows of each administrative unit are labelled with its id."""
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = {
+        "ADM-1": [
+            {"hex_id": "862a1070fffffff", "sum_pop_2020": 100},
+            {"hex_id": "862a10767ffffff", "sum_pop_2020": 150},
+        ],
+        "ADM-2": [],
+    }
+    mocker.patch("pystac.Catalog.from_file")
+    post = mocker.patch("requests.Session.post", return_value=response)
+
+    client = Space2StatsClient()
+    result = client.get_summary_by_admin(
+        admin_ids=["ADM-1", "ADM-2"],
+        spatial_join_method="centroid",
+        fields=["sum_pop_2020"],
+        verbose=False,
+    )
+
+    assert post.call_args.args[0].endswith("/summary_by_admin")
+    assert post.call_args.kwargs["json"]["admin_ids"] == ["ADM-1", "ADM-2"]
+    assert result.to_dict("records") == [
+        {"admin_id": "ADM-1", "hex_id": "862a1070fffffff", "sum_pop_2020": 100},
+        {"admin_id": "ADM-1", "hex_id": "862a10767ffffff", "sum_pop_2020": 150},
+    ]
+
+
+def test_get_aggregate_by_admin(mocker):
+    """Test that aggregates are indexed by admin id, keeping units without cells."""
+    response = mocker.Mock(status_code=200)
+    response.json.return_value = {"ADM-1": {"sum_pop_2020": 250}, "ADM-2": {}}
+    mocker.patch("pystac.Catalog.from_file")
+    post = mocker.patch("requests.Session.post", return_value=response)
+
+    client = Space2StatsClient()
+    result = client.get_aggregate_by_admin(
+        admin_ids=["ADM-1", "ADM-2"],
+        spatial_join_method="touches",
+        fields=["sum_pop_2020"],
+        aggregation_type="sum",
+        verbose=False,
+    )
+
+    assert post.call_args.args[0].endswith("/aggregate_by_admin")
+    assert post.call_args.kwargs["json"]["aggregation_type"] == "sum"
+    assert list(result.index) == ["ADM-1", "ADM-2"]
+    assert result.loc["ADM-1", "sum_pop_2020"] == 250
+    assert pd.isna(result.loc["ADM-2", "sum_pop_2020"])